@@ -0,0 +1,29 @@
+"""add payload bytes
+
+Revision ID: 0e6a93c4d815
+Revises: 8d2f6b1a4c77
+Create Date: 2026-10-18 17:03:51.904417
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0e6a93c4d815"
+down_revision: Union[str, None] = "8d2f6b1a4c77"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.add_column(sa.Column("payload_bytes", sa.Integer, nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.drop_column("payload_bytes")
@@ -0,0 +1,29 @@
+"""add network profile
+
+Revision ID: 1a5d7c3e9b62
+Revises: f7b3e8a1c590
+Create Date: 2026-10-18 18:12:40.218734
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "1a5d7c3e9b62"
+down_revision: Union[str, None] = "f7b3e8a1c590"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.add_column(sa.Column("network_profile", sa.VARCHAR(30), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.drop_column("network_profile")
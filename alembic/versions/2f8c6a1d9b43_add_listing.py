@@ -0,0 +1,33 @@
+"""add listing
+
+Revision ID: 2f8c6a1d9b43
+Revises: 6d4a9e2b7f15
+Create Date: 2026-10-19 14:21:53.917204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "2f8c6a1d9b43"
+down_revision: Union[str, None] = "6d4a9e2b7f15"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.add_column(sa.Column("listed_objects", sa.Integer, nullable=True))
+        batch_op.add_column(sa.Column("list_pages", sa.Integer, nullable=True))
+        batch_op.add_column(sa.Column("largest_list_batch", sa.Integer, nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.drop_column("largest_list_batch")
+        batch_op.drop_column("list_pages")
+        batch_op.drop_column("listed_objects")
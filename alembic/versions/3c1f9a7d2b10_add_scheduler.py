@@ -0,0 +1,37 @@
+"""add scheduler
+
+Revision ID: 3c1f9a7d2b10
+Revises: 7e57f0e42f5e
+Create Date: 2026-10-18 09:02:11.403512
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3c1f9a7d2b10"
+down_revision: Union[str, None] = "7e57f0e42f5e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "scheduler", sa.VARCHAR(30), nullable=False, server_default="gather"
+            )
+        )
+        batch_op.add_column(
+            sa.Column("concurrency", sa.INTEGER, nullable=False, server_default="500")
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.drop_column("concurrency")
+        batch_op.drop_column("scheduler")
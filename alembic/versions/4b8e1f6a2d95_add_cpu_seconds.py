@@ -0,0 +1,29 @@
+"""add cpu seconds
+
+Revision ID: 4b8e1f6a2d95
+Revises: 1a5d7c3e9b62
+Create Date: 2026-10-18 19:04:17.532911
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4b8e1f6a2d95"
+down_revision: Union[str, None] = "1a5d7c3e9b62"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.add_column(sa.Column("cpu_seconds", sa.FLOAT, nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.drop_column("cpu_seconds")
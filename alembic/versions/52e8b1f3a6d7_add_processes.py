@@ -0,0 +1,31 @@
+"""add processes
+
+Revision ID: 52e8b1f3a6d7
+Revises: d27a5c0e9f41
+Create Date: 2026-10-18 11:04:52.190364
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "52e8b1f3a6d7"
+down_revision: Union[str, None] = "d27a5c0e9f41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.add_column(
+            sa.Column("processes", sa.INTEGER, nullable=False, server_default="1")
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.drop_column("processes")
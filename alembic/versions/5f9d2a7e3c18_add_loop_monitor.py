@@ -0,0 +1,31 @@
+"""add loop monitor
+
+Revision ID: 5f9d2a7e3c18
+Revises: e41c7b9d0a26
+Create Date: 2026-10-18 13:47:29.516380
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5f9d2a7e3c18"
+down_revision: Union[str, None] = "e41c7b9d0a26"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.add_column(sa.Column("loop_lag_histogram", sa.JSON, nullable=True))
+        batch_op.add_column(sa.Column("blocking_stacks", sa.JSON, nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.drop_column("blocking_stacks")
+        batch_op.drop_column("loop_lag_histogram")
@@ -0,0 +1,29 @@
+"""add buffered part bytes
+
+Revision ID: 6d4a9e2b7f15
+Revises: e5a3b8c1d704
+Create Date: 2026-10-19 10:42:17.508326
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6d4a9e2b7f15"
+down_revision: Union[str, None] = "e5a3b8c1d704"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.add_column(sa.Column("buffered_part_bytes", sa.Integer, nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.drop_column("buffered_part_bytes")
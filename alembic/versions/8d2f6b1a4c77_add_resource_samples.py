@@ -0,0 +1,29 @@
+"""add resource samples
+
+Revision ID: 8d2f6b1a4c77
+Revises: c3a71d5b9e04
+Create Date: 2026-10-18 16:12:07.381254
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8d2f6b1a4c77"
+down_revision: Union[str, None] = "c3a71d5b9e04"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.add_column(sa.Column("resource_samples", sa.JSON, nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.drop_column("resource_samples")
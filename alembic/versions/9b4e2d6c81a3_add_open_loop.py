@@ -0,0 +1,47 @@
+"""add open loop
+
+Revision ID: 9b4e2d6c81a3
+Revises: 3c1f9a7d2b10
+Create Date: 2026-10-18 09:41:37.118204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9b4e2d6c81a3"
+down_revision: Union[str, None] = "3c1f9a7d2b10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.add_column(
+            sa.Column("rate", sa.FLOAT, nullable=False, server_default="100.0")
+        )
+        batch_op.add_column(
+            sa.Column(
+                "arrival", sa.VARCHAR(30), nullable=False, server_default="constant"
+            )
+        )
+        batch_op.add_column(
+            sa.Column("number_dropped", sa.INTEGER, nullable=False, server_default="0")
+        )
+        batch_op.add_column(
+            sa.Column("number_delayed", sa.INTEGER, nullable=False, server_default="0")
+        )
+        batch_op.add_column(sa.Column("latency_histogram", sa.JSON, nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.drop_column("latency_histogram")
+        batch_op.drop_column("number_delayed")
+        batch_op.drop_column("number_dropped")
+        batch_op.drop_column("arrival")
+        batch_op.drop_column("rate")
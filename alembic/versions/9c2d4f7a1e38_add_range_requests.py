@@ -0,0 +1,31 @@
+"""add range requests
+
+Revision ID: 9c2d4f7a1e38
+Revises: 4b8e1f6a2d95
+Create Date: 2026-10-18 21:42:06.118734
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9c2d4f7a1e38"
+down_revision: Union[str, None] = "4b8e1f6a2d95"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.add_column(sa.Column("range_requests", sa.Integer, nullable=True))
+        batch_op.add_column(sa.Column("fetched_bytes", sa.Integer, nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.drop_column("fetched_bytes")
+        batch_op.drop_column("range_requests")
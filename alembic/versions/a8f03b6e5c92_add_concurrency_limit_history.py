@@ -0,0 +1,31 @@
+"""add concurrency limit history
+
+Revision ID: a8f03b6e5c92
+Revises: 52e8b1f3a6d7
+Create Date: 2026-10-18 11:52:40.338716
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a8f03b6e5c92"
+down_revision: Union[str, None] = "52e8b1f3a6d7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.add_column(
+            sa.Column("concurrency_limit_history", sa.JSON, nullable=True)
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.drop_column("concurrency_limit_history")
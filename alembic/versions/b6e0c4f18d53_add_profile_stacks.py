@@ -0,0 +1,29 @@
+"""add profile stacks
+
+Revision ID: b6e0c4f18d53
+Revises: 5f9d2a7e3c18
+Create Date: 2026-10-18 14:21:06.187342
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b6e0c4f18d53"
+down_revision: Union[str, None] = "5f9d2a7e3c18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.add_column(sa.Column("profile_stacks", sa.JSON, nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.drop_column("profile_stacks")
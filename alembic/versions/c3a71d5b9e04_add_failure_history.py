@@ -0,0 +1,29 @@
+"""add failure history
+
+Revision ID: c3a71d5b9e04
+Revises: b6e0c4f18d53
+Create Date: 2026-10-18 14:58:43.620917
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c3a71d5b9e04"
+down_revision: Union[str, None] = "b6e0c4f18d53"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.add_column(sa.Column("failure_history", sa.JSON, nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.drop_column("failure_history")
@@ -0,0 +1,37 @@
+"""add load profile
+
+Revision ID: d27a5c0e9f41
+Revises: 9b4e2d6c81a3
+Create Date: 2026-10-18 10:26:05.772931
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d27a5c0e9f41"
+down_revision: Union[str, None] = "9b4e2d6c81a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "profile", sa.VARCHAR(30), nullable=False, server_default="constant"
+            )
+        )
+        batch_op.add_column(
+            sa.Column("step", sa.INTEGER, nullable=False, server_default="0")
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.drop_column("step")
+        batch_op.drop_column("profile")
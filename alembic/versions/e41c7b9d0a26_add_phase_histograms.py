@@ -0,0 +1,29 @@
+"""add phase histograms
+
+Revision ID: e41c7b9d0a26
+Revises: a8f03b6e5c92
+Create Date: 2026-10-18 13:08:12.904215
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e41c7b9d0a26"
+down_revision: Union[str, None] = "a8f03b6e5c92"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.add_column(sa.Column("phase_histograms", sa.JSON, nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.drop_column("phase_histograms")
@@ -0,0 +1,31 @@
+"""add body buffers
+
+Revision ID: e5a3b8c1d704
+Revises: 9c2d4f7a1e38
+Create Date: 2026-10-18 23:05:41.352087
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e5a3b8c1d704"
+down_revision: Union[str, None] = "9c2d4f7a1e38"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.add_column(sa.Column("body_allocations", sa.Integer, nullable=True))
+        batch_op.add_column(sa.Column("body_copies", sa.Integer, nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("workers") as batch_op:
+        batch_op.drop_column("body_copies")
+        batch_op.drop_column("body_allocations")
@@ -0,0 +1,36 @@
+"""add timeseries
+
+Revision ID: f7b3e8a1c590
+Revises: 0e6a93c4d815
+Create Date: 2026-10-18 17:48:22.615032
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f7b3e8a1c590"
+down_revision: Union[str, None] = "0e6a93c4d815"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "timeseries",
+        sa.Column("run_id", sa.VARCHAR, nullable=False),
+        sa.Column("container_id", sa.VARCHAR, nullable=False),
+        sa.Column("step", sa.INTEGER, nullable=False),
+        sa.Column("start_time", sa.DATETIME, nullable=False),
+        sa.Column("completions", sa.JSON, nullable=True),
+        sa.Column("bytes", sa.JSON, nullable=True),
+        sa.Column("errors", sa.JSON, nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("timeseries")
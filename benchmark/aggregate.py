@@ -1,30 +1,58 @@
+import collections
+import json
+import math
 import sqlite3
+import statistics
 from datetime import datetime, timedelta
 import requests
 import pandas as pd
 
+from benchmark import timeseries
+from benchmark.payload import UPLOAD_TESTS
 from benchmark.billing import get_ec2_billing_info, is_ec2
+from benchmark.failures import (
+    FailureClass,
+    histories_from_json,
+    merge_histories,
+)
+from benchmark.histogram import LatencyHistogram
+from benchmark.profiler import is_idle
+from benchmark.resources import rates, series_from_json
+from benchmark.scheduling import find_knee
 from benchmark.settings import get_settings
+from benchmark.timeseries import Series
+from benchmark.tracing import Phase, merge_phases, phases_from_json
+
+
+_prometheus_available = True
 
 
 def evaluate_metric(
     query: str, start: datetime, end: datetime, step: float = 1
 ) -> pd.DataFrame:
-    """Evaluate the given query between two time stamps."""
-    r = requests.get(
-        f"{get_settings().PROMETHEUS_BASE_URL}/api/v1/query_range",
-        params={
-            "query": query,
-            "start": start.isoformat() + "Z",
-            "end": end.isoformat() + "Z",
-            "step": step,
-        },
-    )
-    r.raise_for_status()
-    resp_json = r.json()
-
-    # Parse results
-    results = resp_json["data"]["result"][0]["values"]
+    """Evaluate the given query between two time stamps.  Empty if Prometheus isn't
+    running, metrics sampled by the runner are still reported."""
+    global _prometheus_available
+    results = []
+    if _prometheus_available:
+        try:
+            r = requests.get(
+                f"{get_settings().PROMETHEUS_BASE_URL}/api/v1/query_range",
+                params={
+                    "query": query,
+                    "start": start.isoformat() + "Z",
+                    "end": end.isoformat() + "Z",
+                    "step": step,
+                },
+            )
+        except requests.ConnectionError:
+            print("Prometheus is not running, skipping cAdvisor and client metrics")
+            _prometheus_available = False
+        else:
+            r.raise_for_status()
+            # Metrics which were never scraped have no results.
+            results = r.json()["data"]["result"]
+            results = results[0]["values"] if results else []
 
     data = []
     for time_step in results:
@@ -32,7 +60,271 @@ def evaluate_metric(
         value = float(time_step[1])
         data.append((time_stamp, value))
 
-    return pd.DataFrame(data, columns=["timestamp", "metric_value"])
+    return pd.DataFrame(data, columns=["timestamp", "metric_value"]).astype(
+        {"metric_value": float}
+    )
+
+
+def summarize_client_metrics(
+    selector: str,
+    by: str,
+    start: datetime,
+    end: datetime,
+    sampling_interval_seconds: int,
+) -> dict:
+    """Summarize client-side metrics exported by tests run with `--export-metrics`,
+    matching the given label selector.  Empty if the test didn't export metrics."""
+    queries = {
+        "requests_in_flight_": f"sum by ({by}) (benchmark_requests_in_flight{{{selector}}})",
+        "completed_per_second_": f"sum by ({by}) (rate(benchmark_requests_completed_total{{{selector}}}[{sampling_interval_seconds}s]))",
+        "response_bytes_per_second_": f"sum by ({by}) (rate(benchmark_response_bytes_total{{{selector}}}[{sampling_interval_seconds}s]))",
+        "errors_per_second_": f"sum by ({by}) (rate(benchmark_request_errors_total{{{selector}}}[{sampling_interval_seconds}s]))",
+    }
+    metrics = {}
+    for prefix, query in queries.items():
+        resp = evaluate_metric(query, start, end)
+        metrics.update(
+            resp["metric_value"].describe().add_prefix(prefix).transpose().to_dict()
+        )
+    return metrics
+
+
+def summarize_latency(latency: LatencyHistogram) -> dict:
+    """Latency percentiles in seconds."""
+    return {
+        "latency_p50_seconds": latency.percentile(50),
+        "latency_p90_seconds": latency.percentile(90),
+        "latency_p99_seconds": latency.percentile(99),
+        "latency_p999_seconds": latency.percentile(99.9),
+    }
+
+
+def summarize_phases(phases: dict[Phase, LatencyHistogram]) -> dict:
+    """Mean and percentiles of each request phase in seconds, phases which the client
+    doesn't expose are left empty."""
+    metrics = {}
+    for phase in Phase:
+        histogram = phases.get(phase, LatencyHistogram())
+        metrics[f"{phase.value}_mean_seconds"] = histogram.mean()
+        metrics[f"{phase.value}_p50_seconds"] = histogram.percentile(50)
+        metrics[f"{phase.value}_p99_seconds"] = histogram.percentile(99)
+    return metrics
+
+
+def summarize_loop(loop_lag: LatencyHistogram, blocking_stacks: dict) -> dict:
+    """Event loop lag percentiles and total time the event loop was blocked, in
+    seconds.  Only recorded by tests run with `--monitor-loop`."""
+    return {
+        "loop_lag_p50_seconds": loop_lag.percentile(50),
+        "loop_lag_p99_seconds": loop_lag.percentile(99),
+        "loop_lag_max_seconds": loop_lag.percentile(100),
+        "blocked_seconds": sum(blocking_stacks.values()),
+    }
+
+
+def summarize_resources(series: dict[str, list]) -> dict:
+    """CPU, memory and network usage of a container, from the samples taken by the
+    runner.  CPU is expressed as a percentage of one core."""
+    times = series["time"]
+
+    def mean_rate(column: str) -> float:
+        counters = [(t, c) for t, c in zip(times, series[column]) if c is not None]
+        if len(counters) < 2 or counters[-1][0] == counters[0][0]:
+            return float("nan")
+        return (counters[-1][1] - counters[0][1]) / (counters[-1][0] - counters[0][0])
+
+    def max_rate(column: str) -> float:
+        return max(rates(times, series[column]), default=float("nan"))
+
+    memory = [value for value in series["memory_current"] if value is not None]
+    working_set = [value for value in series["memory_working_set"] if value is not None]
+    # `memory.peak` covers the lifetime of the container, it only applies to this window
+    # if it grew during the window.
+    peaks = [value for value in series["memory_peak"] if value is not None]
+    window_peak = peaks[-1] if len(peaks) > 1 and peaks[-1] > peaks[0] else 0
+    return {
+        "cpu_percent": mean_rate("cpu_usec") / 1e4,
+        "cpu_percent_max": max_rate("cpu_usec") / 1e4,
+        "memory_peak_bytes": max(memory + [window_peak]) if memory else float("nan"),
+        "memory_working_set_bytes": (
+            sum(working_set) / len(working_set) if working_set else float("nan")
+        ),
+        "memory_working_set_bytes_max": max(working_set, default=float("nan")),
+        "network_rx_bytes_per_second": mean_rate("rx_bytes"),
+        "network_rx_bytes_per_second_max": max_rate("rx_bytes"),
+        "network_tx_bytes_per_second": mean_rate("tx_bytes"),
+        "network_tx_bytes_per_second_max": max_rate("tx_bytes"),
+    }
+
+
+def _network_bytes_column(test_name: str) -> str:
+    if test_name in UPLOAD_TESTS:
+        return "network_tx_bytes_per_second"
+    return "network_rx_bytes_per_second"
+
+
+def summarize_goodput(
+    payload_bytes: int, duration_seconds: float, network_bytes_per_second: float
+) -> dict:
+    """Payload bytes delivered to the application per second, and their ratio to bytes
+    received by the container, or transmitted by it for uploads."""
+    goodput = payload_bytes / duration_seconds
+    return {
+        "payload_bytes": payload_bytes,
+        "goodput_bytes_per_second": goodput,
+        "goodput_ratio": goodput / network_bytes_per_second
+        if network_bytes_per_second
+        else float("nan"),
+    }
+
+
+def summarize_client_cpu(
+    cpu_seconds: float | None, n_requests: int, payload_bytes: int
+) -> dict:
+    """CPU cost of the client per request and per MB of payload, and the requests per
+    second one core could sustain at that cost."""
+    nan = float("nan")
+    if not cpu_seconds:
+        return {
+            "client_cpu_seconds": nan,
+            "cpu_usec_per_request": nan,
+            "cpu_usec_per_mb": nan,
+            "max_requests_per_second_per_core": nan,
+        }
+    return {
+        "client_cpu_seconds": cpu_seconds,
+        "cpu_usec_per_request": cpu_seconds * 1e6 / n_requests if n_requests else nan,
+        "cpu_usec_per_mb": cpu_seconds * 1e12 / payload_bytes if payload_bytes else nan,
+        "max_requests_per_second_per_core": n_requests / cpu_seconds,
+    }
+
+
+def summarize_range_requests(
+    range_requests: int | None,
+    fetched_bytes: int | None,
+    n_requests: int,
+    payload_bytes: int,
+) -> dict:
+    """Range requests sent per test request, and bytes fetched but never used, for
+    tests which coalesce ranges."""
+    nan = float("nan")
+    if not range_requests:
+        return {
+            "range_requests": nan,
+            "range_requests_per_request": nan,
+            "fetched_bytes": nan,
+            "overfetched_bytes": nan,
+            "overfetch_ratio": nan,
+        }
+    overfetched_bytes = fetched_bytes - payload_bytes
+    return {
+        "range_requests": range_requests,
+        "range_requests_per_request": range_requests / n_requests
+        if n_requests
+        else nan,
+        "fetched_bytes": fetched_bytes,
+        "overfetched_bytes": overfetched_bytes,
+        "overfetch_ratio": overfetched_bytes / payload_bytes if payload_bytes else nan,
+    }
+
+
+def summarize_body_buffers(
+    body_allocations: int | None, body_copies: int | None, n_requests: int
+) -> dict:
+    """Body buffers allocated and bodies copied per request, see
+    `benchmark.buffers`."""
+    nan = float("nan")
+    if not n_requests or pd.isna(body_allocations) or pd.isna(body_copies):
+        return {"allocations_per_request": nan, "copies_per_request": nan}
+    return {
+        "allocations_per_request": body_allocations / n_requests,
+        "copies_per_request": body_copies / n_requests,
+    }
+
+
+def summarize_listing(
+    listed_objects: int | None,
+    list_pages: int | None,
+    largest_list_batch: int | None,
+    cpu_seconds: float | None,
+    duration_seconds: float,
+) -> dict:
+    """Objects listed per second, CPU per page listed, and whether the library handed
+    back the listing a page at a time, see `benchmark.listing`."""
+    nan = float("nan")
+    if pd.isna(listed_objects) or pd.isna(list_pages) or not list_pages:
+        return {
+            "listed_objects": nan,
+            "list_pages": nan,
+            "largest_list_batch": nan,
+            "objects_listed_per_second": nan,
+            "cpu_usec_per_page": nan,
+            "streams_pages": None,
+        }
+    return {
+        "listed_objects": listed_objects,
+        "list_pages": list_pages,
+        "largest_list_batch": largest_list_batch,
+        "objects_listed_per_second": listed_objects / duration_seconds,
+        "cpu_usec_per_page": cpu_seconds * 1e6 / list_pages if cpu_seconds else nan,
+        # Buffered listings come back in one batch, larger than any page.
+        "streams_pages": bool(
+            largest_list_batch <= math.ceil(listed_objects / list_pages)
+        ),
+    }
+
+
+def summarize_timeseries(buckets: dict[Series, list[int]]) -> dict:
+    """Throughput once warmed up, how much it varied from second to second, and how
+    long it took to reach its peak."""
+    completions = timeseries.steady_state(buckets[Series.completions])
+    nan = float("nan")
+    mean = statistics.fmean(completions) if completions else nan
+    stdev = statistics.stdev(completions) if len(completions) > 1 else nan
+    return {
+        "steady_state_requests_per_second": mean,
+        "steady_state_requests_per_second_stdev": stdev,
+        "steady_state_requests_per_second_cv": stdev / mean if mean else nan,
+        "steady_state_payload_bytes_per_second": (
+            statistics.fmean(timeseries.steady_state(buckets[Series.bytes]))
+            if completions
+            else nan
+        ),
+        "steady_state_errors_per_second": (
+            statistics.fmean(timeseries.steady_state(buckets[Series.errors]))
+            if completions
+            else nan
+        ),
+        "peak_requests_per_second": max(buckets[Series.completions], default=nan),
+        "time_to_peak_seconds": timeseries.time_to_peak(buckets[Series.completions]),
+    }
+
+
+# Runs where at least this fraction of requests failed are flagged as `failing_fast`,
+# their throughput mostly measures how quickly the client gives up.
+FAILING_FAST_FRACTION: float = 0.5
+
+
+def summarize_failures(
+    history: dict[FailureClass, list[int]], n_requests: int, duration_seconds: float
+) -> dict:
+    """Failures of each class, and successful requests per second."""
+    totals = {
+        failure_class: sum(history.get(failure_class, []))
+        for failure_class in FailureClass
+    }
+    n_failures = sum(totals.values())
+    failure_fraction = n_failures / n_requests if n_requests else float("nan")
+    return {
+        **{
+            f"failures_{failure_class.value}": count
+            for failure_class, count in totals.items()
+        },
+        "dominant_failure": max(totals, key=totals.get).value if n_failures else None,
+        "failure_fraction": failure_fraction,
+        "failing_fast": failure_fraction >= FAILING_FAST_FRACTION,
+        "successful_requests_per_second": (n_requests - n_failures) / duration_seconds,
+    }
 
 
 def fetch_test_runs() -> list[sqlite3.Row]:
@@ -48,9 +340,29 @@ def fetch_test_runs() -> list[sqlite3.Row]:
     return rows
 
 
+def fetch_timeseries() -> dict[tuple, tuple[datetime, dict[Series, list[int]]]]:
+    """Start time and per-second buckets of each worker, keyed by run id, container id
+    and step."""
+    with sqlite3.connect(get_settings().DB_FILEPATH) as conn:
+        conn.row_factory = sqlite3.Row
+        cur = conn.cursor()
+        cur.execute("SELECT * FROM timeseries")
+        rows = cur.fetchall()
+        cur.close()
+
+    return {
+        (row["run_id"], row["container_id"], row["step"]): (
+            datetime.strptime(row["start_time"], "%Y-%m-%d %H:%M:%S.%f"),
+            timeseries.buckets_from_row(row),
+        )
+        for row in rows
+    }
+
+
 def summarize_test_results_workers(sampling_interval_seconds: int):
     """Summarize metrics for individual workers across all test runs."""
     test_runs = fetch_test_runs()
+    all_timeseries = fetch_timeseries()
 
     results = []
     for run in test_runs:
@@ -88,7 +400,9 @@ def summarize_test_results_workers(sampling_interval_seconds: int):
         )
 
         # Memory
-        memory_query = f'sum by (id) (rate(container_memory_usage_bytes{{id="{container_id}"}}[{sampling_interval_seconds}s]))'
+        memory_query = (
+            f'sum by (id) (container_memory_usage_bytes{{id="{container_id}"}})'
+        )
         resp = evaluate_metric(memory_query, promql_start_time, end_time)
         memory_usage_metrics = (
             resp["metric_value"]
@@ -110,17 +424,113 @@ def summarize_test_results_workers(sampling_interval_seconds: int):
             .to_dict()
         )
 
+        # Sampled by the runner
+        resource_metrics = summarize_resources(
+            series_from_json(run["resource_samples"])
+        )
+
+        # Client-side metrics
+        client_metrics = summarize_client_metrics(
+            f'container_id="{run["container_id"]}"',
+            "container_id",
+            promql_start_time,
+            end_time,
+            sampling_interval_seconds,
+        )
+
+        # Request latency
+        latency_metrics = summarize_latency(
+            LatencyHistogram.from_json(run["latency_histogram"])
+        )
+        phase_metrics = summarize_phases(phases_from_json(run["phase_histograms"]))
+        loop_metrics = summarize_loop(
+            LatencyHistogram.from_json(run["loop_lag_histogram"]),
+            json.loads(run["blocking_stacks"] or "{}"),
+        )
+
+        # Concurrency limit that the limiter ended on.
+        limit_history = json.loads(run["concurrency_limit_history"] or "[]")
+
         duration_seconds = (end_time - start_time).total_seconds()
         requests_per_second = run["number_requests"] / duration_seconds
+        failure_metrics = summarize_failures(
+            histories_from_json(run["failure_history"]),
+            run["number_requests"],
+            duration_seconds,
+        )
+        goodput_metrics = summarize_goodput(
+            run["payload_bytes"] or 0,
+            duration_seconds,
+            resource_metrics[_network_bytes_column(run["test_name"])],
+        )
+        _, buckets = all_timeseries.get(
+            (run["run_id"], run["container_id"], run["step"]),
+            (start_time, timeseries.merge_buckets([])),
+        )
+        timeseries_metrics = summarize_timeseries(buckets)
+        client_cpu_metrics = summarize_client_cpu(
+            run["cpu_seconds"], run["number_requests"], run["payload_bytes"] or 0
+        )
+        range_metrics = summarize_range_requests(
+            run["range_requests"],
+            run["fetched_bytes"],
+            run["number_requests"],
+            run["payload_bytes"] or 0,
+        )
+        buffer_metrics = summarize_body_buffers(
+            run["body_allocations"], run["body_copies"], run["number_requests"]
+        )
+        listing_metrics = summarize_listing(
+            run["listed_objects"],
+            run["list_pages"],
+            run["largest_list_batch"],
+            run["cpu_seconds"],
+            duration_seconds,
+        )
 
         all_metrics = {
-            **run,
+            **{
+                k: run[k]
+                for k in run.keys()
+                if k
+                not in (
+                    "latency_histogram",
+                    "concurrency_limit_history",
+                    "phase_histograms",
+                    "loop_lag_histogram",
+                    "blocking_stacks",
+                    "profile_stacks",
+                    "failure_history",
+                    "resource_samples",
+                    "cpu_seconds",
+                    "range_requests",
+                    "fetched_bytes",
+                    "body_allocations",
+                    "body_copies",
+                    "listed_objects",
+                    "list_pages",
+                    "largest_list_batch",
+                )
+            },
+            "concurrency_limit": limit_history[-1] if limit_history else None,
+            **latency_metrics,
+            **phase_metrics,
+            **loop_metrics,
             **throughput_metrics,
             **cpu_metrics,
             **network_per_cpu_metrics,
             **memory_usage_metrics,
+            **resource_metrics,
+            **client_metrics,
             "duration_seconds": duration_seconds,
             "requests_per_second": requests_per_second,
+            **timeseries_metrics,
+            **goodput_metrics,
+            **client_cpu_metrics,
+            **range_metrics,
+            **buffer_metrics,
+            **listing_metrics,
+            **failure_metrics,
         }
 
         if is_ec2():
@@ -136,13 +546,14 @@ def summarize_test_results_workers(sampling_interval_seconds: int):
 def summarize_test_results_deployment(sampling_interval_seconds: int) -> pd.DataFrame:
     """Summarize metrics for individual deployments (multiple workers) across all test runs."""
     test_runs = fetch_test_runs()
+    all_timeseries = fetch_timeseries()
     df = pd.DataFrame.from_records([dict(run) for run in test_runs])
     df["start_time"] = pd.to_datetime(df["start_time"])
     df["end_time"] = pd.to_datetime(df["end_time"])
-    grouped = df.groupby("run_id")
+    grouped = df.groupby(["run_id", "step"])
 
     results = []
-    for run_id, group in grouped:
+    for (run_id, step), group in grouped:
         start_time = group["start_time"].min()
         end_time = group["end_time"].max()
 
@@ -172,7 +583,7 @@ def summarize_test_results_deployment(sampling_interval_seconds: int) -> pd.Data
         )
 
         # Memory
-        memory_query = f'sum by (container_label_RUN_ID) (rate(container_memory_usage_bytes{{container_label_RUN_ID="{run_id}"}}[{sampling_interval_seconds}s]))'
+        memory_query = f'sum by (container_label_RUN_ID) (container_memory_usage_bytes{{container_label_RUN_ID="{run_id}"}})'
         resp = evaluate_metric(memory_query, promql_start_time, end_time)
         memory_usage_metrics = (
             resp["metric_value"]
@@ -194,9 +605,100 @@ def summarize_test_results_deployment(sampling_interval_seconds: int) -> pd.Data
             .to_dict()
         )
 
+        # Sampled by the runner in each container, and summed across containers.
+        resource_metrics = (
+            pd.DataFrame.from_records(
+                [
+                    summarize_resources(series_from_json(data))
+                    for data in group["resource_samples"]
+                ]
+            )
+            .sum(min_count=1)
+            .to_dict()
+        )
+
+        # Client-side metrics
+        client_metrics = summarize_client_metrics(
+            f'container_label_RUN_ID="{run_id}"',
+            "container_label_RUN_ID",
+            promql_start_time,
+            end_time,
+            sampling_interval_seconds,
+        )
+
+        # Request latency, merged across all workers.
+        latency = LatencyHistogram()
+        for data in group["latency_histogram"]:
+            latency.merge(LatencyHistogram.from_json(data))
+        latency_metrics = summarize_latency(latency)
+        phase_metrics = summarize_phases(
+            merge_phases([phases_from_json(data) for data in group["phase_histograms"]])
+        )
+        loop_lag = LatencyHistogram()
+        for data in group["loop_lag_histogram"]:
+            loop_lag.merge(LatencyHistogram.from_json(data))
+        blocking_stacks = collections.Counter()
+        for data in group["blocking_stacks"]:
+            blocking_stacks.update(json.loads(data or "{}"))
+        loop_metrics = summarize_loop(loop_lag, blocking_stacks)
+
         duration_seconds = (end_time - start_time).total_seconds()
         num_requests = int(group["number_requests"].sum())
         requests_per_second = num_requests / duration_seconds
+        failure_metrics = summarize_failures(
+            merge_histories(
+                [histories_from_json(data) for data in group["failure_history"]]
+            ),
+            num_requests,
+            duration_seconds,
+        )
+        goodput_metrics = summarize_goodput(
+            int(group["payload_bytes"].fillna(0).sum()),
+            duration_seconds,
+            resource_metrics.get(
+                _network_bytes_column(group.iloc[0].test_name), float("nan")
+            ),
+        )
+        client_cpu_metrics = summarize_client_cpu(
+            float(group["cpu_seconds"].fillna(0).sum()),
+            num_requests,
+            int(group["payload_bytes"].fillna(0).sum()),
+        )
+        range_metrics = summarize_range_requests(
+            int(group["range_requests"].fillna(0).sum()),
+            int(group["fetched_bytes"].fillna(0).sum()),
+            num_requests,
+            int(group["payload_bytes"].fillna(0).sum()),
+        )
+        buffer_metrics = summarize_body_buffers(
+            # NaN unless some worker counted its bodies.
+            group["body_allocations"].sum(min_count=1),
+            group["body_copies"].sum(min_count=1),
+            num_requests,
+        )
+        listing_metrics = summarize_listing(
+            # NaN unless some worker listed a prefix.
+            group["listed_objects"].sum(min_count=1),
+            group["list_pages"].sum(min_count=1),
+            group["largest_list_batch"].max(),
+            float(group["cpu_seconds"].fillna(0).sum()),
+            duration_seconds,
+        )
+
+        # Per-second buckets of each container, aligned by when they started.
+        worker_timeseries = [
+            all_timeseries[key]
+            for key in zip(group["run_id"], group["container_id"], group["step"])
+            if key in all_timeseries
+        ]
+        timeseries_metrics = summarize_timeseries(
+            timeseries.merge_buckets(
+                [buckets for _, buckets in worker_timeseries],
+                timeseries.start_offsets([start for start, _ in worker_timeseries])
+                if worker_timeseries
+                else None,
+            )
+        )
 
         group.drop(["container_id"], axis=1, inplace=True)
         all_metrics = {
@@ -207,17 +709,45 @@ def summarize_test_results_deployment(sampling_interval_seconds: int) -> pd.Data
             "end_time": end_time.strftime("%Y-%m-%d %H:%M:%S.%f"),
             "number_requests": num_requests,
             "number_failures": int(group["number_failures"].sum()),
+            "number_dropped": int(group["number_dropped"].sum()),
+            "number_delayed": int(group["number_delayed"].sum()),
             "run_id": run_id,
+            "profile": group.iloc[0].profile,
+            "step": int(step),
+            "processes": int(group.iloc[0].processes),
             "pool_size": int(group.iloc[0].pool_size),
             "keep_alive": bool(group.iloc[0].keep_alive),
             "keep_alive_timeout_seconds": int(group.iloc[0].keep_alive_timeout_seconds),
             "use_dns_cache": bool(group.iloc[0].use_dns_cache),
+            "scheduler": group.iloc[0].scheduler,
+            "concurrency": int(group.iloc[0].concurrency),
+            "concurrency_limit": sum(
+                (json.loads(history or "[]") or [0])[-1]
+                for history in group["concurrency_limit_history"]
+            ),
+            "rate": float(group.iloc[0].rate),
+            "arrival": group.iloc[0].arrival,
+            "network_profile": group.iloc[0].network_profile,
             **throughput_metrics,
             **cpu_metrics,
             **network_per_cpu_metrics,
             **memory_usage_metrics,
+            **resource_metrics,
+            **client_metrics,
+            **latency_metrics,
+            **phase_metrics,
+            **loop_metrics,
             "duration_seconds": duration_seconds,
             "requests_per_second": requests_per_second,
+            **timeseries_metrics,
+            **goodput_metrics,
+            **client_cpu_metrics,
+            **range_metrics,
+            **buffer_metrics,
+            # NaN unless some worker buffered upload parts.
+            "buffered_part_bytes": group["buffered_part_bytes"].sum(min_count=1),
+            **listing_metrics,
+            **failure_metrics,
         }
         if is_ec2():
             b = get_ec2_billing_info()
@@ -227,3 +757,145 @@ def summarize_test_results_deployment(sampling_interval_seconds: int) -> pd.Data
         results.append(all_metrics)
 
     return pd.DataFrame.from_records(results)
+
+
+def summarize_saturation() -> pd.DataFrame:
+    """Find the best operating point of each test run with a load profile, the last
+    step before throughput stopped growing or p99 latency blew up."""
+    test_runs = fetch_test_runs()
+    df = pd.DataFrame.from_records([dict(run) for run in test_runs])
+    df = df[df["profile"] != "constant"]
+    df["start_time"] = pd.to_datetime(df["start_time"])
+    df["end_time"] = pd.to_datetime(df["end_time"])
+
+    results = []
+    for run_id, run in df.groupby("run_id"):
+        # Combine replicas within each step.
+        steps = []
+        for step, group in run.groupby("step"):
+            duration_seconds = (
+                group["end_time"].max() - group["start_time"].min()
+            ).total_seconds()
+            latency = LatencyHistogram()
+            for data in group["latency_histogram"]:
+                latency.merge(LatencyHistogram.from_json(data))
+            steps.append(
+                {
+                    "step": int(step),
+                    "concurrency": int(group["concurrency"].sum()),
+                    "rate": float(group["rate"].sum()),
+                    "requests_per_second": int(group["number_successes"].sum())
+                    / duration_seconds,
+                    "latency_p99_seconds": latency.percentile(99),
+                }
+            )
+
+        knee = find_knee(
+            [(s["requests_per_second"], s["latency_p99_seconds"]) for s in steps]
+        )
+        best = steps[knee - 1] if knee is not None else steps[-1]
+        results.append(
+            {
+                "library_name": run.iloc[0].library_name,
+                "test_name": run.iloc[0].test_name,
+                "test_params": run.iloc[0].test_params,
+                "run_id": run_id,
+                "scheduler": run.iloc[0].scheduler,
+                "profile": run.iloc[0].profile,
+                "number_steps": len(steps),
+                "saturated": knee is not None,
+                "best_step": best["step"],
+                "best_concurrency": best["concurrency"],
+                "best_rate": best["rate"],
+                "best_requests_per_second": best["requests_per_second"],
+                "best_latency_p99_seconds": best["latency_p99_seconds"],
+            }
+        )
+
+    return pd.DataFrame.from_records(results)
+
+
+def summarize_blocking(top_n: int = 10) -> pd.DataFrame:
+    """The `top_n` stacks which blocked the event loop for longest in each test run,
+    summed across containers and steps.  `call_site` is the innermost frame."""
+    test_runs = fetch_test_runs()
+    df = pd.DataFrame.from_records([dict(run) for run in test_runs])
+
+    results = []
+    for run_id, run in df.groupby("run_id"):
+        blocking_stacks = collections.Counter()
+        for data in run["blocking_stacks"]:
+            blocking_stacks.update(json.loads(data or "{}"))
+
+        for rank, (stack, blocked_seconds) in enumerate(
+            blocking_stacks.most_common(top_n), start=1
+        ):
+            results.append(
+                {
+                    "library_name": run.iloc[0].library_name,
+                    "test_name": run.iloc[0].test_name,
+                    "test_params": run.iloc[0].test_params,
+                    "run_id": run_id,
+                    "rank": rank,
+                    "blocked_seconds": blocked_seconds,
+                    "call_site": stack.split(";")[-1],
+                    "stack": stack,
+                }
+            )
+
+    return pd.DataFrame.from_records(results)
+
+
+def collect_profiles() -> dict[str, dict]:
+    """Collapsed stacks sampled by the profiler, summed across containers and steps,
+    for each test run with `--profiler`.  Keyed by `{library_name}_{test_name}_{run_id}`."""
+    test_runs = fetch_test_runs()
+
+    profiles = collections.defaultdict(collections.Counter)
+    for run in test_runs:
+        stacks = json.loads(run["profile_stacks"] or "{}")
+        if stacks:
+            key = f"{run['library_name']}_{run['test_name']}_{run['run_id']}"
+            profiles[key].update(stacks)
+    return dict(profiles)
+
+
+def summarize_hotspots(top_n: int = 20) -> pd.DataFrame:
+    """The `top_n` functions with the most samples in each library and test, across all
+    profiled runs.  Samples of idle threads are excluded.  `self_fraction` counts samples
+    in the function itself, `total_fraction` includes the functions it called."""
+    test_runs = fetch_test_runs()
+    df = pd.DataFrame.from_records([dict(run) for run in test_runs])
+
+    results = []
+    for (library_name, test_name), runs in df.groupby(["library_name", "test_name"]):
+        self_samples = collections.Counter()
+        total_samples = collections.Counter()
+        n_samples = 0
+        for data in runs["profile_stacks"]:
+            for stack, count in json.loads(data or "{}").items():
+                if is_idle(stack):
+                    continue
+                # Drop the thread name and line numbers.
+                functions = [frame.rsplit(":", 1)[0] for frame in stack.split(";")[1:]]
+                n_samples += count
+                self_samples[functions[-1]] += count
+                for function in set(functions):
+                    total_samples[function] += count
+
+        for rank, (function, count) in enumerate(
+            self_samples.most_common(top_n), start=1
+        ):
+            results.append(
+                {
+                    "library_name": library_name,
+                    "test_name": test_name,
+                    "rank": rank,
+                    "function": function,
+                    "samples": count,
+                    "self_fraction": count / n_samples,
+                    "total_fraction": total_samples[function] / n_samples,
+                }
+            )
+
+    return pd.DataFrame.from_records(results)
@@ -0,0 +1,159 @@
+"""Measure the CPU cost of each client, with the network taken out.
+
+Runs `fetch_range` and `cog_header` for every library against the local server on
+loopback, which replies from memory without any emulated latency.  The CPU time of the
+benchmark process while each test runs (measured by the scheduler) is then the cost of
+the client stack alone: building and signing requests, parsing responses, and copying
+bodies.  The server runs in separate processes, so isn't included.  `fetch_range` runs
+once per body mode, comparing bodies read into reused buffers with the default copies.
+
+The results are the ceiling of each library, the requests per second one core could
+sustain, and the CPU time per request and per MB of payload.
+"""
+
+import os
+import socket
+import tempfile
+import time
+from importlib import import_module
+
+import pandas as pd
+
+from benchmark import fixtures, server
+from benchmark.aggregate import summarize_body_buffers, summarize_client_cpu
+from benchmark.buffers import BodyMode
+from benchmark.clients import HttpClientConfig
+from benchmark.crud import WorkerState
+from benchmark.main import collect_tests
+from benchmark.scheduling import SchedulerConfig
+from benchmark.settings import get_settings
+
+
+BASELINE_TESTS: tuple[str, ...] = ("fetch_range", "cog_header")
+DEFAULT_REQUEST_SIZES: tuple[int, ...] = (16384, 1048576)
+DEFAULT_BODY_MODES: tuple[BodyMode, ...] = (BodyMode.copy, BodyMode.reuse)
+DEFAULT_PORT: int = 9800
+
+# The object read by the `fetch_range` and `cog_header` tests, replaced by a small
+# generated COG.
+BUCKET: str = "sentinel-cogs"
+KEY: str = "sentinel-s2-l2a-cogs/50/C/MA/2021/1/S2A_50CMA_20210121_0_L2A/B08.tif"
+OBJECT = fixtures.FixtureSpec("baseline-object", 2048, 2048, overviews=2)
+
+SERVER_START_TIMEOUT_SECONDS: int = 30
+
+
+def _wait_for_server(port: int) -> None:
+    deadline = time.monotonic() + SERVER_START_TIMEOUT_SECONDS
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port)).close()
+            return
+        except ConnectionRefusedError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def _summarize(
+    library_name: str, test_name: str, params: dict, state: WorkerState
+) -> dict:
+    duration_seconds = (state.end_time - state.start_time).total_seconds()
+    return {
+        "library_name": library_name,
+        "test_name": test_name,
+        "request_size": params.get("request_size"),
+        "body_mode": params.get("body_mode"),
+        "number_requests": state.n_requests,
+        "number_failures": state.n_failures,
+        "duration_seconds": duration_seconds,
+        "requests_per_second": state.n_requests / duration_seconds,
+        "payload_bytes": state.counts["payload_bytes"],
+        **summarize_client_cpu(
+            state.cpu_seconds, state.n_requests, state.counts["payload_bytes"]
+        ),
+        **summarize_body_buffers(
+            state.counts["body_allocations"],
+            state.counts["body_copies"],
+            state.n_requests,
+        ),
+    }
+
+
+def run_baseline(
+    n_requests: int,
+    client_config: HttpClientConfig,
+    scheduler_config: SchedulerConfig,
+    request_sizes: tuple[int, ...] = DEFAULT_REQUEST_SIZES,
+    libraries: tuple[str, ...] = (),
+    server_processes: int = 1,
+    port: int = DEFAULT_PORT,
+    body_modes: tuple[BodyMode, ...] = DEFAULT_BODY_MODES,
+) -> pd.DataFrame:
+    """Run the baseline tests of each library, or only `libraries`, one at a time in
+    this process."""
+    os.environ["S3_ENDPOINT_URL"] = f"http://127.0.0.1:{port}"
+    # The server doesn't check signatures, but clients which sign requests need
+    # credentials to sign them with.
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "baseline")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "baseline")
+    get_settings.cache_clear()
+
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, BUCKET, KEY)
+        os.makedirs(os.path.dirname(path))
+        fixtures.generate(OBJECT, path)
+        workers = server.start(root, "127.0.0.1", port, server_processes)
+        try:
+            _wait_for_server(port)
+            return pd.DataFrame.from_records(
+                _run_tests(
+                    n_requests,
+                    client_config,
+                    scheduler_config,
+                    request_sizes,
+                    libraries,
+                    body_modes,
+                )
+            )
+        finally:
+            for worker in workers:
+                worker.terminate()
+
+
+def _run_tests(
+    n_requests: int,
+    client_config: HttpClientConfig,
+    scheduler_config: SchedulerConfig,
+    request_sizes: tuple[int, ...],
+    libraries: tuple[str, ...],
+    body_modes: tuple[BodyMode, ...],
+) -> list[dict]:
+    results = []
+    for library_name, tests in sorted(collect_tests().items()):
+        if libraries and library_name not in libraries:
+            continue
+        for test_name in BASELINE_TESTS:
+            if test_name not in tests:
+                continue
+            all_params = (
+                [
+                    {"request_size": size, "body_mode": mode.value}
+                    for size in request_sizes
+                    for mode in body_modes
+                ]
+                if test_name == "fetch_range"
+                else [{}]
+            )
+            mod = import_module(f"benchmark.tests.{library_name}.{test_name}")
+            for params in all_params:
+                print(f"Running {library_name}.{test_name} {params}")
+                state = mod.main(
+                    client_config, n_requests, None, params, scheduler_config
+                )
+                # Load profiles return one state per step.
+                for step_state in state if isinstance(state, list) else [state]:
+                    results.append(
+                        _summarize(library_name, test_name, params, step_state)
+                    )
+    return results
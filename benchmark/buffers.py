@@ -0,0 +1,171 @@
+"""Read response bodies into reused buffers, and count the body buffers each request
+allocates.
+
+By default tests read each body the way a library hands it back, a new `bytes`
+object joined from the chunks read off the socket: one body-sized allocation and one
+copy per request.  With the `reuse` body mode, `fetch_range` tests copy the chunks
+into a buffer taken from a `BufferPool` instead, and obstore exposes the buffer it
+already holds through the buffer protocol without copying it at all.
+
+Only the body-sized buffers and copies which differ between the two modes are
+counted.  Both modes allocate the chunks a library reads off the socket, so those
+aren't.  Tests which don't count their bodies report neither.
+
+Upload tests which split objects into parts themselves hold each part in a
+`part_buffer`, counting the most bytes buffered at once.
+"""
+
+import contextlib
+import enum
+import threading
+import typing
+
+from benchmark import counters
+
+
+# Bytes read at a time by clients which are asked for a chunk size.
+CHUNK_SIZE: int = 2**16
+
+
+class BodyMode(str, enum.Enum):
+    copy = "copy"
+    reuse = "reuse"
+
+
+_lock = threading.Lock()
+_allocations: int | None = None
+_copies: int | None = None
+_part_bytes = 0
+_peak_part_bytes: int | None = None
+
+
+def reset() -> None:
+    global _allocations, _copies, _part_bytes, _peak_part_bytes
+    _allocations = None
+    _copies = None
+    _part_bytes = 0
+    _peak_part_bytes = None
+
+
+def allocated(n_buffers: int = 1) -> None:
+    global _allocations
+    with _lock:
+        _allocations = (_allocations or 0) + n_buffers
+
+
+def copied(n_copies: int = 1) -> None:
+    global _copies
+    with _lock:
+        _copies = (_copies or 0) + n_copies
+
+
+def new_body(data):
+    """Count a body returned as a new object, joined from the chunks the library read,
+    and return it."""
+    allocated()
+    copied()
+    return data
+
+
+def shared_body(data):
+    """Count a body exposed from the buffer the library read it into, which neither
+    allocates nor copies, and return it."""
+    allocated(0)
+    copied(0)
+    return data
+
+
+@contextlib.contextmanager
+def part_buffer(data: bytes, start: int, end: int) -> typing.Iterator[bytes]:
+    """A copy of `data[start:end]`, counted as buffered until the context exits."""
+    global _part_bytes, _peak_part_bytes
+    part = data[start:end]
+    with _lock:
+        _part_bytes += len(part)
+        _peak_part_bytes = max(_peak_part_bytes or 0, _part_bytes)
+    try:
+        yield part
+    finally:
+        with _lock:
+            _part_bytes -= len(part)
+
+
+def collect() -> counters.Counts:
+    """Body buffers allocated and bodies copied, if any body was counted, and the most
+    bytes held by part buffers at once, if any part was buffered, since the last
+    `reset`."""
+    return {
+        "body_allocations": _allocations,
+        "body_copies": _copies,
+        "buffered_part_bytes": _peak_part_bytes,
+    }
+
+
+counters.register(reset, collect)
+
+
+class BufferPool:
+    """Body buffers of `size` bytes, reused from one request to the next.  The pool
+    grows to the number of concurrent requests, so only allocates while warming up.
+    Synchronous clients take buffers from worker threads."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._free: list[bytearray] = []
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def buffer(self) -> typing.Iterator[bytearray]:
+        with self._lock:
+            buffer = self._free.pop() if self._free else None
+        if buffer is None:
+            buffer = bytearray(self.size)
+            allocated()
+        try:
+            yield buffer
+        finally:
+            with self._lock:
+                self._free.append(buffer)
+
+
+def fill(view: memoryview, offset: int, chunk) -> int:
+    """Copy `chunk` into `view` at `offset`, and return the offset after it."""
+    end = offset + len(chunk)
+    if end > len(view):
+        raise ValueError(f"Body is larger than the {len(view)} byte buffer")
+    view[offset:end] = chunk
+    return end
+
+
+async def read_into(chunks: typing.AsyncIterable[bytes], view: memoryview) -> int:
+    """Copy the chunks of a body into `view`, and return their size."""
+    n_bytes = 0
+    async for chunk in chunks:
+        n_bytes = fill(view, n_bytes, chunk)
+    return n_bytes
+
+
+def copy_into(chunks: typing.Iterable[bytes], view: memoryview) -> int:
+    """`read_into`, for synchronous clients."""
+    n_bytes = 0
+    for chunk in chunks:
+        n_bytes = fill(view, n_bytes, chunk)
+    return n_bytes
+
+
+async def read_chunks(
+    chunks: typing.AsyncIterable[bytes], buffer: bytearray
+) -> memoryview:
+    """Copy the chunks of a body into `buffer`, and return the part of it they filled."""
+    view = memoryview(buffer)
+    n_bytes = await read_into(chunks, view)
+    copied()
+    return view[:n_bytes]
+
+
+def copy_chunks(chunks: typing.Iterable[bytes], buffer: bytearray) -> memoryview:
+    """`read_chunks`, for synchronous clients."""
+    view = memoryview(buffer)
+    n_bytes = copy_into(chunks, view)
+    copied()
+    return view[:n_bytes]
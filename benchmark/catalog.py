@@ -0,0 +1,169 @@
+"""A catalog of many objects, read by the `catalog_scan` and `head_object` tests.
+
+Reading one key over and over hides the cost of cold object metadata, and of the
+connection pool and DNS cache when requests spread over many objects, as in a mosaic
+service reading a few tiles of thousands of items.  A catalog lists the keys to read:
+
+    {"bucket": "benchmark-fixtures", "header_size_bytes": 1250, "keys": ["catalog/..."]}
+
+`benchmark generate-catalog ROOT` writes one small COG under `N` keys of the fixtures
+bucket, as hard links so the catalog takes the disk space of one file, and the catalog
+listing them at `{root}/{bucket}/catalog.json`.  A catalog of objects elsewhere, like
+the items of a STAC collection, only needs the JSON.
+
+A `KeySampler` picks the key of each request, from the first `n_keys` keys of the
+catalog (the key cardinality) following an order:
+
+- `scan` - every key once, in a shuffled order, before any key is read again.
+- `uniform` - keys are equally likely, so are sometimes read again soon.
+- `zipf` - a few keys are read most of the time, other keys are rarely reused.
+"""
+
+import enum
+import itertools
+import json
+import os
+import random
+import shutil
+import threading
+import typing
+import urllib.request
+from dataclasses import dataclass
+
+from benchmark import clients, fixtures
+
+
+CATALOG_KEY: str = "catalog.json"
+DEFAULT_CATALOG_SIZE: int = 10_000
+# Keys are grouped below prefixes of this many keys, like the items of a catalog split
+# by date or grid cell.
+KEYS_PER_PREFIX: int = 1000
+
+# Object stored under every key of a generated catalog.
+CATALOG_OBJECT = fixtures.FixtureSpec(
+    "catalog-item", 1024, 1024, tile_size=256, overviews=2
+)
+
+DEFAULT_ZIPF_EXPONENT: float = 1.1
+SEED: int = 0
+
+
+class KeyOrder(str, enum.Enum):
+    scan = "scan"
+    uniform = "uniform"
+    zipf = "zipf"
+
+
+@dataclass(frozen=True)
+class Catalog:
+    bucket: str
+    # Bytes covering the header of every object, read by `catalog_scan` when opening
+    # each object.
+    header_size_bytes: int
+    keys: list[str]
+
+
+def catalog_key(idx: int) -> str:
+    return f"catalog/{idx // KEYS_PER_PREFIX:04d}/{idx:06d}.tif"
+
+
+def generate_catalog(
+    root: str,
+    bucket: str = fixtures.FIXTURES_BUCKET,
+    n_keys: int = DEFAULT_CATALOG_SIZE,
+) -> Catalog:
+    """Write `n_keys` copies of a small COG below `{root}/{bucket}/catalog/`, and the
+    catalog listing them."""
+    directory = os.path.join(root, bucket)
+    keys = [catalog_key(idx) for idx in range(n_keys)]
+    source = os.path.join(directory, keys[0])
+    os.makedirs(os.path.dirname(source), exist_ok=True)
+    fixture = fixtures.generate(CATALOG_OBJECT, source)
+    for key in keys[1:]:
+        path = os.path.join(directory, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            os.remove(path)
+        try:
+            os.link(source, path)
+        except OSError:
+            # Hard links aren't supported by every filesystem.
+            shutil.copyfile(source, path)
+    catalog = Catalog(bucket, fixture.header_size_bytes, keys)
+    with open(os.path.join(directory, CATALOG_KEY), "w") as f:
+        json.dump(
+            {
+                "bucket": bucket,
+                "header_size_bytes": catalog.header_size_bytes,
+                "keys": keys,
+            },
+            f,
+        )
+    return catalog
+
+
+def parse_catalog(data: str | bytes) -> Catalog:
+    catalog = json.loads(data)
+    return Catalog(
+        catalog["bucket"],
+        catalog.get("header_size_bytes", fixtures.DEFAULT_PREFETCH_BYTES),
+        catalog["keys"],
+    )
+
+
+def fetch_catalog(key: str = CATALOG_KEY) -> Catalog:
+    """Read a catalog from the fixtures bucket, for the libraries that only read
+    TIFFs.  Not part of the measured requests."""
+    with urllib.request.urlopen(clients.object_url(fixtures.FIXTURES_BUCKET, key)) as r:
+        return parse_catalog(r.read())
+
+
+class KeySampler:
+    """Chooses the key of the next request.  Synchronous clients call `next` from
+    worker threads."""
+
+    def __init__(
+        self,
+        keys: typing.Sequence[str],
+        n_keys: int | None = None,
+        order: KeyOrder = KeyOrder.scan,
+        zipf_exponent: float = DEFAULT_ZIPF_EXPONENT,
+        seed: int | None = SEED,
+    ):
+        if n_keys is not None and n_keys > len(keys):
+            raise ValueError(f"The catalog only has {len(keys)} keys, not {n_keys}")
+        self.order = order
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        # Shuffled, so neither the keys read nor the popular keys follow the
+        # order of the catalog.
+        self._keys = list(keys[:n_keys])
+        self._random.shuffle(self._keys)
+        if order == KeyOrder.zipf:
+            self._cum_weights = list(
+                itertools.accumulate(
+                    1 / rank**zipf_exponent for rank in range(1, len(self._keys) + 1)
+                )
+            )
+        self._scan = itertools.cycle(self._keys)
+
+    @classmethod
+    def from_params(cls, keys: typing.Sequence[str], params: dict) -> "KeySampler":
+        """Sampler configured by the `params` of a `catalog_scan` or `head_object`
+        test."""
+        return cls(
+            keys,
+            params.get("n_keys"),
+            KeyOrder(params.get("order", KeyOrder.scan)),
+            params.get("zipf_exponent", DEFAULT_ZIPF_EXPONENT),
+            params.get("seed", SEED),
+        )
+
+    def next(self) -> str:
+        with self._lock:
+            if self.order == KeyOrder.zipf:
+                (key,) = self._random.choices(self._keys, cum_weights=self._cum_weights)
+                return key
+            if self.order == KeyOrder.uniform:
+                return self._random.choice(self._keys)
+            return next(self._scan)
@@ -5,20 +5,56 @@ import json
 
 import docker
 
-from benchmark import main
+from benchmark import (
+    baseline,
+    catalog,
+    fixtures,
+    listing,
+    main,
+    server,
+    splits,
+    uploads,
+)
 from benchmark.docker_utils import block_until_container_exits
 from benchmark.aggregate import (
     summarize_test_results_workers,
     summarize_test_results_deployment,
+    summarize_saturation,
+    summarize_blocking,
+    summarize_hotspots,
+    collect_profiles,
 )
+from benchmark.buffers import BodyMode
 from benchmark.clients import (
     HttpClientConfig,
     DEFAULT_USE_DNS_CACHE,
+    DEFAULT_TRACE_PHASES,
     DEFAULT_KEEP_ALIVE,
     DEFAULT_KEEP_ALIVE_TIMEOUT_SECONDS,
     DEFAULT_POOL_SIZE_PER_HOST,
 )
+from benchmark.loop_monitor import DEFAULT_BLOCKING_THRESHOLD_MS
+from benchmark.metrics import DEFAULT_EXPORT_METRICS
+from benchmark.network import NetworkProfileName, profile_port
+from benchmark.profiler import DEFAULT_PROFILER_FREQUENCY
 from benchmark.parameterize import TestConfig
+from benchmark.scheduling import (
+    ArrivalProcess,
+    LoadProfile,
+    SchedulerConfig,
+    SchedulerName,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_DRAIN_TIMEOUT_SECONDS,
+    DEFAULT_RATE,
+    DEFAULT_STEP_DURATION_SECONDS,
+    DEFAULT_MAX_STEPS,
+    DEFAULT_STEP_FACTOR,
+)
+from benchmark.synchronization import (
+    LimiterName,
+    DEFAULT_MIN_LIMIT,
+    DEFAULT_MAX_LIMIT,
+)
 
 
 @click.group
@@ -33,6 +69,12 @@ def client_options(f):
         "--keep-alive-timeout", type=int, default=DEFAULT_KEEP_ALIVE_TIMEOUT_SECONDS
     )
     @click.option("--use-dns-cache", type=bool, default=DEFAULT_USE_DNS_CACHE)
+    @click.option(
+        "--trace-phases",
+        type=bool,
+        default=DEFAULT_TRACE_PHASES,
+        help="Time the DNS, connect, TLS, time to first byte and body phases of each request.",
+    )
     @functools.wraps(f)
     def wrapper_common_options(*args, **kwargs):
         return f(*args, **kwargs)
@@ -40,29 +82,158 @@ def client_options(f):
     return wrapper_common_options
 
 
+def scheduler_options(f):
+    @click.option(
+        "--scheduler",
+        type=click.Choice([s.value for s in SchedulerName]),
+        default=SchedulerName.gather.value,
+    )
+    @click.option(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Number of concurrent workers for the `closed_loop` scheduler, or maximum requests in flight for the `open_loop` scheduler.",
+    )
+    @click.option("--drain-timeout", type=int, default=DEFAULT_DRAIN_TIMEOUT_SECONDS)
+    @click.option(
+        "--rate",
+        type=float,
+        default=DEFAULT_RATE,
+        help="Target requests per second, only used by the `open_loop` scheduler.",
+    )
+    @click.option(
+        "--arrival",
+        type=click.Choice([a.value for a in ArrivalProcess]),
+        default=ArrivalProcess.constant.value,
+    )
+    @click.option(
+        "--profile",
+        type=click.Choice([p.value for p in LoadProfile]),
+        default=LoadProfile.constant.value,
+        help="Increase the load in steps until the library saturates.",
+    )
+    @click.option("--step-duration", type=int, default=DEFAULT_STEP_DURATION_SECONDS)
+    @click.option("--max-steps", type=int, default=DEFAULT_MAX_STEPS)
+    @click.option("--step-factor", type=float, default=DEFAULT_STEP_FACTOR)
+    @click.option(
+        "--limiter",
+        type=click.Choice([limiter.value for limiter in LimiterName]),
+        default=LimiterName.fixed.value,
+        help="Adjust the concurrency limit of each test from observed latency and errors.",
+    )
+    @click.option("--min-limit", type=int, default=DEFAULT_MIN_LIMIT)
+    @click.option("--max-limit", type=int, default=DEFAULT_MAX_LIMIT)
+    @click.option(
+        "--monitor-loop",
+        type=bool,
+        default=False,
+        help="Measure event loop lag and sample stacks which block the event loop.",
+    )
+    @click.option(
+        "--blocking-threshold",
+        type=int,
+        default=DEFAULT_BLOCKING_THRESHOLD_MS,
+        help="Milliseconds the event loop must be blocked for before sampling its stack.",
+    )
+    @click.option(
+        "--profiler",
+        type=bool,
+        default=False,
+        help="Sample the stacks of the benchmark process, for flamegraphs.",
+    )
+    @click.option(
+        "--profiler-frequency",
+        type=int,
+        default=DEFAULT_PROFILER_FREQUENCY,
+        help="Stack samples per second.",
+    )
+    @functools.wraps(f)
+    def wrapper_scheduler_options(*args, **kwargs):
+        return f(*args, **kwargs)
+
+    return wrapper_scheduler_options
+
+
 @app.command
 @click.argument("library_name")
 @click.argument("test_name")
 @click.option("--replicas", type=int, default=1)
+@click.option(
+    "--processes",
+    type=int,
+    default=1,
+    help="Number of processes per replica, each with its own event loop.",
+)
+@click.option(
+    "--export-metrics",
+    type=bool,
+    default=DEFAULT_EXPORT_METRICS,
+    help="Serve client-side metrics to prometheus while the test runs.",
+)
 @click.option("--n-requests", type=int, default=1000)
 @click.option("--timeout", type=int, default=-1)
+@click.option(
+    "--network-profile",
+    type=click.Choice([p.value for p in NetworkProfileName]),
+    default=None,
+    help="Network conditions emulated by the local server at `S3_ENDPOINT_URL`.",
+)
 @click.option(
     "--debug", is_flag=True, show_default=True, default=False, help="Debug mode"
 )
 @client_options
+@scheduler_options
 def run_test(
     library_name: str,
     test_name: str,
     replicas: int = 1,
+    processes: int = 1,
+    export_metrics: bool = DEFAULT_EXPORT_METRICS,
     n_requests: int = 1000,
     timeout: int = -1,
+    network_profile: str | None = None,
     debug: bool = False,
     pool_size: int = DEFAULT_POOL_SIZE_PER_HOST,
     keep_alive: bool = DEFAULT_KEEP_ALIVE,
     keep_alive_timeout: int = DEFAULT_KEEP_ALIVE_TIMEOUT_SECONDS,
     use_dns_cache: bool = DEFAULT_USE_DNS_CACHE,
+    trace_phases: bool = DEFAULT_TRACE_PHASES,
+    scheduler: str = SchedulerName.gather.value,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    drain_timeout: int = DEFAULT_DRAIN_TIMEOUT_SECONDS,
+    rate: float = DEFAULT_RATE,
+    arrival: str = ArrivalProcess.constant.value,
+    profile: str = LoadProfile.constant.value,
+    step_duration: int = DEFAULT_STEP_DURATION_SECONDS,
+    max_steps: int = DEFAULT_MAX_STEPS,
+    step_factor: float = DEFAULT_STEP_FACTOR,
+    limiter: str = LimiterName.fixed.value,
+    min_limit: int = DEFAULT_MIN_LIMIT,
+    max_limit: int = DEFAULT_MAX_LIMIT,
+    monitor_loop: bool = False,
+    blocking_threshold: int = DEFAULT_BLOCKING_THRESHOLD_MS,
+    profiler: bool = False,
+    profiler_frequency: int = DEFAULT_PROFILER_FREQUENCY,
 ):
     """Run a single test."""
+    scheduler_config = SchedulerConfig(
+        scheduler=SchedulerName(scheduler),
+        concurrency=concurrency,
+        drain_timeout_seconds=drain_timeout,
+        rate=rate,
+        arrival=ArrivalProcess(arrival),
+        profile=LoadProfile(profile),
+        step_duration_seconds=step_duration,
+        max_steps=max_steps,
+        step_factor=step_factor,
+        limiter=LimiterName(limiter),
+        min_limit=min_limit,
+        max_limit=max_limit,
+        monitor_loop=monitor_loop,
+        blocking_threshold_ms=blocking_threshold,
+        profiler=profiler,
+        profiler_frequency=profiler_frequency,
+    )
     main.run_test_docker(
         library_name,
         test_name,
@@ -74,7 +245,12 @@ def run_test(
         keep_alive,
         keep_alive_timeout,
         use_dns_cache,
+        trace_phases,
         {},
+        scheduler_config,
+        processes,
+        export_metrics,
+        NetworkProfileName(network_profile) if network_profile else None,
     )
 
 
@@ -83,24 +259,71 @@ def run_test(
 @click.option("--test-name", type=str)
 @click.option("--n-requests", type=int, default=1000)
 @click.option("--replicas", type=int, default=1)
+@click.option("--processes", type=int, default=1)
+@click.option("--export-metrics", type=bool, default=DEFAULT_EXPORT_METRICS)
 @click.option("--timeout", type=int, default=-1)
+@click.option(
+    "--network-profile",
+    type=click.Choice([p.value for p in NetworkProfileName]),
+    default=None,
+    help="Network conditions emulated by the local server at `S3_ENDPOINT_URL`.",
+)
 @click.option(
     "--debug", is_flag=True, show_default=True, default=False, help="Debug mode"
 )
 @client_options
+@scheduler_options
 def run_all(
     library_name: str,
     test_name: str,
     n_requests: int = 1000,
     replicas: int = 1,
+    processes: int = 1,
+    export_metrics: bool = DEFAULT_EXPORT_METRICS,
     timeout: int = -1,
+    network_profile: str | None = None,
     debug: bool = False,
     pool_size: int = DEFAULT_POOL_SIZE_PER_HOST,
     keep_alive: bool = DEFAULT_KEEP_ALIVE,
     keep_alive_timeout: int = DEFAULT_KEEP_ALIVE_TIMEOUT_SECONDS,
     use_dns_cache: bool = DEFAULT_USE_DNS_CACHE,
+    trace_phases: bool = DEFAULT_TRACE_PHASES,
+    scheduler: str = SchedulerName.gather.value,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    drain_timeout: int = DEFAULT_DRAIN_TIMEOUT_SECONDS,
+    rate: float = DEFAULT_RATE,
+    arrival: str = ArrivalProcess.constant.value,
+    profile: str = LoadProfile.constant.value,
+    step_duration: int = DEFAULT_STEP_DURATION_SECONDS,
+    max_steps: int = DEFAULT_MAX_STEPS,
+    step_factor: float = DEFAULT_STEP_FACTOR,
+    limiter: str = LimiterName.fixed.value,
+    min_limit: int = DEFAULT_MIN_LIMIT,
+    max_limit: int = DEFAULT_MAX_LIMIT,
+    monitor_loop: bool = False,
+    blocking_threshold: int = DEFAULT_BLOCKING_THRESHOLD_MS,
+    profiler: bool = False,
+    profiler_frequency: int = DEFAULT_PROFILER_FREQUENCY,
 ):
     """Run all available tests."""
+    scheduler_config = SchedulerConfig(
+        scheduler=SchedulerName(scheduler),
+        concurrency=concurrency,
+        drain_timeout_seconds=drain_timeout,
+        rate=rate,
+        arrival=ArrivalProcess(arrival),
+        profile=LoadProfile(profile),
+        step_duration_seconds=step_duration,
+        max_steps=max_steps,
+        step_factor=step_factor,
+        limiter=LimiterName(limiter),
+        min_limit=min_limit,
+        max_limit=max_limit,
+        monitor_loop=monitor_loop,
+        blocking_threshold_ms=blocking_threshold,
+        profiler=profiler,
+        profiler_frequency=profiler_frequency,
+    )
     docker_client = docker.from_env()
 
     all_tests = main.collect_tests()
@@ -119,6 +342,12 @@ def run_all(
                 keep_alive,
                 keep_alive_timeout,
                 use_dns_cache,
+                trace_phases,
+                {},
+                scheduler_config,
+                processes,
+                export_metrics,
+                NetworkProfileName(network_profile) if network_profile else None,
             )
 
             block_until_container_exits(docker_client)
@@ -142,6 +371,365 @@ def get_results(folder_path: str, sampling_interval: int = 5):
     summarize_test_results_deployment(sampling_interval).to_csv(
         os.path.join(folder_path, "aggregated_results.csv"), header=True, index=False
     )
+    summarize_saturation().to_csv(
+        os.path.join(folder_path, "saturation_results.csv"), header=True, index=False
+    )
+    summarize_blocking().to_csv(
+        os.path.join(folder_path, "blocking_results.csv"), header=True, index=False
+    )
+    summarize_hotspots().to_csv(
+        os.path.join(folder_path, "hotspot_results.csv"), header=True, index=False
+    )
+
+    # Collapsed stacks, for flamegraph.pl or speedscope.
+    profiles = collect_profiles()
+    if profiles:
+        os.makedirs(os.path.join(folder_path, "flamegraphs"), exist_ok=True)
+    for name, stacks in profiles.items():
+        with open(os.path.join(folder_path, "flamegraphs", f"{name}.folded"), "w") as f:
+            for stack, count in stacks.items():
+                f.write(f"{stack} {count}\n")
+
+
+@app.command
+@click.argument("root", type=click.Path(exists=True, file_okay=False, readable=True))
+@click.option("--host", type=str, default=server.DEFAULT_HOST)
+@click.option("--port", type=int, default=server.DEFAULT_PORT)
+@click.option(
+    "--processes",
+    type=int,
+    default=1,
+    help="Processes serving requests, sharing the port.",
+)
+def serve(
+    root: str,
+    host: str = server.DEFAULT_HOST,
+    port: int = server.DEFAULT_PORT,
+    processes: int = 1,
+):
+    """Serve files below ROOT (`{root}/{bucket}/{key}`) as a local S3-compatible server.
+    Point tests at it by setting `S3_ENDPOINT_URL`."""
+    print(f"Serving {root} on http://{host}:{port}")
+    for name in NetworkProfileName:
+        print(f"Emulating {name.value} on http://{host}:{profile_port(port, name)}")
+    server.serve(root, host, port, processes)
+
+
+@app.command
+@click.argument("root", type=click.Path(file_okay=False, writable=True))
+@click.option("--bucket", type=str, default=fixtures.FIXTURES_BUCKET)
+@click.option(
+    "--fixture",
+    "names",
+    type=click.Choice([spec.name for spec in fixtures.DEFAULT_FIXTURES]),
+    multiple=True,
+    help="Only generate these fixtures, may be repeated.",
+)
+def generate_fixtures(
+    root: str, bucket: str = fixtures.FIXTURES_BUCKET, names: tuple[str, ...] = ()
+):
+    """Generate synthetic COGs below ROOT/BUCKET, and a manifest describing them, to be
+    served by `benchmark serve ROOT`."""
+    specs = [
+        spec for spec in fixtures.DEFAULT_FIXTURES if not names or spec.name in names
+    ]
+    for fixture in fixtures.generate_fixtures(root, bucket, specs):
+        print(
+            f"{fixture.key}: {fixture.size_bytes} bytes, "
+            f"{fixture.header_size_bytes} byte header, {fixture.ifd_count} IFDs"
+        )
+
+
+@app.command
+@click.argument("root", type=click.Path(file_okay=False, writable=True))
+@click.option("--bucket", type=str, default=fixtures.FIXTURES_BUCKET)
+@click.option("--n-keys", type=int, default=catalog.DEFAULT_CATALOG_SIZE)
+def generate_catalog(
+    root: str,
+    bucket: str = fixtures.FIXTURES_BUCKET,
+    n_keys: int = catalog.DEFAULT_CATALOG_SIZE,
+):
+    """Write N_KEYS copies of a small COG below ROOT/BUCKET/catalog/, and the catalog
+    read by the `catalog_scan` tests, to be served by `benchmark serve ROOT`."""
+    result = catalog.generate_catalog(root, bucket, n_keys)
+    print(
+        f"{bucket}/{catalog.CATALOG_KEY}: {len(result.keys)} keys, "
+        f"{result.header_size_bytes} byte header"
+    )
+
+
+@app.command
+@click.argument("root", type=click.Path(file_okay=False, writable=True))
+@click.option("--bucket", type=str, default=fixtures.FIXTURES_BUCKET)
+@click.option(
+    "--prefix-size",
+    "prefix_sizes",
+    type=int,
+    multiple=True,
+    default=listing.DEFAULT_PREFIX_SIZES,
+    help="Number of keys below each prefix, may be repeated.",
+)
+def generate_listing(
+    root: str,
+    bucket: str = fixtures.FIXTURES_BUCKET,
+    prefix_sizes: tuple[int, ...] = listing.DEFAULT_PREFIX_SIZES,
+):
+    """Write empty objects below ROOT/BUCKET/listing/PREFIX_SIZE/ for each prefix size,
+    listed by the `list_prefix` tests when served by `benchmark serve ROOT`."""
+    listing.generate_listing(root, bucket, prefix_sizes)
+    for prefix_size in prefix_sizes:
+        print(f"{bucket}/{listing.listing_prefix(prefix_size)}: {prefix_size} keys")
+
+
+@app.command
+@click.argument("folder_path", type=click.Path(file_okay=False, writable=True))
+@click.option("--n-requests", type=int, default=1000)
+@click.option("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+@click.option(
+    "--request-size",
+    "request_sizes",
+    type=int,
+    multiple=True,
+    default=baseline.DEFAULT_REQUEST_SIZES,
+    help="Range size of the fetch_range tests, may be repeated.",
+)
+@click.option(
+    "--body-mode",
+    "body_modes",
+    type=click.Choice([mode.value for mode in BodyMode]),
+    multiple=True,
+    default=[mode.value for mode in baseline.DEFAULT_BODY_MODES],
+    help="How the fetch_range tests read response bodies, may be repeated.",
+)
+@click.option(
+    "--library",
+    "libraries",
+    type=str,
+    multiple=True,
+    help="Only run the tests of these libraries, may be repeated.",
+)
+@click.option("--server-processes", type=int, default=1)
+@click.option("--port", type=int, default=baseline.DEFAULT_PORT)
+@client_options
+def run_baseline(
+    folder_path: str,
+    n_requests: int = 1000,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    request_sizes: tuple[int, ...] = baseline.DEFAULT_REQUEST_SIZES,
+    body_modes: tuple[str, ...] = (),
+    libraries: tuple[str, ...] = (),
+    server_processes: int = 1,
+    port: int = baseline.DEFAULT_PORT,
+    pool_size: int = DEFAULT_POOL_SIZE_PER_HOST,
+    keep_alive: bool = DEFAULT_KEEP_ALIVE,
+    keep_alive_timeout: int = DEFAULT_KEEP_ALIVE_TIMEOUT_SECONDS,
+    use_dns_cache: bool = DEFAULT_USE_DNS_CACHE,
+    trace_phases: bool = DEFAULT_TRACE_PHASES,
+):
+    """Measure the client CPU time per request of each library against a local server
+    on loopback, and save it to FOLDER_PATH/baseline_results.csv."""
+    client_config = HttpClientConfig(
+        pool_size_per_host=pool_size,
+        keep_alive=keep_alive,
+        keep_alive_timeout_seconds=keep_alive_timeout,
+        use_dns_cache=use_dns_cache,
+        trace_phases=trace_phases,
+    )
+    results = baseline.run_baseline(
+        n_requests,
+        client_config,
+        SchedulerConfig(scheduler=SchedulerName.closed_loop, concurrency=concurrency),
+        request_sizes,
+        libraries,
+        server_processes,
+        port,
+        tuple(BodyMode(mode) for mode in body_modes),
+    )
+    os.makedirs(folder_path, exist_ok=True)
+    results.to_csv(
+        os.path.join(folder_path, "baseline_results.csv"), header=True, index=False
+    )
+    print(results.to_string(index=False))
+
+
+@app.command
+@click.argument("folder_path", type=click.Path(file_okay=False, writable=True))
+@click.option("--n-requests", type=int, default=100)
+@click.option("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+@click.option(
+    "--request-size",
+    "request_sizes",
+    type=int,
+    multiple=True,
+    default=splits.DEFAULT_REQUEST_SIZES,
+    help="Size of each read, may be repeated.",
+)
+@click.option(
+    "--parts",
+    type=int,
+    multiple=True,
+    default=splits.DEFAULT_PARTS,
+    help="Number of parts to split reads into, may be repeated.",
+)
+@click.option(
+    "--part-size",
+    "part_sizes",
+    type=int,
+    multiple=True,
+    default=splits.DEFAULT_PART_SIZES,
+    help="Size of the parts to split reads into, may be repeated.",
+)
+@click.option(
+    "--library",
+    "libraries",
+    type=str,
+    multiple=True,
+    help="Only run the tests of these libraries, may be repeated.",
+)
+@client_options
+def run_split_sweep(
+    folder_path: str,
+    n_requests: int = 100,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    request_sizes: tuple[int, ...] = splits.DEFAULT_REQUEST_SIZES,
+    parts: tuple[int, ...] = splits.DEFAULT_PARTS,
+    part_sizes: tuple[int, ...] = splits.DEFAULT_PART_SIZES,
+    libraries: tuple[str, ...] = (),
+    pool_size: int = DEFAULT_POOL_SIZE_PER_HOST,
+    keep_alive: bool = DEFAULT_KEEP_ALIVE,
+    keep_alive_timeout: int = DEFAULT_KEEP_ALIVE_TIMEOUT_SECONDS,
+    use_dns_cache: bool = DEFAULT_USE_DNS_CACHE,
+    trace_phases: bool = DEFAULT_TRACE_PHASES,
+):
+    """Run `split_read` in this process for every split of each request size, against
+    `S3_ENDPOINT_URL` or S3, and save the fastest split of each library to
+    FOLDER_PATH/split_results.csv."""
+    client_config = HttpClientConfig(
+        pool_size_per_host=pool_size,
+        keep_alive=keep_alive,
+        keep_alive_timeout_seconds=keep_alive_timeout,
+        use_dns_cache=use_dns_cache,
+        trace_phases=trace_phases,
+    )
+    results = splits.run_sweep(
+        sorted(
+            library_name
+            for library_name, tests in main.collect_tests().items()
+            if splits.TEST_NAME in tests
+            and (not libraries or library_name in libraries)
+        ),
+        n_requests,
+        client_config,
+        SchedulerConfig(scheduler=SchedulerName.closed_loop, concurrency=concurrency),
+        request_sizes,
+        parts,
+        part_sizes,
+    )
+    os.makedirs(folder_path, exist_ok=True)
+    results.to_csv(
+        os.path.join(folder_path, "split_sweep_results.csv"), header=True, index=False
+    )
+    fastest = splits.fastest(results)
+    fastest.to_csv(
+        os.path.join(folder_path, "split_results.csv"), header=True, index=False
+    )
+    print(fastest.to_string(index=False))
+
+
+@app.command
+@click.argument("folder_path", type=click.Path(file_okay=False, writable=True))
+@click.option("--n-requests", type=int, default=20)
+@click.option("--concurrency", type=int, default=10)
+@click.option(
+    "--object-size",
+    "object_sizes",
+    type=int,
+    multiple=True,
+    default=uploads.DEFAULT_OBJECT_SIZES,
+    help="Size of each uploaded object, may be repeated.",
+)
+@click.option(
+    "--part-size",
+    "part_sizes",
+    type=int,
+    multiple=True,
+    default=uploads.DEFAULT_PART_SIZES,
+    help="Size of the parts of multipart uploads, may be repeated.",
+)
+@click.option(
+    "--part-concurrency",
+    "part_concurrencies",
+    type=int,
+    multiple=True,
+    default=uploads.DEFAULT_PART_CONCURRENCIES,
+    help="Parts of one object uploaded at a time, may be repeated.",
+)
+@click.option(
+    "--test",
+    "test_names",
+    type=click.Choice(uploads.TEST_NAMES),
+    multiple=True,
+    help="Only run these upload tests, may be repeated.",
+)
+@click.option(
+    "--library",
+    "libraries",
+    type=str,
+    multiple=True,
+    help="Only run the tests of these libraries, may be repeated.",
+)
+@client_options
+def run_upload_sweep(
+    folder_path: str,
+    n_requests: int = 20,
+    concurrency: int = 10,
+    object_sizes: tuple[int, ...] = uploads.DEFAULT_OBJECT_SIZES,
+    part_sizes: tuple[int, ...] = uploads.DEFAULT_PART_SIZES,
+    part_concurrencies: tuple[int, ...] = uploads.DEFAULT_PART_CONCURRENCIES,
+    test_names: tuple[str, ...] = (),
+    libraries: tuple[str, ...] = (),
+    pool_size: int = DEFAULT_POOL_SIZE_PER_HOST,
+    keep_alive: bool = DEFAULT_KEEP_ALIVE,
+    keep_alive_timeout: int = DEFAULT_KEEP_ALIVE_TIMEOUT_SECONDS,
+    use_dns_cache: bool = DEFAULT_USE_DNS_CACHE,
+    trace_phases: bool = DEFAULT_TRACE_PHASES,
+):
+    """Run the upload tests in this process, signed and unsigned, for each object size,
+    part size and part concurrency, against `S3_ENDPOINT_URL` or S3.  Saves the upload
+    throughput and CPU spent on signing of each library to
+    FOLDER_PATH/upload_results.csv."""
+    client_config = HttpClientConfig(
+        pool_size_per_host=pool_size,
+        keep_alive=keep_alive,
+        keep_alive_timeout_seconds=keep_alive_timeout,
+        use_dns_cache=use_dns_cache,
+        trace_phases=trace_phases,
+    )
+    test_names = test_names or uploads.TEST_NAMES
+    results = uploads.run_sweep(
+        sorted(
+            library_name
+            for library_name, tests in main.collect_tests().items()
+            if all(test_name in tests for test_name in test_names)
+            and (not libraries or library_name in libraries)
+        ),
+        test_names,
+        n_requests,
+        client_config,
+        SchedulerConfig(scheduler=SchedulerName.closed_loop, concurrency=concurrency),
+        object_sizes,
+        part_sizes,
+        part_concurrencies,
+    )
+    os.makedirs(folder_path, exist_ok=True)
+    results.to_csv(
+        os.path.join(folder_path, "upload_sweep_results.csv"), header=True, index=False
+    )
+    overhead = uploads.signing_overhead(results)
+    overhead.to_csv(
+        os.path.join(folder_path, "upload_results.csv"), header=True, index=False
+    )
+    print(overhead.to_string(index=False))
 
 
 @app.command
@@ -159,17 +747,39 @@ def run_parameterized_test(config_file_path: str):
 @click.argument("run_id")
 @click.option("--n-requests", type=int, default=1000)
 @click.option("--timeout", type=int, default=-1)
+@click.option("--processes", type=int, default=1)
+@click.option("--export-metrics", type=bool, default=DEFAULT_EXPORT_METRICS)
 @client_options
+@scheduler_options
 def docker_entrypoint(
     library_name: str,
     test_name: str,
     run_id: str,
     n_requests: int = 1000,
     timeout: int = -1,
+    processes: int = 1,
+    export_metrics: bool = DEFAULT_EXPORT_METRICS,
     pool_size: int = DEFAULT_POOL_SIZE_PER_HOST,
     keep_alive: bool = DEFAULT_KEEP_ALIVE,
     keep_alive_timeout: int = DEFAULT_KEEP_ALIVE_TIMEOUT_SECONDS,
     use_dns_cache: bool = DEFAULT_USE_DNS_CACHE,
+    trace_phases: bool = DEFAULT_TRACE_PHASES,
+    scheduler: str = SchedulerName.gather.value,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    drain_timeout: int = DEFAULT_DRAIN_TIMEOUT_SECONDS,
+    rate: float = DEFAULT_RATE,
+    arrival: str = ArrivalProcess.constant.value,
+    profile: str = LoadProfile.constant.value,
+    step_duration: int = DEFAULT_STEP_DURATION_SECONDS,
+    max_steps: int = DEFAULT_MAX_STEPS,
+    step_factor: float = DEFAULT_STEP_FACTOR,
+    limiter: str = LimiterName.fixed.value,
+    min_limit: int = DEFAULT_MIN_LIMIT,
+    max_limit: int = DEFAULT_MAX_LIMIT,
+    monitor_loop: bool = False,
+    blocking_threshold: int = DEFAULT_BLOCKING_THRESHOLD_MS,
+    profiler: bool = False,
+    profiler_frequency: int = DEFAULT_PROFILER_FREQUENCY,
 ):
     """Docker entrypoint, don't call this directly."""
     client_config = HttpClientConfig(
@@ -177,9 +787,36 @@ def docker_entrypoint(
         keep_alive=keep_alive,
         keep_alive_timeout_seconds=keep_alive_timeout,
         use_dns_cache=use_dns_cache,
+        trace_phases=trace_phases,
     )
-    test_params = os.getenv("TEST_PARAMS", str({})).replace("'", '"')
-    test_params = json.loads(test_params[1:-1])
+    scheduler_config = SchedulerConfig(
+        scheduler=SchedulerName(scheduler),
+        concurrency=concurrency,
+        drain_timeout_seconds=drain_timeout,
+        rate=rate,
+        arrival=ArrivalProcess(arrival),
+        profile=LoadProfile(profile),
+        step_duration_seconds=step_duration,
+        max_steps=max_steps,
+        step_factor=step_factor,
+        limiter=LimiterName(limiter),
+        min_limit=min_limit,
+        max_limit=max_limit,
+        monitor_loop=monitor_loop,
+        blocking_threshold_ms=blocking_threshold,
+        profiler=profiler,
+        profiler_frequency=profiler_frequency,
+    )
+    test_params = json.loads(os.getenv("TEST_PARAMS", "{}"))
     main.run_test(
-        library_name, test_name, run_id, n_requests, timeout, client_config, test_params
+        library_name,
+        test_name,
+        run_id,
+        n_requests,
+        timeout,
+        client_config,
+        test_params,
+        scheduler_config,
+        processes,
+        export_metrics,
     )
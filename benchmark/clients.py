@@ -1,6 +1,8 @@
 import asyncio
+import urllib.parse
 from dataclasses import dataclass
 import aioboto3
+import aiobotocore.session
 import aiohttp
 import async_tiff.store
 import httpx
@@ -9,11 +11,19 @@ import botocore.config
 import s3fs
 import obstore as obs
 
+from benchmark import tracing
+from benchmark.network import NetworkProfileName, profile_port
+from benchmark.settings import get_settings
+
 
 DEFAULT_POOL_SIZE_PER_HOST: int = 100
 DEFAULT_KEEP_ALIVE: bool = True
 DEFAULT_KEEP_ALIVE_TIMEOUT_SECONDS: int = 30
 DEFAULT_USE_DNS_CACHE: bool = True
+DEFAULT_TRACE_PHASES: bool = False
+
+# Namespace of the elements of S3 XML responses, as used by `ElementTree`.
+S3_NAMESPACE: str = "{http://s3.amazonaws.com/doc/2006-03-01/}"
 
 
 @dataclass
@@ -27,6 +37,27 @@ class HttpClientConfig:
     keep_alive: bool = DEFAULT_KEEP_ALIVE
     keep_alive_timeout_seconds: int = DEFAULT_KEEP_ALIVE_TIMEOUT_SECONDS
     use_dns_cache: bool = DEFAULT_USE_DNS_CACHE
+    trace_phases: bool = DEFAULT_TRACE_PHASES
+
+
+def endpoint_url() -> str | None:
+    """Endpoint of the S3-compatible server set by `S3_ENDPOINT_URL`, if any.  When
+    `NETWORK_PROFILE` is set, the port of the local server emulating that profile."""
+    settings = get_settings()
+    endpoint = settings.S3_ENDPOINT_URL.rstrip("/")
+    if not endpoint or not settings.NETWORK_PROFILE:
+        return endpoint or None
+    url = urllib.parse.urlsplit(endpoint)
+    port = url.port or (443 if url.scheme == "https" else 80)
+    port = profile_port(port, NetworkProfileName(settings.NETWORK_PROFILE))
+    return url._replace(netloc=f"{url.hostname}:{port}").geturl()
+
+
+def object_url(bucket: str, key: str) -> str:
+    """URL of an object for plain HTTP clients, path-style when using `endpoint_url`."""
+    if endpoint := endpoint_url():
+        return f"{endpoint}/{bucket}/{key}"
+    return f"https://{bucket}.s3.amazonaws.com/{key}"
 
 
 def create_httpx_client(config: HttpClientConfig, **kwargs) -> httpx.Client:
@@ -35,6 +66,8 @@ def create_httpx_client(config: HttpClientConfig, **kwargs) -> httpx.Client:
         max_keepalive_connections=config.pool_size_per_host,
         keepalive_expiry=config.keep_alive_timeout_seconds,
     )
+    if config.trace_phases:
+        kwargs["event_hooks"] = tracing.httpx_event_hooks()
     return httpx.AsyncClient(limits=limits, **kwargs)
 
 
@@ -46,6 +79,8 @@ def create_aiohttp_client(config: HttpClientConfig, **kwargs) -> aiohttp.ClientS
         keepalive_timeout=config.keep_alive_timeout_seconds,
         use_dns_cache=config.use_dns_cache,
     )
+    if config.trace_phases:
+        kwargs["trace_configs"] = [tracing.aiohttp_trace_config()]
     return aiohttp.ClientSession(connector=connector, **kwargs)
 
 
@@ -57,18 +92,22 @@ def create_requests_session(config: HttpClientConfig) -> requests.Session:
     )
     session.mount("http://", adapter)
     session.mount("https://", adapter)
+    if config.trace_phases:
+        session.hooks.update(tracing.requests_hooks())
     return session
 
 
 def create_aioboto3_s3_client(config: HttpClientConfig, region_name: str, **kwargs):
     session = aioboto3.Session()
+    if config.trace_phases:
+        tracing.register_botocore_events(session.events)
     botocore_config = botocore.config.Config(
         max_pool_connections=config.pool_size_per_host,
         tcp_keepalive=config.keep_alive,
         region_name=region_name,
         **kwargs,
     )
-    return session.client("s3", config=botocore_config)
+    return session.client("s3", config=botocore_config, endpoint_url=endpoint_url())
 
 
 def create_fsspec_s3(config: HttpClientConfig, region_name: str, **kwargs):
@@ -78,20 +117,43 @@ def create_fsspec_s3(config: HttpClientConfig, region_name: str, **kwargs):
         "region_name": region_name,
         **kwargs,
     }
+    filesystem_kwargs = {}
+    if config.trace_phases:
+        session = aiobotocore.session.AioSession()
+        tracing.register_botocore_events(session.get_component("event_emitter"))
+        filesystem_kwargs["session"] = session
+    if endpoint := endpoint_url():
+        filesystem_kwargs["endpoint_url"] = endpoint
+    # Instances are cached across event loops, tests which run more than once in the
+    # same process need a filesystem bound to the current loop.
     return s3fs.S3FileSystem(
         asynchronous=True,
         loop=asyncio.get_running_loop(),
+        skip_instance_cache=True,
         config_kwargs=botocore_config,
-        **kwargs,
+        **filesystem_kwargs,
     )
 
 
 def create_obstore_store(
-    config: HttpClientConfig, bucket: str, region_name: str, **kwargs
+    config: HttpClientConfig,
+    bucket: str,
+    region_name: str,
+    skip_signature: bool = True,
+    **kwargs,
 ) -> obs.store.S3Store:
+    if config.trace_phases:
+        tracing.enable()
+    store_config = {
+        "aws_default_region": region_name,
+        "aws_skip_signature": skip_signature,
+    }
+    if endpoint := endpoint_url():
+        store_config["aws_endpoint"] = endpoint
+        kwargs["allow_http"] = "true"
     return obs.store.S3Store(
         bucket,
-        config={"aws_default_region": region_name, "aws_skip_signature": True},
+        config=store_config,
         client_options={
             "pool_max_idle_per_host": str(config.pool_size_per_host),
             "http2_keep_alive_timeout": str(config.keep_alive_timeout_seconds) + "s",
@@ -103,13 +165,33 @@ def create_obstore_store(
 def create_async_tiff_s3_store(
     config: HttpClientConfig, bucket: str, region_name: str, **kwargs
 ) -> async_tiff.store.S3Store:
+    if config.trace_phases:
+        tracing.enable()
+    store_config = {}
+    if endpoint := endpoint_url():
+        store_config["endpoint"] = endpoint
+        kwargs["allow_http"] = "true"
     return async_tiff.store.S3Store(
         bucket,
         region=region_name,
         skip_signature=True,
+        **store_config,
         client_options={
             "pool_max_idle_per_host": str(config.pool_size_per_host),
             "http2_keep_alive_timeout": str(config.keep_alive_timeout_seconds) + "s",
             **kwargs,
         },
     )
+
+
+def gdal_options(**options) -> dict:
+    """GDAL configuration options for `rasterio.Env`, pointing `/vsis3/` at
+    `endpoint_url` when set."""
+    if endpoint := endpoint_url():
+        scheme, _, host = endpoint.partition("://")
+        options |= {
+            "AWS_S3_ENDPOINT": host,
+            "AWS_HTTPS": "YES" if scheme == "https" else "NO",
+            "AWS_VIRTUAL_HOSTING": "FALSE",
+        }
+    return options
@@ -0,0 +1,62 @@
+"""Collect the counts of modules which count what tests do during a run.
+
+Modules such as `benchmark.payload` count in module globals, as tests call them from
+deep inside request code.  Each registers a `reset`, called before every run, and a
+`collect` returning its counts by column of the `workers` table.  `schedule` stores the
+collected counts on the `WorkerState`, so a new count only needs a column and a
+registration.
+"""
+
+import typing
+
+
+Counts = dict[str, int | None]
+
+_resets: list[typing.Callable[[], None]] = []
+_collects: list[typing.Callable[[], Counts]] = []
+# Counts merged across workers by their maximum rather than their sum.
+_maxima: set[str] = set()
+
+
+def register(
+    reset: typing.Callable[[], None],
+    collect: typing.Callable[[], Counts],
+    maxima: tuple[str, ...] = (),
+) -> None:
+    _resets.append(reset)
+    _collects.append(collect)
+    _maxima.update(maxima)
+
+
+def reset() -> None:
+    for reset_counts in _resets:
+        reset_counts()
+
+
+def collect() -> Counts:
+    """Counts of every registered module since the last `reset`."""
+    counts: Counts = {}
+    for collect_counts in _collects:
+        counts.update(collect_counts())
+    return counts
+
+
+def merge_counts(counts: list[int | None]) -> int | None:
+    """Combine the counts of workers which ran at the same time."""
+    counted = [count for count in counts if count is not None]
+    return sum(counted) if counted else None
+
+
+def merge(states_counts: list[Counts]) -> Counts:
+    """Combine the collected counts of workers which ran at the same time."""
+    names = dict.fromkeys(name for counts in states_counts for name in counts)
+    merged: Counts = {}
+    for name in names:
+        values = [counts.get(name) for counts in states_counts]
+        if name in _maxima:
+            merged[name] = max(
+                (value for value in values if value is not None), default=None
+            )
+        else:
+            merged[name] = merge_counts(values)
+    return merged
@@ -1,9 +1,17 @@
+import collections
 import sqlite3
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+import itertools
 import json
 
+from benchmark import counters
 from benchmark.clients import HttpClientConfig
+from benchmark.failures import FailureClass, histories_to_json, merge_histories
+from benchmark.histogram import LatencyHistogram
+from benchmark.resources import series_to_json
+from benchmark.timeseries import Series, buckets_to_json, merge_buckets
+from benchmark.tracing import Phase, merge_phases, phases_to_json
 
 
 @dataclass
@@ -12,12 +20,71 @@ class WorkerState:
     end_time: datetime
     n_requests: int
     n_failures: int
+    n_dropped: int = 0
+    n_delayed: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    concurrency: int | None = None
+    rate: float | None = None
+    step: int = 0
+    limit_history: list[int] = field(default_factory=list)
+    phases: dict[Phase, LatencyHistogram] = field(default_factory=dict)
+    loop_lag: LatencyHistogram = field(default_factory=LatencyHistogram)
+    blocking_stacks: dict[str, float] = field(default_factory=dict)
+    profile_stacks: dict[str, int] = field(default_factory=dict)
+    failures: dict[FailureClass, list[int]] = field(default_factory=dict)
+    timeseries: dict[Series, list[int]] = field(default_factory=dict)
+    # CPU time of the benchmark process while requests were sent, from all threads.
+    cpu_seconds: float = 0.0
+    # Counts by column of the `workers` table, such as payload bytes and range
+    # requests, see `benchmark.counters`.
+    counts: counters.Counts = field(default_factory=dict)
+    # Sampled for the whole container by the runner, see `benchmark.resources`.
+    resources: dict[str, list] = field(default_factory=dict)
 
     @property
     def n_successes(self) -> int:
         return self.n_requests - self.n_failures
 
 
+def merge_worker_states(states: list[WorkerState]) -> WorkerState:
+    """Combine the states of workers which ran at the same time."""
+    latency = LatencyHistogram()
+    loop_lag = LatencyHistogram()
+    blocking_stacks = collections.Counter()
+    profile_stacks = collections.Counter()
+    for state in states:
+        latency.merge(state.latency)
+        loop_lag.merge(state.loop_lag)
+        blocking_stacks.update(state.blocking_stacks)
+        profile_stacks.update(state.profile_stacks)
+    return WorkerState(
+        start_time=min(state.start_time for state in states),
+        end_time=max(state.end_time for state in states),
+        n_requests=sum(state.n_requests for state in states),
+        n_failures=sum(state.n_failures for state in states),
+        n_dropped=sum(state.n_dropped for state in states),
+        n_delayed=sum(state.n_delayed for state in states),
+        latency=latency,
+        concurrency=sum(state.concurrency for state in states),
+        rate=sum(state.rate for state in states),
+        step=states[0].step,
+        limit_history=[
+            sum(limits)
+            for limits in itertools.zip_longest(
+                *[state.limit_history for state in states], fillvalue=0
+            )
+        ],
+        phases=merge_phases([state.phases for state in states]),
+        loop_lag=loop_lag,
+        blocking_stacks=dict(blocking_stacks),
+        profile_stacks=dict(profile_stacks),
+        failures=merge_histories([state.failures for state in states]),
+        cpu_seconds=sum(state.cpu_seconds for state in states),
+        counts=counters.merge([state.counts for state in states]),
+        timeseries=merge_buckets([state.timeseries for state in states]),
+    )
+
+
 def insert_row(
     conn: sqlite3.Connection,
     library_name: str,
@@ -27,9 +94,50 @@ def insert_row(
     state: WorkerState,
     client_config: HttpClientConfig,
     test_params: dict,
+    scheduler: str,
+    arrival: str,
+    profile: str,
+    processes: int,
+    network_profile: str | None = None,
 ) -> None:
     # Track state about each worker
-    sql = "INSERT INTO workers VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)"
+    columns = (
+        "library_name",
+        "test_name",
+        "start_time",
+        "end_time",
+        "number_requests",
+        "number_failures",
+        "number_successes",
+        "container_id",
+        "run_id",
+        "pool_size",
+        "keep_alive",
+        "keep_alive_timeout_seconds",
+        "use_dns_cache",
+        "test_params",
+        "scheduler",
+        "concurrency",
+        "rate",
+        "arrival",
+        "number_dropped",
+        "number_delayed",
+        "latency_histogram",
+        "profile",
+        "step",
+        "processes",
+        "concurrency_limit_history",
+        "phase_histograms",
+        "loop_lag_histogram",
+        "blocking_stacks",
+        "profile_stacks",
+        "failure_history",
+        "resource_samples",
+        "network_profile",
+        "cpu_seconds",
+        *state.counts,
+    )
+    sql = f"INSERT INTO workers ({','.join(columns)}) VALUES ({','.join('?' * len(columns))})"
     cur = conn.cursor()
     cur.execute(
         sql,
@@ -48,7 +156,35 @@ def insert_row(
             client_config.keep_alive_timeout_seconds,
             client_config.use_dns_cache,
             json.dumps(test_params),
+            scheduler,
+            state.concurrency,
+            state.rate,
+            arrival,
+            state.n_dropped,
+            state.n_delayed,
+            state.latency.to_json(),
+            profile,
+            state.step,
+            processes,
+            json.dumps(state.limit_history),
+            phases_to_json(state.phases),
+            state.loop_lag.to_json(),
+            json.dumps(state.blocking_stacks),
+            json.dumps(state.profile_stacks),
+            histories_to_json(state.failures),
+            series_to_json(state.resources),
+            network_profile,
+            state.cpu_seconds,
+            *state.counts.values(),
         ),
     )
+
+    # Completions, bytes and errors per second
+    buckets = buckets_to_json(state.timeseries)
+    columns = ("run_id", "container_id", "step", "start_time", *buckets)
+    sql = f"INSERT INTO timeseries ({','.join(columns)}) VALUES ({','.join('?' * len(columns))})"
+    cur.execute(
+        sql, (run_id, container_id, state.step, state.start_time, *buckets.values())
+    )
     conn.commit()
     cur.close()
@@ -0,0 +1,177 @@
+"""Classify failed requests, and count each class of failure over time."""
+
+import collections
+import enum
+import errno
+import itertools
+import json
+import re
+import time
+
+import aiohttp
+import botocore.exceptions
+import httpx
+import requests
+import urllib3.exceptions
+
+from benchmark import timeseries
+
+
+class FailureClass(str, enum.Enum):
+    timeout = "timeout"
+    connection_reset = "connection_reset"
+    pool_exhausted = "pool_exhausted"
+    slow_down = "slow_down"
+    http_4xx = "http_4xx"
+    http_5xx = "http_5xx"
+    client_exception = "client_exception"
+    # Requests still running when the scheduler stopped waiting for them.
+    cancelled = "cancelled"
+
+
+# Waiting for a connection from the pool, or running out of the sockets and ports
+# which back it.
+_POOL_EXHAUSTED_ERRORS = (
+    httpx.PoolTimeout,
+    urllib3.exceptions.EmptyPoolError,
+)
+_POOL_EXHAUSTED_ERRNOS = (errno.EMFILE, errno.ENFILE, errno.EADDRNOTAVAIL)
+
+_TIMEOUT_ERRORS = (
+    TimeoutError,
+    httpx.TimeoutException,
+    requests.Timeout,
+    botocore.exceptions.ReadTimeoutError,
+    botocore.exceptions.ConnectTimeoutError,
+)
+_CONNECTION_ERRORS = (
+    ConnectionError,
+    aiohttp.ClientConnectionError,
+    aiohttp.ClientPayloadError,
+    httpx.NetworkError,
+    httpx.RemoteProtocolError,
+    requests.ConnectionError,
+    botocore.exceptions.ConnectionError,
+)
+
+# Errors raised by clients written in rust (`obstore` and `async_tiff`) only carry a
+# message.
+_STATUS_PATTERN = re.compile(r"\b([45]\d\d) [A-Z]")
+_TIMEOUT_PATTERN = re.compile(r"timed out|timeout", re.IGNORECASE)
+_CONNECTION_PATTERN = re.compile(
+    r"connection (reset|closed|refused)|broken pipe", re.IGNORECASE
+)
+
+
+def _status_code(exc: BaseException) -> int | None:
+    if isinstance(exc, aiohttp.ClientResponseError):
+        return exc.status
+    if isinstance(exc, (httpx.HTTPStatusError, requests.HTTPError)):
+        return exc.response.status_code if exc.response is not None else None
+    if isinstance(exc, botocore.exceptions.ClientError):
+        if exc.response.get("Error", {}).get("Code") == "SlowDown":
+            return 503
+        return exc.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+    return None
+
+
+def _classify_status(status: int) -> FailureClass:
+    if status == 503:
+        return FailureClass.slow_down
+    if status >= 500:
+        return FailureClass.http_5xx
+    return FailureClass.http_4xx
+
+
+def _classify_one(exc: BaseException) -> FailureClass:
+    if isinstance(exc, _POOL_EXHAUSTED_ERRORS) or (
+        isinstance(exc, OSError) and exc.errno in _POOL_EXHAUSTED_ERRNOS
+    ):
+        return FailureClass.pool_exhausted
+    if isinstance(exc, _TIMEOUT_ERRORS):
+        return FailureClass.timeout
+    if (status := _status_code(exc)) is not None:
+        return _classify_status(status)
+    if isinstance(exc, _CONNECTION_ERRORS):
+        return FailureClass.connection_reset
+
+    message = str(exc)
+    if "SlowDown" in message:
+        return FailureClass.slow_down
+    if match := _STATUS_PATTERN.search(message):
+        return _classify_status(int(match.group(1)))
+    if _TIMEOUT_PATTERN.search(message):
+        return FailureClass.timeout
+    if _CONNECTION_PATTERN.search(message):
+        return FailureClass.connection_reset
+    return FailureClass.client_exception
+
+
+def classify(exc: BaseException) -> FailureClass:
+    """Classify an exception raised by a request.  Clients often wrap the original
+    error, so the first exception in the chain of causes which can be classified wins."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        failure_class = _classify_one(exc)
+        if failure_class != FailureClass.client_exception:
+            return failure_class
+        exc = exc.__cause__ or exc.__context__
+    return FailureClass.client_exception
+
+
+_start_time = time.monotonic()
+_history: dict[FailureClass, list[int]] = collections.defaultdict(list)
+
+
+def reset() -> None:
+    global _start_time
+    _start_time = time.monotonic()
+    _history.clear()
+
+
+def record(exc: BaseException | None, count: int = 1) -> None:
+    """Count a failed request in the current second, `None` counts a cancelled
+    request."""
+    failure_class = FailureClass.cancelled if exc is None else classify(exc)
+    history = _history[failure_class]
+    second = int(time.monotonic() - _start_time)
+    if len(history) <= second:
+        history.extend([0] * (second + 1 - len(history)))
+    history[second] += count
+    timeseries.record(timeseries.Series.errors, count)
+
+
+def failure_history() -> dict[FailureClass, list[int]]:
+    """Failures of each class, per second since the last `reset`."""
+    return {failure_class: list(history) for failure_class, history in _history.items()}
+
+
+def merge_histories(
+    histories: list[dict[FailureClass, list[int]]],
+) -> dict[FailureClass, list[int]]:
+    """Sum the failures of each class per second, across workers which ran at the same
+    time."""
+    merged = {}
+    for failure_class in FailureClass:
+        counts = [
+            history[failure_class] for history in histories if failure_class in history
+        ]
+        if counts:
+            merged[failure_class] = [
+                sum(values) for values in itertools.zip_longest(*counts, fillvalue=0)
+            ]
+    return merged
+
+
+def histories_to_json(history: dict[FailureClass, list[int]]) -> str:
+    return json.dumps(
+        {failure_class.value: counts for failure_class, counts in history.items()}
+    )
+
+
+def histories_from_json(data: str | None) -> dict[FailureClass, list[int]]:
+    return {
+        FailureClass(failure_class): counts
+        for failure_class, counts in json.loads(data or "{}").items()
+    }
@@ -0,0 +1,362 @@
+"""Generate synthetic COGs, to test how libraries handle different file layouts.
+
+Every fixture is generated from a `FixtureSpec`, controlling the tile size, overview
+count, compression, band count and header layout.  Fixtures are written to
+`{root}/{bucket}/cogs/{name}.tif`, ready to be served by `benchmark serve ROOT`, along
+with a manifest at `{root}/{bucket}/manifest.json` describing each file.  Parameterized
+tests sweep over the fixtures in a manifest with `manifest: path/to/manifest.json`.
+
+Pixel values are a smooth pattern plus noise, generated from a fixed seed, so fixtures
+are reproducible and compress roughly as much as real imagery.
+"""
+
+import dataclasses
+import enum
+import json
+import os
+import struct
+import tempfile
+from dataclasses import dataclass
+
+import numpy as np
+from cog_layers.reader.cog import open_cog
+from cog_layers.reader.types import Cog
+import rasterio
+from affine import Affine
+import rasterio.shutil
+from rasterio.enums import Resampling
+from rasterio.windows import Window
+
+from benchmark.ranges import RangeRequest
+
+
+FIXTURES_BUCKET: str = "benchmark-fixtures"
+MANIFEST_KEY: str = "manifest.json"
+
+# Bytes read when opening a file, before the rest of the header if it is larger.
+DEFAULT_PREFETCH_BYTES: int = 16384
+
+SEED: int = 0
+
+# Georeferencing of every fixture, the top left corner of a UTM zone with 10m pixels
+# like Sentinel-2.
+CRS: str = "EPSG:32650"
+ORIGIN: tuple[float, float] = (399960.0, 1300020.0)
+RESOLUTION: float = 10.0
+
+
+class Compression(str, enum.Enum):
+    none = "none"
+    deflate = "deflate"
+    lzw = "lzw"
+    zstd = "zstd"
+    jpeg = "jpeg"
+
+
+class HeaderLayout(str, enum.Enum):
+    # All IFDs and tile indexes before the tile data, written by the COG driver.
+    cog = "cog"
+    # A tiled GeoTIFF with overviews added afterwards.  The IFDs of the overviews follow
+    # the full resolution tiles, so the header is spread across the file.
+    geotiff = "geotiff"
+
+
+@dataclass(frozen=True)
+class FixtureSpec:
+    name: str
+    width: int
+    height: int
+    tile_size: int = 512
+    overviews: int = 0
+    compression: Compression = Compression.deflate
+    bands: int = 1
+    dtype: str = "uint16"
+    layout: HeaderLayout = HeaderLayout.cog
+    # Fraction of tiles with data, the others are left out of the file.  Sparse files
+    # have large tile indexes, and so large headers, without large files.
+    filled_fraction: float = 1.0
+
+
+@dataclass(frozen=True, kw_only=True)
+class Fixture(FixtureSpec):
+    """A generated fixture, as listed in the manifest."""
+
+    key: str
+    size_bytes: int
+    # Bytes from the start of the file covering every IFD and tag value, the smallest
+    # read which contains the whole header.
+    header_size_bytes: int
+    ifd_count: int
+    tile_count: int
+    # `(start, end)` of each IFD and its tag values, with an exclusive end, for layouts
+    # which spread the header across the file.  Readers follow the IFD chain with one
+    # request per IFD rather than reading `header_size_bytes`.  Empty for COGs.
+    ifd_ranges: tuple[tuple[int, int], ...] = ()
+
+
+DEFAULT_FIXTURES: list[FixtureSpec] = [
+    # Similar to the Sentinel-2 10m bands read by default.
+    FixtureSpec("baseline", 4096, 4096, tile_size=1024, overviews=3),
+    FixtureSpec("small-tiles", 4096, 4096, tile_size=256, overviews=3),
+    FixtureSpec("many-overviews", 8192, 8192, tile_size=256, overviews=6),
+    # Tile indexes of ~128KB, far larger than the default prefetch.
+    FixtureSpec("large-ifd", 32768, 32768, tile_size=256, filled_fraction=0.01),
+    FixtureSpec("multiband", 2048, 2048, overviews=2, bands=8),
+    FixtureSpec(
+        "rgb-jpeg",
+        4096,
+        4096,
+        overviews=3,
+        compression=Compression.jpeg,
+        bands=3,
+        dtype="uint8",
+    ),
+    FixtureSpec("zstd", 4096, 4096, overviews=3, compression=Compression.zstd),
+    FixtureSpec("uncompressed", 4096, 4096, overviews=3, compression=Compression.none),
+    FixtureSpec("geotiff-layout", 4096, 4096, overviews=3, layout=HeaderLayout.geotiff),
+]
+
+
+def fixture_key(name: str) -> str:
+    return f"cogs/{name}.tif"
+
+
+def _tile_data(spec: FixtureSpec, window: Window, rng: np.random.Generator):
+    rows, cols = np.mgrid[
+        window.row_off : window.row_off + window.height,
+        window.col_off : window.col_off + window.width,
+    ]
+    max_value = 255 if spec.dtype == "uint8" else 10000
+    data = np.empty((spec.bands, window.height, window.width), dtype=spec.dtype)
+    for band in range(spec.bands):
+        pattern = np.sin(cols / (173 + 31 * band)) + np.cos(rows / (211 + 17 * band))
+        noise = rng.random((window.height, window.width))
+        data[band] = (pattern / 4 + 0.5 + noise / 50) / 1.02 * max_value
+    return data
+
+
+def _write_source(spec: FixtureSpec, path: str) -> None:
+    """Write the pixels of the fixture to an uncompressed, tiled GeoTIFF."""
+    rng = np.random.default_rng(SEED)
+    profile = {
+        "driver": "GTiff",
+        "width": spec.width,
+        "height": spec.height,
+        "count": spec.bands,
+        "dtype": spec.dtype,
+        "tiled": True,
+        "blockxsize": spec.tile_size,
+        "blockysize": spec.tile_size,
+        "sparse_ok": True,
+        "bigtiff": "if_safer",
+        "crs": CRS,
+        "transform": Affine(RESOLUTION, 0, ORIGIN[0], 0, -RESOLUTION, ORIGIN[1]),
+    }
+    with rasterio.open(path, "w", **profile) as dst:
+        for _, window in dst.block_windows(1):
+            if rng.random() < spec.filled_fraction:
+                dst.write(_tile_data(spec, window, rng), window=window)
+
+
+def _write_fixture(spec: FixtureSpec, source: str, path: str) -> None:
+    options = {
+        "COMPRESS": spec.compression.value.upper(),
+        "SPARSE_OK": "TRUE",
+        "BIGTIFF": "IF_SAFER",
+    }
+    if spec.compression in (Compression.deflate, Compression.lzw, Compression.zstd):
+        # Horizontal differencing, as used by most published COGs.
+        options["PREDICTOR"] = "2"
+    if spec.layout == HeaderLayout.cog:
+        rasterio.shutil.copy(
+            source,
+            path,
+            driver="COG",
+            BLOCKSIZE=spec.tile_size,
+            OVERVIEWS="AUTO" if spec.overviews else "NONE",
+            OVERVIEW_COUNT=spec.overviews or None,
+            **options,
+        )
+        return
+    rasterio.shutil.copy(
+        source,
+        path,
+        driver="GTiff",
+        TILED="YES",
+        BLOCKXSIZE=spec.tile_size,
+        BLOCKYSIZE=spec.tile_size,
+        **options,
+    )
+    if spec.overviews:
+        with rasterio.open(path, "r+") as dst:
+            dst.build_overviews(
+                [2**level for level in range(1, spec.overviews + 1)],
+                Resampling.average,
+            )
+
+
+# Bytes per value of each TIFF field type.
+_TYPE_SIZES = {
+    1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 6: 1, 7: 1, 8: 2,
+    9: 4, 10: 8, 11: 4, 12: 8, 13: 4, 16: 8, 17: 8, 18: 8,
+}  # fmt: skip
+_TILE_OFFSETS = 324
+
+
+def read_header_layout(
+    path: str,
+) -> tuple[int, int, int, tuple[tuple[int, int], ...]]:
+    """Header size, IFD count, tile count and IFD ranges of a (Big)TIFF.  The header
+    size covers every IFD and the values of their tags, and each IFD range covers one
+    IFD and the values of its tags."""
+    with open(path, "rb") as f:
+        data = f.read()
+    endian = "<" if data[:2] == b"II" else ">"
+    bigtiff = struct.unpack(f"{endian}H", data[2:4])[0] == 43
+    # Formats of the IFD entry count, an entry and an offset.
+    count_format, entry_format, offset_format = (
+        ("Q", "HHQ8s", "Q") if bigtiff else ("H", "HHI4s", "I")
+    )
+    inline_size = 8 if bigtiff else 4
+    entry_size = struct.calcsize(f"{endian}{entry_format}")
+    offset_size = struct.calcsize(f"{endian}{offset_format}")
+
+    header_size = ifd_count = tile_count = 0
+    ifd_ranges = []
+    first_ifd = 8 if bigtiff else 4
+    (ifd_offset,) = struct.unpack_from(f"{endian}{offset_format}", data, first_ifd)
+    while ifd_offset:
+        ifd_count += 1
+        (n_entries,) = struct.unpack_from(f"{endian}{count_format}", data, ifd_offset)
+        entries = ifd_offset + struct.calcsize(f"{endian}{count_format}")
+        ifd_start = ifd_end = ifd_offset
+        for idx in range(n_entries):
+            tag, field_type, count, value = struct.unpack_from(
+                f"{endian}{entry_format}", data, entries + idx * entry_size
+            )
+            if tag == _TILE_OFFSETS:
+                tile_count += count
+            size = count * _TYPE_SIZES.get(field_type, 1)
+            if size > inline_size:
+                (value_offset,) = struct.unpack(f"{endian}{offset_format}", value)
+                header_size = max(header_size, value_offset + size)
+                ifd_start = min(ifd_start, value_offset)
+                ifd_end = max(ifd_end, value_offset + size)
+        next_offset = entries + n_entries * entry_size
+        header_size = max(header_size, next_offset + offset_size)
+        ifd_ranges.append((ifd_start, max(ifd_end, next_offset + offset_size)))
+        (ifd_offset,) = struct.unpack_from(
+            f"{endian}{offset_format}", data, next_offset
+        )
+    return header_size, ifd_count, tile_count, tuple(ifd_ranges)
+
+
+def generate(spec: FixtureSpec, path: str) -> Fixture:
+    """Write the fixture described by `spec` to `path`."""
+    if spec.compression == Compression.jpeg and (
+        spec.dtype != "uint8" or spec.bands not in (1, 3)
+    ):
+        raise ValueError(f"{spec.name}: JPEG requires 1 or 3 bands of uint8")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        source = os.path.join(tmpdir, "source.tif")
+        _write_source(spec, source)
+        _write_fixture(spec, source, path)
+    header_size, ifd_count, tile_count, ifd_ranges = read_header_layout(path)
+    return Fixture(
+        **dataclasses.asdict(spec),
+        key=fixture_key(spec.name),
+        size_bytes=os.path.getsize(path),
+        header_size_bytes=header_size,
+        ifd_count=ifd_count,
+        tile_count=tile_count,
+        ifd_ranges=ifd_ranges if spec.layout != HeaderLayout.cog else (),
+    )
+
+
+def generate_fixtures(
+    root: str,
+    bucket: str = FIXTURES_BUCKET,
+    specs: list[FixtureSpec] = DEFAULT_FIXTURES,
+) -> list[Fixture]:
+    """Write each fixture below `{root}/{bucket}`, and the manifest listing them."""
+    directory = os.path.join(root, bucket)
+    os.makedirs(os.path.join(directory, "cogs"), exist_ok=True)
+    fixtures = []
+    for spec in specs:
+        print(f"Generating {spec.name}")
+        fixtures.append(generate(spec, os.path.join(directory, fixture_key(spec.name))))
+    with open(os.path.join(directory, MANIFEST_KEY), "w") as f:
+        json.dump(
+            {"bucket": bucket, "fixtures": [_to_json(f) for f in fixtures]}, f, indent=2
+        )
+    return fixtures
+
+
+def _to_json(fixture: Fixture) -> dict:
+    return {
+        name: value.value if isinstance(value, enum.Enum) else value
+        for name, value in dataclasses.asdict(fixture).items()
+    }
+
+
+def parse_manifest(data: str | bytes) -> dict[str, Fixture]:
+    """Fixtures in a manifest, by name."""
+    fixtures = {}
+    for entry in json.loads(data)["fixtures"]:
+        entry["compression"] = Compression(entry["compression"])
+        entry["layout"] = HeaderLayout(entry["layout"])
+        entry["ifd_ranges"] = tuple(tuple(r) for r in entry.get("ifd_ranges", ()))
+        fixtures[entry["name"]] = Fixture(**entry)
+    return fixtures
+
+
+def load_manifest(path: str) -> dict[str, Fixture]:
+    with open(path) as f:
+        return parse_manifest(f.read())
+
+
+def ifd_reads(
+    ifd_ranges: tuple[tuple[int, int], ...], prefetch_bytes: int
+) -> list[tuple[int, int]]:
+    """Inclusive byte ranges read after the prefetch to follow the IFD chain, one per
+    IFD which isn't already covered by the prefetched bytes."""
+    return [
+        (max(start, prefetch_bytes), end - 1)
+        for start, end in ifd_ranges
+        if end > prefetch_bytes
+    ]
+
+
+async def open_cog_header(
+    send_range: RangeRequest,
+    bucket: str,
+    key: str,
+    header_size_bytes: int,
+    prefetch_bytes: int = DEFAULT_PREFETCH_BYTES,
+    ifd_ranges: tuple[tuple[int, int], ...] = (),
+) -> Cog | None:
+    """Open a COG with `cog_layers`, which parses a header read in one go.  The first
+    `prefetch_bytes` are read first, and the rest of the header with a second request,
+    like a reader which only finds out the header is larger after parsing the
+    prefetched bytes.
+
+    `cog_layers` can't parse a header spread across the file without reading everything
+    in between, so with `ifd_ranges` the IFDs after the prefetch are read one request
+    at a time, like a GeoTIFF reader following the IFD chain, and nothing is parsed."""
+    if ifd_ranges:
+        await send_range(bucket, key, start=0, end=prefetch_bytes - 1)
+        for start, end in ifd_reads(ifd_ranges, prefetch_bytes):
+            await send_range(bucket, key, start=start, end=end)
+        return None
+
+    async def send(bucket: str, key: str, start: int, end: int) -> bytes:
+        prefetch_end = start + prefetch_bytes - 1
+        if end <= prefetch_end:
+            return await send_range(bucket, key, start=start, end=end)
+        head = await send_range(bucket, key, start=start, end=prefetch_end)
+        return head + await send_range(bucket, key, start=prefetch_end + 1, end=end)
+
+    # `open_cog` reads up to and including `header_size_bytes`.
+    return await open_cog(
+        send, bucket=bucket, key=key, header_size_bytes=header_size_bytes - 1
+    )
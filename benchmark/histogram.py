@@ -0,0 +1,88 @@
+"""Log-linear latency histogram with constant memory, similar to HdrHistogram."""
+
+import json
+
+# Values are recorded in microseconds.  Each power of two is split into
+# 2 ** (SUB_BUCKET_BITS - 1) linear buckets, bounding the relative error at ~1.6%.
+SUB_BUCKET_BITS: int = 7
+SUB_BUCKET_COUNT: int = 2**SUB_BUCKET_BITS
+SUB_BUCKET_HALF_COUNT: int = SUB_BUCKET_COUNT // 2
+
+# Track values up to 2 ** 36 microseconds (~19 hours), larger values are clamped.
+MAX_VALUE_BITS: int = 36
+BUCKET_COUNT: int = SUB_BUCKET_COUNT + (MAX_VALUE_BITS - SUB_BUCKET_BITS) * (
+    SUB_BUCKET_HALF_COUNT
+)
+
+
+def _index(value: int) -> int:
+    if value < SUB_BUCKET_COUNT:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    index = SUB_BUCKET_COUNT + (shift - 1) * SUB_BUCKET_HALF_COUNT
+    index += (value >> shift) - SUB_BUCKET_HALF_COUNT
+    return min(index, BUCKET_COUNT - 1)
+
+
+def _value(index: int) -> int:
+    """Return the midpoint of the bucket, in microseconds."""
+    if index < SUB_BUCKET_COUNT:
+        return index
+    shift, offset = divmod(index - SUB_BUCKET_COUNT, SUB_BUCKET_HALF_COUNT)
+    shift += 1
+    lower = (offset + SUB_BUCKET_HALF_COUNT) << shift
+    return lower + (1 << shift) // 2
+
+
+class LatencyHistogram:
+    """Histogram of latencies in seconds, using a fixed number of buckets.
+
+    Histograms from different workers are merged by adding their bucket counts.
+    """
+
+    def __init__(self, counts: list[int] | None = None):
+        self.counts = counts or [0] * BUCKET_COUNT
+        self.count = sum(self.counts)
+
+    def record(self, seconds: float) -> None:
+        self.counts[_index(max(int(seconds * 1_000_000), 0))] += 1
+        self.count += 1
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for idx, count in enumerate(other.counts):
+            self.counts[idx] += count
+        self.count += other.count
+
+    def percentile(self, q: float) -> float:
+        """Return the latency in seconds at the given percentile (0-100)."""
+        if not self.count:
+            return float("nan")
+        threshold = max(self.count * q / 100, 1)
+        total = 0
+        for idx, count in enumerate(self.counts):
+            total += count
+            if total >= threshold:
+                return _value(idx) / 1_000_000
+        return _value(BUCKET_COUNT - 1) / 1_000_000
+
+    def mean(self) -> float:
+        """Return the mean latency in seconds, using the midpoint of each bucket."""
+        if not self.count:
+            return float("nan")
+        total = sum(
+            _value(idx) * count for idx, count in enumerate(self.counts) if count
+        )
+        return total / self.count / 1_000_000
+
+    def to_json(self) -> str:
+        """Serialize non-empty buckets only."""
+        return json.dumps(
+            {idx: count for idx, count in enumerate(self.counts) if count}
+        )
+
+    @classmethod
+    def from_json(cls, data: str | None) -> "LatencyHistogram":
+        counts = [0] * BUCKET_COUNT
+        for idx, count in json.loads(data or "{}").items():
+            counts[int(idx)] = count
+        return cls(counts)
@@ -0,0 +1,117 @@
+"""List the keys below a prefix, and count the pages and objects listed.
+
+`list_prefix` tests list every key below `listing/{prefix_size}/` of the fixtures
+bucket, which `generate_listing` fills with `prefix_size` empty objects.  Only the keys
+matter, so prefixes of hundreds of thousands of keys are cheap to serve.
+
+Tests count each page they request, and each batch of objects the library hands back.
+aioboto3, httpx, aiohttp and requests hand back one page of `max_keys` at a time.  s3fs
+returns the whole listing at once, and obstore re-chunks the pages it reads into
+batches of `max_keys`, both without exposing the pages, so they're counted as the
+`MAX_KEYS` pages S3 would have returned.  A library streams the listing when its
+largest batch is no larger than a page, rather than buffering the whole listing in
+memory.
+"""
+
+import math
+import os
+import threading
+import urllib.parse
+from xml.etree import ElementTree
+
+from benchmark import counters
+from benchmark.clients import S3_NAMESPACE, object_url
+
+
+LISTING_PREFIX: str = "listing/"
+DEFAULT_PREFIX_SIZE: int = 1_000
+DEFAULT_PREFIX_SIZES: tuple[int, ...] = (1_000, 10_000, 100_000)
+# Keys per page, the default and maximum of S3.
+MAX_KEYS: int = 1000
+
+
+def listing_prefix(prefix_size: int) -> str:
+    return f"{LISTING_PREFIX}{prefix_size}/"
+
+
+def generate_listing(
+    root: str, bucket: str, prefix_sizes: tuple[int, ...] = DEFAULT_PREFIX_SIZES
+) -> None:
+    """Write `prefix_size` empty objects below `{root}/{bucket}/listing/{prefix_size}/`
+    for each prefix size, keeping the objects which already exist."""
+    for prefix_size in prefix_sizes:
+        directory = os.path.join(root, bucket, listing_prefix(prefix_size))
+        os.makedirs(directory, exist_ok=True)
+        existing = set(os.listdir(directory))
+        for idx in range(prefix_size):
+            name = f"{idx:07d}.tif"
+            if name not in existing:
+                open(os.path.join(directory, name), "wb").close()
+
+
+def list_url(
+    bucket: str, prefix: str, max_keys: int, continuation_token: str | None
+) -> str:
+    """URL of a `ListObjectsV2` request, for plain HTTP clients."""
+    query = {"list-type": "2", "prefix": prefix, "max-keys": str(max_keys)}
+    if continuation_token:
+        query["continuation-token"] = continuation_token
+    return f"{object_url(bucket, '')}?{urllib.parse.urlencode(query)}"
+
+
+def parse_page(body: bytes) -> tuple[list[str], str | None]:
+    """Keys listed by a `ListObjectsV2` response, and the token of the next page if
+    the listing was truncated."""
+    root = ElementTree.fromstring(body)
+    keys = [
+        element.text
+        for element in root.iterfind(f"{S3_NAMESPACE}Contents/{S3_NAMESPACE}Key")
+    ]
+    return keys, root.findtext(f"{S3_NAMESPACE}NextContinuationToken")
+
+
+def pages_for(n_objects: int) -> int:
+    """Pages of `MAX_KEYS` listing `n_objects`, for libraries which hide their pages."""
+    return max(math.ceil(n_objects / MAX_KEYS), 1)
+
+
+_lock = threading.Lock()
+_objects: int | None = None
+_pages: int | None = None
+_largest_batch: int | None = None
+
+
+def reset() -> None:
+    global _objects, _pages, _largest_batch
+    _objects = None
+    _pages = None
+    _largest_batch = None
+
+
+def paged(n_pages: int = 1) -> None:
+    """Count `n_pages` list requests.  Synchronous clients call this from worker
+    threads."""
+    global _pages
+    with _lock:
+        _pages = (_pages or 0) + n_pages
+
+
+def listed(n_objects: int) -> None:
+    """Count a batch of `n_objects` handed back by the library."""
+    global _objects, _largest_batch
+    with _lock:
+        _objects = (_objects or 0) + n_objects
+        _largest_batch = max(_largest_batch or 0, n_objects)
+
+
+def collect() -> counters.Counts:
+    """Objects and pages listed, and the most objects handed back at once, since the
+    last `reset`, if any listing was counted."""
+    return {
+        "listed_objects": _objects,
+        "list_pages": _pages,
+        "largest_list_batch": _largest_batch,
+    }
+
+
+counters.register(reset, collect, maxima=("largest_list_batch",))
@@ -0,0 +1,77 @@
+"""Measure event loop lag, and find the code which blocks the event loop."""
+
+import asyncio
+import collections
+import sys
+import threading
+import time
+
+from benchmark.histogram import LatencyHistogram
+
+
+DEFAULT_BLOCKING_THRESHOLD_MS: int = 50
+
+# The lag of the event loop is sampled this often.
+LAG_INTERVAL_SECONDS: float = 0.01
+
+# Only the innermost frames of blocking stacks are kept.
+MAX_STACK_DEPTH: int = 12
+
+
+def collapse_stack(frame, max_depth: int = MAX_STACK_DEPTH) -> str:
+    """Format a stack as `module:function:line` frames separated by `;`, from the
+    outermost to the innermost frame, as used by flamegraph tools."""
+    frames = []
+    while frame is not None and len(frames) < max_depth:
+        code = frame.f_code
+        module = frame.f_globals.get("__name__", code.co_filename)
+        frames.append(f"{module}:{code.co_qualname}:{frame.f_lineno}")
+        frame = frame.f_back
+    return ";".join(reversed(frames))
+
+
+class LoopMonitor:
+    """Samples event loop lag while a test runs.
+
+    A task sleeps for `LAG_INTERVAL_SECONDS` in a loop, and records how much later than
+    scheduled it woke up.  A watchdog thread checks when the task last woke up every
+    half `threshold`, and samples the stack of the event loop thread if the loop has
+    been blocked for longer than `threshold`.  Each sample is counted as half
+    `threshold` seconds of blocking.
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.lag = LatencyHistogram()
+        self.blocking_stacks = collections.defaultdict(float)
+        self._heartbeat = time.monotonic()
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._task = asyncio.create_task(self._sample_lag())
+        self._watchdog = threading.Thread(target=self._watch, daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._watchdog.join()
+
+    async def _sample_lag(self) -> None:
+        while True:
+            scheduled = time.monotonic() + LAG_INTERVAL_SECONDS
+            await asyncio.sleep(LAG_INTERVAL_SECONDS)
+            self._heartbeat = time.monotonic()
+            self.lag.record(self._heartbeat - scheduled)
+
+    def _watch(self) -> None:
+        period = self.threshold / 2
+        while not self._stopped.wait(period):
+            if time.monotonic() - self._heartbeat < self.threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None:
+                self.blocking_stacks[collapse_stack(frame)] += period
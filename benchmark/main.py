@@ -1,18 +1,26 @@
 from importlib import import_module
 import itertools
+import json
 from collections import defaultdict
+import multiprocessing
 import subprocess
 import os
+import time
 import uuid
 
 import docker
 import sqlite3
 
+from benchmark import metrics
+from benchmark.resources import ResourceSampler
 from benchmark.docker_utils import get_container_id, block_until_container_exits
-from benchmark.crud import insert_row, WorkerState
+from benchmark.crud import insert_row, merge_worker_states, WorkerState
+from benchmark.fixtures import load_manifest
 from benchmark.settings import get_settings
 from benchmark.clients import HttpClientConfig
+from benchmark.network import NetworkProfileName
 from benchmark.parameterize import TestConfig
+from benchmark.scheduling import SchedulerConfig
 
 
 def collect_tests() -> dict:
@@ -42,8 +50,10 @@ def run_parameterized_test(test_config: TestConfig):
         for param_name, param_config in test.params.items():
             if expression := param_config.get("expression"):
                 d[param_name] = eval(expression)
-            elif value := param_config.get("value"):
-                d[param_name] = [value]
+            elif "value" in param_config:
+                d[param_name] = [param_config["value"]]
+            elif manifest := param_config.get("manifest"):
+                d[param_name] = list(load_manifest(manifest))
 
         prod = list(itertools.product(*list(d.values())))
         keys = list(d.keys())
@@ -61,7 +71,12 @@ def run_parameterized_test(test_config: TestConfig):
                 test.client_config.keep_alive,
                 test.client_config.keep_alive_timeout_seconds,
                 test.client_config.use_dns_cache,
+                test.client_config.trace_phases,
                 params,
+                test.scheduler_config,
+                test.processes,
+                test.export_metrics,
+                test.network_profile,
             )
             block_until_container_exits(docker.from_env())
 
@@ -77,7 +92,12 @@ def run_test_docker(
     keep_alive: bool,
     keep_alive_timeout: int,
     use_dns_cache: bool,
+    trace_phases: bool,
     test_params: dict,
+    scheduler_config: SchedulerConfig,
+    processes: int,
+    export_metrics: bool,
+    network_profile: NetworkProfileName | None = None,
 ):
     all_tests = collect_tests()
 
@@ -90,6 +110,11 @@ def run_test_docker(
     if test_name not in library:
         raise ValueError(f"Test {test_name} not found.")
 
+    if network_profile and not get_settings().S3_ENDPOINT_URL:
+        raise ValueError(
+            "Network profiles are emulated by the local server, set S3_ENDPOINT_URL."
+        )
+
     # Build the container.
     image_tag = f"{library_name}-{test_name}"
     subprocess.run(
@@ -116,14 +141,57 @@ def run_test_docker(
             "--build-arg",
             f"USE_DNS_CACHE={use_dns_cache}",
             "--build-arg",
+            f"TRACE_PHASES={trace_phases}",
+            "--build-arg",
             f"RUN_ID={str(uuid.uuid4())}",
             "--build-arg",
-            f"TEST_PARAMS='{test_params}'",
+            f"TEST_PARAMS={json.dumps(test_params)}",
+            "--build-arg",
+            f"SCHEDULER={scheduler_config.scheduler.value}",
+            "--build-arg",
+            f"CONCURRENCY={scheduler_config.concurrency}",
+            "--build-arg",
+            f"DRAIN_TIMEOUT={scheduler_config.drain_timeout_seconds}",
+            "--build-arg",
+            f"RATE={scheduler_config.rate}",
+            "--build-arg",
+            f"ARRIVAL={scheduler_config.arrival.value}",
+            "--build-arg",
+            f"PROFILE={scheduler_config.profile.value}",
+            "--build-arg",
+            f"STEP_DURATION={scheduler_config.step_duration_seconds}",
+            "--build-arg",
+            f"MAX_STEPS={scheduler_config.max_steps}",
+            "--build-arg",
+            f"STEP_FACTOR={scheduler_config.step_factor}",
+            "--build-arg",
+            f"PROCESSES={processes}",
+            "--build-arg",
+            f"LIMITER={scheduler_config.limiter.value}",
+            "--build-arg",
+            f"MIN_LIMIT={scheduler_config.min_limit}",
+            "--build-arg",
+            f"MAX_LIMIT={scheduler_config.max_limit}",
+            "--build-arg",
+            f"MONITOR_LOOP={scheduler_config.monitor_loop}",
+            "--build-arg",
+            f"BLOCKING_THRESHOLD={scheduler_config.blocking_threshold_ms}",
+            "--build-arg",
+            f"PROFILER={scheduler_config.profiler}",
+            "--build-arg",
+            f"PROFILER_FREQUENCY={scheduler_config.profiler_frequency}",
+            "--build-arg",
+            f"EXPORT_METRICS={export_metrics}",
+            "--build-arg",
+            f"NETWORK_PROFILE={network_profile.value if network_profile else ''}",
         ]
     )
 
-    # Run the docker-compose stack
-    command = ["docker", "compose", "up"]
+    # Run the docker-compose stack, on the monitoring network if exporting metrics.
+    command = ["docker", "compose", "-f", "docker-compose.yml"]
+    if export_metrics:
+        command += ["-f", "docker-compose.metrics.yml"]
+    command.append("up")
     if not debug:
         command.append("-d")
     container_env = os.environ.copy() | {
@@ -133,6 +201,87 @@ def run_test_docker(
     subprocess.run(command, env=container_env)
 
 
+def _run_process(
+    barrier: multiprocessing.Barrier,
+    results: multiprocessing.Queue,
+    metrics_array,
+    library_name: str,
+    test_name: str,
+    n_requests: int,
+    timeout: int | None,
+    client_config: HttpClientConfig,
+    test_params: dict | None,
+    scheduler_config: SchedulerConfig,
+):
+    metrics.use_array(metrics_array)
+    try:
+        mod = import_module(f"benchmark.tests.{library_name}.{test_name}")
+        barrier.wait()
+        results.put(
+            mod.main(client_config, n_requests, timeout, test_params, scheduler_config)
+        )
+    except Exception as exc:
+        # Release the other processes if this one fails before the barrier.
+        barrier.abort()
+        results.put(exc)
+
+
+def run_processes(
+    processes: int,
+    library_name: str,
+    test_name: str,
+    n_requests: int,
+    timeout: int | None,
+    client_config: HttpClientConfig,
+    test_params: dict | None,
+    scheduler_config: SchedulerConfig,
+    metrics_arrays: list,
+) -> WorkerState | list[WorkerState]:
+    """Run the test in several processes, each with its own event loop and client, and
+    merge the results.  Each process runs `n_requests` requests, and all processes
+    start sending requests at the same time.  Each process records metrics into one of
+    `metrics_arrays`."""
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(processes)
+    results = ctx.Queue()
+    workers = [
+        ctx.Process(
+            target=_run_process,
+            args=(
+                barrier,
+                results,
+                metrics_array,
+                library_name,
+                test_name,
+                n_requests,
+                timeout,
+                client_config,
+                test_params,
+                scheduler_config,
+            ),
+        )
+        for metrics_array in metrics_arrays
+    ]
+    for worker in workers:
+        worker.start()
+    states = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+
+    for state in states:
+        if isinstance(state, Exception):
+            raise state
+
+    if isinstance(states[0], WorkerState):
+        return merge_worker_states(states)
+
+    # Load profiles return one state per step, processes may stop at different steps.
+    return [
+        merge_worker_states([state for state in step_states if state is not None])
+        for step_states in itertools.zip_longest(*states)
+    ]
+
+
 def run_test(
     library_name: str,
     test_name: str,
@@ -141,23 +290,67 @@ def run_test(
     timeout: int,
     client_config: HttpClientConfig,
     test_params: dict | None,
+    scheduler_config: SchedulerConfig,
+    processes: int = 1,
+    export_metrics: bool = metrics.DEFAULT_EXPORT_METRICS,
 ):
     timeout = None if timeout == -1 else timeout
 
-    mod = import_module(f"benchmark.tests.{library_name}.{test_name}")
-    worker_state: WorkerState = mod.main(
-        client_config, n_requests, timeout, test_params
-    )
+    metrics_arrays = [metrics.create_array() for _ in range(processes)]
+    if export_metrics:
+        server = metrics.start_exporter(metrics_arrays)
 
-    container_id = get_container_id()
-    with sqlite3.connect(get_settings().DB_FILEPATH) as conn:
-        insert_row(
-            conn,
+    sampler = ResourceSampler()
+    sampler.start()
+
+    if processes > 1:
+        worker_state = run_processes(
+            processes,
             library_name,
             test_name,
-            container_id,
-            run_id,
-            worker_state,
+            n_requests,
+            timeout,
             client_config,
             test_params,
+            scheduler_config,
+            metrics_arrays,
+        )
+    else:
+        metrics.use_array(metrics_arrays[0])
+        mod = import_module(f"benchmark.tests.{library_name}.{test_name}")
+        worker_state: WorkerState | list[WorkerState] = mod.main(
+            client_config, n_requests, timeout, test_params, scheduler_config
         )
+
+    sampler.stop()
+
+    if export_metrics:
+        # Give Prometheus a chance to scrape the final values.
+        time.sleep(metrics.FLUSH_SECONDS)
+        server.shutdown()
+
+    # Load profiles return one state per step.
+    if isinstance(worker_state, WorkerState):
+        worker_state = [worker_state]
+
+    for state in worker_state:
+        state.resources = sampler.series(state.start_time, state.end_time)
+
+    container_id = get_container_id()
+    with sqlite3.connect(get_settings().DB_FILEPATH) as conn:
+        for state in worker_state:
+            insert_row(
+                conn,
+                library_name,
+                test_name,
+                container_id,
+                run_id,
+                state,
+                client_config,
+                test_params,
+                scheduler_config.scheduler.value,
+                scheduler_config.arrival.value,
+                scheduler_config.profile.value,
+                processes,
+                get_settings().NETWORK_PROFILE or None,
+            )
@@ -0,0 +1,144 @@
+"""Client-side metrics, served in the Prometheus text format while a test runs.
+
+cAdvisor only sees the container, these are counted by the benchmark itself around each
+call to a function decorated with `concurrency_limit`.  Metrics are stored in a flat
+array of floats per process, so recording a request only updates a few slots in place.
+Processes started with `--processes` each write to their own shared array and the
+exporter, running in a thread of the parent process, sums them when scraped.
+"""
+
+import bisect
+import http.server
+import multiprocessing.sharedctypes
+import threading
+
+from benchmark.failures import FailureClass, classify
+
+
+METRICS_PORT: int = 9100
+DEFAULT_EXPORT_METRICS: bool = False
+
+# Keep serving metrics for one Prometheus scrape interval after the test finishes.
+FLUSH_SECONDS: int = 5
+
+# Upper bounds of the request duration histogram, in seconds.
+DURATION_BUCKETS: tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+# Slots of the metrics array.
+IN_FLIGHT = 0
+COMPLETED = 1
+BYTES = 2
+DURATION_SUM = 3
+ERRORS = 4
+DURATION_BUCKETS_START = ERRORS + len(FailureClass)
+SLOT_COUNT = DURATION_BUCKETS_START + len(DURATION_BUCKETS) + 1
+
+_ERROR_SLOTS = {
+    failure_class: ERRORS + idx for idx, failure_class in enumerate(FailureClass)
+}
+
+
+def create_array():
+    """Create a metrics array which can be shared with child processes."""
+    return multiprocessing.sharedctypes.RawArray("d", SLOT_COUNT)
+
+
+_values = [0.0] * SLOT_COUNT
+
+
+def use_array(values) -> None:
+    """Record metrics of this process into `values`, from `create_array`."""
+    global _values
+    _values = values
+
+
+def request_started() -> None:
+    _values[IN_FLIGHT] += 1
+
+
+def request_finished(seconds: float) -> None:
+    values = _values
+    values[IN_FLIGHT] -= 1
+    values[COMPLETED] += 1
+    values[DURATION_SUM] += seconds
+    values[DURATION_BUCKETS_START + bisect.bisect_left(DURATION_BUCKETS, seconds)] += 1
+
+
+def payload_received(n_bytes: int) -> None:
+    """Counted by `benchmark.payload`."""
+    _values[BYTES] += n_bytes
+
+
+def request_cancelled() -> None:
+    _values[IN_FLIGHT] -= 1
+
+
+def request_failed(exc: BaseException) -> None:
+    """Failures are only counted by class, not as completed requests or durations."""
+    values = _values
+    values[IN_FLIGHT] -= 1
+    values[_ERROR_SLOTS[classify(exc)]] += 1
+
+
+def render(arrays: list) -> str:
+    """Render the sum of all arrays in the Prometheus text format."""
+    values = [sum(column) for column in zip(*arrays)]
+    lines = [
+        "# TYPE benchmark_requests_in_flight gauge",
+        f"benchmark_requests_in_flight {values[IN_FLIGHT]}",
+        "# TYPE benchmark_requests_completed_total counter",
+        f"benchmark_requests_completed_total {values[COMPLETED]}",
+        "# TYPE benchmark_response_bytes_total counter",
+        f"benchmark_response_bytes_total {values[BYTES]}",
+        "# TYPE benchmark_request_errors_total counter",
+    ]
+    for failure_class, slot in _ERROR_SLOTS.items():
+        lines.append(
+            f'benchmark_request_errors_total{{type="{failure_class.value}"}} {values[slot]}'
+        )
+
+    lines.append("# TYPE benchmark_request_duration_seconds histogram")
+    cumulative = 0.0
+    for idx, bound in enumerate((*DURATION_BUCKETS, "+Inf")):
+        cumulative += values[DURATION_BUCKETS_START + idx]
+        lines.append(
+            f'benchmark_request_duration_seconds_bucket{{le="{bound}"}} {cumulative}'
+        )
+    lines.append(f"benchmark_request_duration_seconds_sum {values[DURATION_SUM]}")
+    lines.append(f"benchmark_request_duration_seconds_count {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def start_exporter(arrays: list, port: int = METRICS_PORT) -> http.server.HTTPServer:
+    """Serve the metrics of all arrays from a daemon thread, until `shutdown` is called
+    on the returned server."""
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = render(arrays).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
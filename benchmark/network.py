@@ -0,0 +1,175 @@
+"""Network conditions emulated by the local server, as named profiles.
+
+Performance against S3 depends on round trip time, jitter and bandwidth, which can't be
+controlled when testing against AWS.  The local server (`benchmark serve`) serves each
+profile on its own port, next to the unshaped port, and delays, throttles and fails its
+responses as configured by the profile.  Tests select a profile with `network_profile`,
+which points clients at that port.
+"""
+
+import enum
+import random
+from dataclasses import dataclass
+
+
+class NetworkProfileName(str, enum.Enum):
+    same_az = "same-az"
+    same_region = "same-region"
+    cross_region = "cross-region"
+    degraded = "degraded"
+
+
+class LatencyDistribution(str, enum.Enum):
+    constant = "constant"
+    normal = "normal"
+    lognormal = "lognormal"
+    pareto = "pareto"
+
+
+# Shape of the `pareto` latency distribution, lower values have a heavier tail.
+PARETO_ALPHA: float = 1.5
+
+# Initial congestion window of a new connection, 10 segments (RFC 6928).
+DEFAULT_INITIAL_WINDOW_BYTES: int = 10 * 1460
+
+# Response bodies of shaped connections are written in chunks covering this long at
+# the current rate of the connection.
+SEND_INTERVAL_SECONDS: float = 0.005
+MIN_CHUNK_BYTES: int = 1460
+
+
+@dataclass(frozen=True)
+class NetworkProfile:
+    # Round trip time added before each response is sent, the median of
+    # `latency_distribution`.  A new connection pays one more round trip for the TCP
+    # handshake.
+    latency_ms: float = 0.0
+    # Standard deviation of the `normal` distribution, the scale of the tail of the
+    # `pareto` distribution, and `latency_ms * sigma` of the `lognormal` distribution.
+    jitter_ms: float = 0.0
+    latency_distribution: LatencyDistribution = LatencyDistribution.constant
+    # Bandwidth caps in megabits per second, None is unlimited.  The total is shared by
+    # all connections to the profile.
+    connection_bandwidth_mbps: float | None = None
+    total_bandwidth_mbps: float | None = None
+    # New connections start sending this many bytes per round trip, doubling every
+    # round trip until reaching `connection_bandwidth_mbps`, like TCP slow start.  None
+    # disables slow start.
+    initial_window_bytes: int | None = DEFAULT_INITIAL_WINDOW_BYTES
+    # Fraction of requests answered with `503 SlowDown`.
+    error_rate: float = 0.0
+    # Fraction of requests whose connection is reset instead of answered.
+    reset_rate: float = 0.0
+
+
+PROFILES: dict[NetworkProfileName, NetworkProfile] = {
+    NetworkProfileName.same_az: NetworkProfile(
+        latency_ms=0.5,
+        jitter_ms=0.1,
+        latency_distribution=LatencyDistribution.normal,
+        connection_bandwidth_mbps=5_000,
+        total_bandwidth_mbps=25_000,
+    ),
+    NetworkProfileName.same_region: NetworkProfile(
+        latency_ms=2.0,
+        jitter_ms=1.0,
+        latency_distribution=LatencyDistribution.lognormal,
+        connection_bandwidth_mbps=1_000,
+        total_bandwidth_mbps=10_000,
+        error_rate=0.0005,
+    ),
+    NetworkProfileName.cross_region: NetworkProfile(
+        latency_ms=70.0,
+        jitter_ms=10.0,
+        latency_distribution=LatencyDistribution.lognormal,
+        connection_bandwidth_mbps=200,
+        total_bandwidth_mbps=5_000,
+        error_rate=0.001,
+        reset_rate=0.0005,
+    ),
+    NetworkProfileName.degraded: NetworkProfile(
+        latency_ms=150.0,
+        jitter_ms=50.0,
+        latency_distribution=LatencyDistribution.pareto,
+        connection_bandwidth_mbps=20,
+        total_bandwidth_mbps=500,
+        error_rate=0.02,
+        reset_rate=0.01,
+    ),
+}
+
+
+def profile_port(port: int, name: NetworkProfileName) -> int:
+    """Port serving the profile `name`, when the unshaped server listens on `port`."""
+    return port + 1 + list(NetworkProfileName).index(name)
+
+
+def _bytes_per_second(mbps: float | None) -> float | None:
+    return mbps * 125_000 if mbps else None
+
+
+class Link:
+    """Emulates a network profile for the connections of one server process.  The
+    total bandwidth is split evenly between `processes` serving the same profile."""
+
+    def __init__(
+        self, profile: NetworkProfile, processes: int = 1, seed: int | None = None
+    ):
+        self.profile = profile
+        self.rtt = profile.latency_ms / 1000
+        self.connection_rate = _bytes_per_second(profile.connection_bandwidth_mbps)
+        total_rate = _bytes_per_second(profile.total_bandwidth_mbps)
+        self.total_rate = total_rate / processes if total_rate else None
+        self._random = random.Random(seed)
+        # When the bytes already sent by all connections have been transmitted.
+        self._free_at = 0.0
+
+    def latency(self) -> float:
+        """Seconds to wait before sending a response."""
+        profile = self.profile
+        median = profile.latency_ms
+        jitter = profile.jitter_ms
+        if profile.latency_distribution == LatencyDistribution.normal:
+            latency = self._random.gauss(median, jitter)
+        elif profile.latency_distribution == LatencyDistribution.lognormal and median:
+            latency = median * self._random.lognormvariate(0, jitter / median)
+        elif profile.latency_distribution == LatencyDistribution.pareto:
+            # Never below the median, with a heavy tail.
+            latency = median + jitter * (self._random.paretovariate(PARETO_ALPHA) - 1)
+        else:
+            latency = median
+        return max(latency, 0.0) / 1000
+
+    def inject_error(self) -> bool:
+        return self._random.random() < self.profile.error_rate
+
+    def inject_reset(self) -> bool:
+        return self._random.random() < self.profile.reset_rate
+
+    def rate(self, sending_for: float) -> float | None:
+        """Bytes per second a connection may send after sending for `sending_for`
+        seconds, None if unlimited."""
+        rate = self.connection_rate
+        window = self.profile.initial_window_bytes
+        if window and self.rtt:
+            # Avoid overflowing once slow start is long over.
+            rtts = min(sending_for / self.rtt, 64)
+            slow_start_rate = window * 2**rtts / self.rtt
+            rate = min(rate, slow_start_rate) if rate else slow_start_rate
+        return rate
+
+    def chunk_size(self, rate: float | None) -> int:
+        """Bytes to write at once, at `rate` bytes per second."""
+        rate = rate or self.total_rate
+        if not rate:
+            return 0
+        return max(int(rate * SEND_INTERVAL_SECONDS), MIN_CHUNK_BYTES)
+
+    def transmit(self, n_bytes: int, now: float, rate: float | None) -> float:
+        """Time at which `n_bytes` written `now` by a connection sending at `rate` have
+        been transmitted, reserving them from the total bandwidth."""
+        done = now + n_bytes / rate if rate else now
+        if self.total_rate:
+            self._free_at = max(self._free_at, now) + n_bytes / self.total_rate
+            done = max(done, self._free_at)
+        return done
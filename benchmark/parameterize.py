@@ -4,6 +4,8 @@ import yaml
 from pydantic import BaseModel, model_validator, PrivateAttr
 
 from benchmark.clients import HttpClientConfig
+from benchmark.network import NetworkProfileName
+from benchmark.scheduling import SchedulerConfig
 
 
 class LibraryName(str, enum.Enum):
@@ -20,6 +22,14 @@ class LibraryName(str, enum.Enum):
 class TestName(str, enum.Enum):
     cog_header = "cog_header"
     fetch_range = "fetch_range"
+    tile_read = "tile_read"
+    tile_batch = "tile_batch"
+    catalog_scan = "catalog_scan"
+    split_read = "split_read"
+    put_object = "put_object"
+    multipart_upload = "multipart_upload"
+    head_object = "head_object"
+    list_prefix = "list_prefix"
 
 
 class TestParams(BaseModel):
@@ -32,21 +42,33 @@ class TestCase(BaseModel):
     timeout: int = -1
     n_requests: int
     replicas: int
+    processes: int = 1
+    export_metrics: bool = False
     client_config: HttpClientConfig = HttpClientConfig()
+    scheduler_config: SchedulerConfig = SchedulerConfig()
+    # Emulated by the local server, requires `S3_ENDPOINT_URL`.
+    network_profile: NetworkProfileName | None = None
     params: dict = {}
     debug: bool = False
 
 
 class ValueOrExpression(BaseModel):
-    value: int | None = None
+    value: int | float | str | None = None
     expression: str | None = None
+    # Path to a fixture manifest, sweeps over the name of every fixture in it.
+    manifest: str | None = None
 
     @model_validator(mode="after")
     def validate_mutually_exclusive(self):
-        if not self.value and not self.expression:
-            raise ValueError("Must provide either 'value' or 'expression'")
-        if self.value and self.expression:
-            raise ValueError("'value' and 'expression' are mutually exclusive")
+        n_provided = sum(
+            v is not None for v in (self.value, self.expression, self.manifest)
+        )
+        if n_provided == 0:
+            raise ValueError("Must provide one of 'value', 'expression' or 'manifest'")
+        if n_provided > 1:
+            raise ValueError(
+                "'value', 'expression' and 'manifest' are mutually exclusive"
+            )
         return self
 
 
@@ -56,6 +78,100 @@ class ValueOrExpression(BaseModel):
 class FetchRangeConfig(TestParams):
     _test_name = TestName.fetch_range
     request_size: ValueOrExpression
+    # `copy` or `reuse`, how response bodies are read, see `benchmark/buffers.py`.
+    body_mode: ValueOrExpression | None = None
+
+
+class CogHeaderConfig(TestParams):
+    _test_name = TestName.cog_header
+    # Name of a generated fixture, see `benchmark/fixtures.py`.  Reads a Sentinel-2
+    # file from the `sentinel-cogs` bucket when not set.
+    fixture: ValueOrExpression | None = None
+    prefetch_bytes: ValueOrExpression | None = None
+
+
+class TileReadConfig(TestParams):
+    _test_name = TestName.tile_read
+    fixture: ValueOrExpression | None = None
+    # Access pattern of the tiles, see `benchmark/tiles.py`.
+    pattern: ValueOrExpression | None = None
+    zipf_exponent: ValueOrExpression | None = None
+    cluster_size: ValueOrExpression | None = None
+    cluster_radius: ValueOrExpression | None = None
+    seed: ValueOrExpression | None = None
+
+
+class TileBatchConfig(TestParams):
+    _test_name = TestName.tile_batch
+    fixture: ValueOrExpression | None = None
+    # Clustered by default.
+    pattern: ValueOrExpression | None = None
+    zipf_exponent: ValueOrExpression | None = None
+    cluster_size: ValueOrExpression | None = None
+    cluster_radius: ValueOrExpression | None = None
+    seed: ValueOrExpression | None = None
+    # Tiles read by each request, and the largest gap between two ranges merged into
+    # one request, see `benchmark/ranges.py`.  Ignored by obstore, which coalesces
+    # ranges itself.
+    batch_size: ValueOrExpression | None = None
+    max_gap_bytes: ValueOrExpression | None = None
+
+
+class CatalogScanConfig(TestParams):
+    _test_name = TestName.catalog_scan
+    # Key of the catalog in the fixtures bucket, see `benchmark/catalog.py`.
+    catalog: ValueOrExpression | None = None
+    # Number of distinct keys read, and the order reading them.
+    n_keys: ValueOrExpression | None = None
+    order: ValueOrExpression | None = None
+    zipf_exponent: ValueOrExpression | None = None
+    seed: ValueOrExpression | None = None
+    # Bytes read from the start of each object, the catalog's header size by default.
+    request_size: ValueOrExpression | None = None
+
+
+class SplitReadConfig(TestParams):
+    _test_name = TestName.split_read
+    request_size: ValueOrExpression | None = None
+    # Split each read into `n_parts` parts, or into parts of `part_size` bytes, see
+    # `benchmark/splits.py`.  Sweep one or the other, they're mutually exclusive.
+    n_parts: ValueOrExpression | None = None
+    part_size: ValueOrExpression | None = None
+
+
+class PutObjectConfig(TestParams):
+    _test_name = TestName.put_object
+    object_size: ValueOrExpression | None = None
+    # Uploads are signed unless false, see `benchmark/uploads.py`.
+    signed: ValueOrExpression | None = None
+
+
+class MultipartUploadConfig(TestParams):
+    _test_name = TestName.multipart_upload
+    object_size: ValueOrExpression | None = None
+    # Size of each part, and the parts of one object uploaded at a time.
+    part_size: ValueOrExpression | None = None
+    part_concurrency: ValueOrExpression | None = None
+    signed: ValueOrExpression | None = None
+
+
+class HeadObjectConfig(TestParams):
+    _test_name = TestName.head_object
+    # Key of the catalog in the fixtures bucket, and the keys requested from it, like
+    # `CatalogScanConfig`.
+    catalog: ValueOrExpression | None = None
+    n_keys: ValueOrExpression | None = None
+    order: ValueOrExpression | None = None
+    zipf_exponent: ValueOrExpression | None = None
+    seed: ValueOrExpression | None = None
+
+
+class ListPrefixConfig(TestParams):
+    _test_name = TestName.list_prefix
+    # Number of keys below the listed prefix, see `benchmark/listing.py`.
+    prefix_size: ValueOrExpression | None = None
+    # Keys per page, for the libraries which request the pages themselves.
+    max_keys: ValueOrExpression | None = None
 
 
 """Top level config file"""
@@ -0,0 +1,58 @@
+"""Count the payload bytes delivered to the application.
+
+Network counters include protocol and TLS overhead, retries, and bytes which were
+transferred but never used.  Tests pass the data each request returns through
+`received`, so results can compare useful bytes (goodput) to bytes on the wire.  Upload
+tests count the bytes they send with `sent_bytes` instead, so their throughput is
+compared to the bytes transmitted rather than received.
+"""
+
+import threading
+
+from benchmark import counters, metrics, timeseries
+
+
+# Tests counting the bytes they send rather than receive.
+UPLOAD_TESTS: tuple[str, ...] = ("put_object", "multipart_upload")
+
+_lock = threading.Lock()
+_bytes = 0
+
+
+def reset() -> None:
+    global _bytes
+    _bytes = 0
+
+
+def received(data):
+    """Count `data` as delivered to the application, and return it.  Synchronous clients
+    call this from worker threads."""
+    global _bytes
+    with _lock:
+        _bytes += len(data)
+        timeseries.record(timeseries.Series.bytes, len(data))
+    metrics.payload_received(len(data))
+    return data
+
+
+def received_bytes(n_bytes: int) -> None:
+    """Count `n_bytes` as delivered to the application, for clients which don't return
+    the data they read."""
+    global _bytes
+    with _lock:
+        _bytes += n_bytes
+        timeseries.record(timeseries.Series.bytes, n_bytes)
+    metrics.payload_received(n_bytes)
+
+
+def sent_bytes(n_bytes: int) -> None:
+    """Count `n_bytes` of an object uploaded by the application."""
+    received_bytes(n_bytes)
+
+
+def collect() -> counters.Counts:
+    """Bytes delivered since the last `reset`."""
+    return {"payload_bytes": _bytes}
+
+
+counters.register(reset, collect)
@@ -0,0 +1,61 @@
+"""Sampling profiler, producing collapsed stacks for flamegraphs."""
+
+import collections
+import sys
+import threading
+
+from benchmark.loop_monitor import collapse_stack
+
+
+DEFAULT_PROFILER_FREQUENCY: int = 100
+
+# Deep enough for the event loop, scheduler and client frames of most requests.
+MAX_STACK_DEPTH: int = 64
+
+# Innermost frames of threads which are waiting rather than running.
+IDLE_FRAMES: tuple[str, ...] = (
+    "selectors:EpollSelector.select:",
+    "selectors:KqueueSelector.select:",
+    "selectors:SelectSelector.select:",
+    "threading:Condition.wait:",
+    "threading:Event.wait:",
+    "threading:Thread._wait_for_tstate_lock:",
+    "concurrent.futures.thread:_worker:",
+)
+
+
+def is_idle(stack: str) -> bool:
+    return stack.rsplit(";", 1)[-1].startswith(IDLE_FRAMES)
+
+
+class SamplingProfiler:
+    """Samples the stack of every Python thread `frequency` times per second from a
+    background thread.  Stacks are prefixed by the name of their thread and counted in
+    `stacks`, in the collapsed format used by flamegraph tools.
+
+    Native threads, like the tokio runtime used by `obstore` and `async_tiff`, aren't
+    visible to the profiler.
+    """
+
+    def __init__(self, frequency: int):
+        self.interval = 1 / frequency
+        self.stacks = collections.Counter()
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def _sample(self) -> None:
+        own_thread_id = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread_id:
+                    continue
+                stack = collapse_stack(frame, MAX_STACK_DEPTH)
+                self.stacks[f"{names.get(thread_id, thread_id)};{stack}"] += 1
@@ -0,0 +1,109 @@
+"""Coalesce nearby byte ranges into fewer requests.
+
+Reading several nearby tiles with one request per tile pays a round trip (and a
+request charge) per tile.  `fetch_ranges` merges ranges which are adjacent, or
+separated by at most `max_gap_bytes`, fetches the merged ranges concurrently, and
+returns a `memoryview` slice of the merged response for each range, so no bytes are
+copied.  The bytes in the gaps are fetched but never used, a larger gap trades fewer
+requests for more over-fetched bytes.
+
+Tests count the requests they send and the bytes they fetch with `fetched`, reported
+with the payload bytes delivered to the application to show the tradeoff.
+"""
+
+import asyncio
+import threading
+import typing
+from dataclasses import dataclass, field
+
+from benchmark import counters
+
+
+# object_store (used by obstore) merges ranges less than 1MB apart in `get_ranges`.
+DEFAULT_MAX_GAP_BYTES: int = 1024 * 1024
+OBSTORE_COALESCE_BYTES: int = 1024 * 1024
+
+
+# Reads bytes `start` to `end` of an object, called with `(bucket, key, start=, end=)`.
+RangeRequest = typing.Callable[..., typing.Awaitable[bytes]]
+
+
+@dataclass
+class MergedRange:
+    start: int
+    # Inclusive, like HTTP ranges.
+    end: int
+    # Indexes of the requested ranges covered by this range.
+    members: list[int] = field(default_factory=list)
+
+    @property
+    def size(self) -> int:
+        return self.end - self.start + 1
+
+
+def plan_ranges(
+    ranges: typing.Sequence[tuple[int, int]], max_gap_bytes: int
+) -> list[MergedRange]:
+    """Merge `(start, end)` ranges (inclusive) which are at most `max_gap_bytes` apart.
+    A gap of 0 only merges adjacent ranges, and a negative gap only overlapping ones."""
+    merged: list[MergedRange] = []
+    for idx in sorted(range(len(ranges)), key=lambda idx: ranges[idx]):
+        start, end = ranges[idx]
+        if merged and start - merged[-1].end - 1 <= max_gap_bytes:
+            merged[-1].end = max(merged[-1].end, end)
+            merged[-1].members.append(idx)
+        else:
+            merged.append(MergedRange(start, end, [idx]))
+    return merged
+
+
+_lock = threading.Lock()
+_requests = 0
+_bytes = 0
+
+
+def reset() -> None:
+    global _requests, _bytes
+    _requests = 0
+    _bytes = 0
+
+
+def fetched(n_requests: int, n_bytes: int) -> None:
+    """Count `n_requests` range requests returning `n_bytes`, including bytes which
+    were never used."""
+    global _requests, _bytes
+    with _lock:
+        _requests += n_requests
+        _bytes += n_bytes
+
+
+def collect() -> counters.Counts:
+    """Range requests and the bytes they fetched since the last `reset`."""
+    return {"range_requests": _requests, "fetched_bytes": _bytes}
+
+
+counters.register(reset, collect)
+
+
+async def fetch_ranges(
+    send_range: RangeRequest,
+    bucket: str,
+    key: str,
+    ranges: typing.Sequence[tuple[int, int]],
+    max_gap_bytes: int = DEFAULT_MAX_GAP_BYTES,
+) -> list[memoryview]:
+    """Read each `(start, end)` range (inclusive) of an object, merging nearby ranges
+    into one request.  Returns the bytes of each range, in the order requested."""
+    plan = plan_ranges(ranges, max_gap_bytes)
+    responses = await asyncio.gather(
+        *(send_range(bucket, key, start=r.start, end=r.end) for r in plan)
+    )
+    fetched(len(plan), sum(len(data) for data in responses))
+
+    results: list[memoryview] = [memoryview(b"")] * len(ranges)
+    for merged, data in zip(plan, responses):
+        view = memoryview(data)
+        for idx in merged.members:
+            start, end = ranges[idx]
+            results[idx] = view[start - merged.start : end - merged.start + 1]
+    return results
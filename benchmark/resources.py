@@ -0,0 +1,165 @@
+"""Sample the CPU, memory and network usage of the container from inside the runner.
+
+cAdvisor is only scraped every few seconds, which leaves short runs with a handful of
+samples.  `ResourceSampler` reads the cgroup of the container directly, every
+`SAMPLE_INTERVAL_SECONDS`, so results can be computed without Prometheus.  cgroup v2 is
+read when available, falling back to the cgroup v1 controllers used by older docker
+hosts.  Values which can't be read are stored as `None`.
+"""
+
+import json
+import threading
+import time
+from datetime import datetime, timezone
+
+
+SAMPLE_INTERVAL_SECONDS: float = 0.1
+
+CGROUP_ROOT: str = "/sys/fs/cgroup"
+
+# Columns of the time series, `cpu_usec` and the network counters are cumulative.
+COLUMNS: tuple[str, ...] = (
+    "time",
+    "cpu_usec",
+    "memory_current",
+    "memory_working_set",
+    "memory_peak",
+    "rx_bytes",
+    "tx_bytes",
+)
+
+
+def _read(path: str) -> str | None:
+    try:
+        with open(path) as f:
+            return f.read()
+    except (FileNotFoundError, PermissionError):
+        return None
+
+
+def _read_int(path: str) -> int | None:
+    value = _read(path)
+    if value is None or value.strip() == "max":
+        return None
+    return int(value)
+
+
+def _read_stat(path: str) -> dict[str, int]:
+    """Parse a flat keyed file like `cpu.stat` or `memory.stat`."""
+    value = _read(path)
+    if value is None:
+        return {}
+    return {
+        key: int(count) for key, count in (line.split() for line in value.splitlines())
+    }
+
+
+def read_cpu_usec() -> int | None:
+    """CPU time used by all processes in the container, in microseconds."""
+    cpu_stat = _read_stat(f"{CGROUP_ROOT}/cpu.stat")
+    if "usage_usec" in cpu_stat:
+        return cpu_stat["usage_usec"]
+    usage_ns = _read_int(f"{CGROUP_ROOT}/cpuacct/cpuacct.usage")
+    return usage_ns // 1000 if usage_ns is not None else None
+
+
+def read_memory() -> tuple[int | None, int | None, int | None]:
+    """Current, working set and peak memory of the container, in bytes.  The working
+    set excludes inactive page cache, which the kernel reclaims before running out of
+    memory, as reported by cAdvisor."""
+    current = _read_int(f"{CGROUP_ROOT}/memory.current")
+    if current is not None:
+        peak = _read_int(f"{CGROUP_ROOT}/memory.peak")
+        inactive_file = _read_stat(f"{CGROUP_ROOT}/memory.stat").get("inactive_file", 0)
+    else:
+        current = _read_int(f"{CGROUP_ROOT}/memory/memory.usage_in_bytes")
+        peak = _read_int(f"{CGROUP_ROOT}/memory/memory.max_usage_in_bytes")
+        inactive_file = _read_stat(f"{CGROUP_ROOT}/memory/memory.stat").get(
+            "total_inactive_file", 0
+        )
+    if current is None:
+        return None, None, None
+    return current, max(current - inactive_file, 0), peak
+
+
+def read_network_bytes() -> tuple[int | None, int | None]:
+    """Bytes received and sent by all interfaces except loopback, the container has its
+    own network namespace."""
+    value = _read("/proc/net/dev")
+    if value is None:
+        return None, None
+    rx_bytes = tx_bytes = 0
+    # The first two lines are headers.
+    for line in value.splitlines()[2:]:
+        interface, counters = line.split(":", 1)
+        if interface.strip() == "lo":
+            continue
+        fields = counters.split()
+        rx_bytes += int(fields[0])
+        tx_bytes += int(fields[8])
+    return rx_bytes, tx_bytes
+
+
+def read_sample() -> tuple:
+    return (
+        round(time.time(), 3),
+        read_cpu_usec(),
+        *read_memory(),
+        *read_network_bytes(),
+    )
+
+
+class ResourceSampler:
+    """Samples resource usage of the container every `interval` seconds from a
+    background thread, until stopped."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL_SECONDS):
+        self.interval = interval
+        self.samples: list[tuple] = []
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        self.samples.append(read_sample())
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+        self.samples.append(read_sample())
+
+    def _sample(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.samples.append(read_sample())
+
+    def series(self, start_time: datetime, end_time: datetime) -> dict[str, list]:
+        """Samples between `start_time` and `end_time` (naive UTC, as stored by the
+        schedulers), including the samples on either side so that rates cover the whole
+        window."""
+        start = start_time.replace(tzinfo=timezone.utc).timestamp()
+        end = end_time.replace(tzinfo=timezone.utc).timestamp()
+        times = [sample[0] for sample in self.samples]
+        first = max(sum(t <= start for t in times) - 1, 0)
+        last = min(sum(t < end for t in times) + 1, len(times))
+        return {
+            column: [sample[idx] for sample in self.samples[first:last]]
+            for idx, column in enumerate(COLUMNS)
+        }
+
+
+def series_to_json(series: dict[str, list]) -> str:
+    return json.dumps(series)
+
+
+def series_from_json(data: str | None) -> dict[str, list]:
+    series = json.loads(data or "{}")
+    return {column: series.get(column, []) for column in COLUMNS}
+
+
+def rates(times: list[float], counters: list[int | None]) -> list[float]:
+    """Per-second rate of a cumulative counter between consecutive samples."""
+    return [
+        (c1 - c0) / (t1 - t0)
+        for t0, t1, c0, c1 in zip(times, times[1:], counters, counters[1:])
+        if c0 is not None and c1 is not None and t1 > t0
+    ]
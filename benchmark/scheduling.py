@@ -1,10 +1,382 @@
 """Various ways of scheduling coroutines on an event loop."""
 
 import asyncio
+import enum
+import random
+import time
+from dataclasses import dataclass, replace
 from datetime import datetime
 from typing import Iterable, Coroutine
 
 from benchmark.crud import WorkerState
+from benchmark.histogram import LatencyHistogram
+from benchmark import counters, failures, timeseries, tracing
+from benchmark.loop_monitor import LoopMonitor, DEFAULT_BLOCKING_THRESHOLD_MS
+from benchmark.profiler import SamplingProfiler, DEFAULT_PROFILER_FREQUENCY
+from benchmark.timeseries import Series
+from benchmark.synchronization import (
+    LimiterConfig,
+    LimiterName,
+    configure_limiter,
+    limit_history,
+    DEFAULT_MIN_LIMIT,
+    DEFAULT_MAX_LIMIT,
+)
+
+# Imported to register their counters with `benchmark.counters`.
+from benchmark import buffers, listing, payload, ranges  # noqa: F401
+
+
+DEFAULT_CONCURRENCY: int = 500
+DEFAULT_DRAIN_TIMEOUT_SECONDS: int = 30
+DEFAULT_RATE: float = 100.0
+
+DEFAULT_STEP_DURATION_SECONDS: int = 30
+DEFAULT_MAX_STEPS: int = 10
+DEFAULT_STEP_FACTOR: float = 2.0
+
+# Open-loop requests sent this much later than scheduled are counted as delayed.
+DELAYED_THRESHOLD_SECONDS: float = 0.01
+
+# A load profile is saturated once a step increases throughput by less than
+# MIN_THROUGHPUT_GAIN, or increases p99 latency past MAX_LATENCY_FACTOR times that
+# of the first step.
+MIN_THROUGHPUT_GAIN: float = 0.05
+MAX_LATENCY_FACTOR: float = 3.0
+
+
+class SchedulerName(str, enum.Enum):
+    gather = "gather"
+    closed_loop = "closed_loop"
+    open_loop = "open_loop"
+
+
+class ArrivalProcess(str, enum.Enum):
+    constant = "constant"
+    poisson = "poisson"
+
+
+class LoadProfile(str, enum.Enum):
+    constant = "constant"
+    step = "step"
+    ramp = "ramp"
+
+
+@dataclass
+class SchedulerConfig:
+    """Scheduler configuration.
+
+    `gather` runs `gather_with_timeout` if a timeout is provided, otherwise `gather`.
+    `concurrency` is the number of workers used by `closed_loop`, and the maximum number
+    of requests in flight for `open_loop`.  `rate` (requests per second) and `arrival`
+    only apply to `open_loop`.
+
+    `step` and `ramp` load profiles run the scheduler repeatedly for
+    `step_duration_seconds`, increasing the load (concurrency for `closed_loop`, rate for
+    `open_loop`) between each step until the scheduler saturates or `max_steps` is
+    reached.  `step` multiplies the load by `step_factor` each step while `ramp` adds the
+    initial load each step.
+
+    `limiter` sets the limiter used by functions decorated with
+    `synchronization.concurrency_limit`, adaptive limiters stay between `min_limit` and
+    `max_limit`.
+
+    `monitor_loop` measures event loop lag while the scheduler runs, and samples the
+    stack of code which blocks the event loop for longer than `blocking_threshold_ms`.
+    `profiler` samples the stacks of all threads `profiler_frequency` times per second
+    while the scheduler runs.
+    """
+
+    scheduler: SchedulerName = SchedulerName.gather
+    concurrency: int = DEFAULT_CONCURRENCY
+    drain_timeout_seconds: int = DEFAULT_DRAIN_TIMEOUT_SECONDS
+    rate: float = DEFAULT_RATE
+    arrival: ArrivalProcess = ArrivalProcess.constant
+    profile: LoadProfile = LoadProfile.constant
+    step_duration_seconds: int = DEFAULT_STEP_DURATION_SECONDS
+    max_steps: int = DEFAULT_MAX_STEPS
+    step_factor: float = DEFAULT_STEP_FACTOR
+    limiter: LimiterName = LimiterName.fixed
+    min_limit: int = DEFAULT_MIN_LIMIT
+    max_limit: int = DEFAULT_MAX_LIMIT
+    monitor_loop: bool = False
+    blocking_threshold_ms: int = DEFAULT_BLOCKING_THRESHOLD_MS
+    profiler: bool = False
+    profiler_frequency: int = DEFAULT_PROFILER_FREQUENCY
+
+
+async def schedule(
+    func, n_requests: int, timeout: int | None, config: SchedulerConfig
+) -> WorkerState | list[WorkerState]:
+    """Run the function with the configured scheduler.  Returns one state per step when
+    running a load profile."""
+    if config.profile != LoadProfile.constant:
+        return await load_profile(func, config)
+
+    limiter_config = LimiterConfig(config.limiter, config.min_limit, config.max_limit)
+    if (
+        config.scheduler == SchedulerName.closed_loop
+        and config.limiter == LimiterName.fixed
+    ):
+        # Run every worker, load profiles raise the concurrency past the fixed limit.
+        limiter_config.initial_limit = config.concurrency
+        limiter_config.max_limit = max(config.max_limit, config.concurrency)
+    configure_limiter(limiter_config)
+    tracing.reset()
+    failures.reset()
+    counters.reset()
+    timeseries.reset()
+    if config.monitor_loop:
+        monitor = LoopMonitor(config.blocking_threshold_ms / 1000)
+        monitor.start()
+    if config.profiler:
+        profiler = SamplingProfiler(config.profiler_frequency)
+        profiler.start()
+    cpu_start = time.process_time()
+    state = await _schedule(func, n_requests, timeout, config)
+    state.cpu_seconds = time.process_time() - cpu_start
+    if config.profiler:
+        profiler.stop()
+        state.profile_stacks = dict(profiler.stacks)
+    if config.monitor_loop:
+        await monitor.stop()
+        state.loop_lag = monitor.lag
+        state.blocking_stacks = dict(monitor.blocking_stacks)
+    state.concurrency = config.concurrency
+    state.rate = config.rate
+    state.limit_history = limit_history()
+    state.phases = tracing.phase_histograms()
+    state.failures = failures.failure_history()
+    state.counts = counters.collect()
+    state.timeseries = timeseries.buckets()
+    return state
+
+
+async def _schedule(
+    func, n_requests: int, timeout: int | None, config: SchedulerConfig
+) -> WorkerState:
+    if config.scheduler == SchedulerName.closed_loop:
+        return await closed_loop(
+            func, config.concurrency, n_requests, timeout, config.drain_timeout_seconds
+        )
+    if config.scheduler == SchedulerName.open_loop:
+        return await open_loop(
+            func,
+            config.rate,
+            config.arrival,
+            config.concurrency,
+            n_requests,
+            timeout,
+            config.drain_timeout_seconds,
+        )
+    if timeout:
+        return await gather_with_timeout(func, n_requests, timeout)
+    return await gather(func() for _ in range(n_requests))
+
+
+def requests_per_second(state: WorkerState) -> float:
+    """Successful requests per second."""
+    return state.n_successes / (state.end_time - state.start_time).total_seconds()
+
+
+def find_knee(steps: list[tuple[float, float]]) -> int | None:
+    """Return the index of the first step at which the load profile saturated, given the
+    throughput and p99 latency of each step.  Returns None if it never saturated.
+    """
+    for idx in range(1, len(steps)):
+        throughput, p99 = steps[idx]
+        if throughput < steps[idx - 1][0] * (1 + MIN_THROUGHPUT_GAIN):
+            return idx
+        if p99 > steps[0][1] * MAX_LATENCY_FACTOR:
+            return idx
+    return None
+
+
+async def load_profile(func, config: SchedulerConfig) -> list[WorkerState]:
+    """Run the scheduler with increasing load in steps, stopping at the first step where
+    throughput stops growing or p99 latency blows up (see `find_knee`)."""
+    if config.scheduler == SchedulerName.gather:
+        raise ValueError(
+            "Load profiles require the `closed_loop` or `open_loop` scheduler"
+        )
+
+    states = []
+    steps = []
+    for step in range(config.max_steps):
+        if config.profile == LoadProfile.step:
+            factor = config.step_factor**step
+        else:
+            factor = step + 1
+        step_config = replace(config, profile=LoadProfile.constant)
+        if config.scheduler == SchedulerName.closed_loop:
+            step_config.concurrency = round(config.concurrency * factor)
+        else:
+            step_config.rate = config.rate * factor
+
+        state = await schedule(func, 0, config.step_duration_seconds, step_config)
+        state.step = step
+        states.append(state)
+        steps.append((requests_per_second(state), state.latency.percentile(99)))
+        print(
+            f"step {step} - concurrency: {state.concurrency}, rate: {state.rate}, "
+            f"requests/s: {steps[-1][0]:.1f}, p99 latency: {steps[-1][1]:.4f}s"
+        )
+        if find_knee(steps) is not None:
+            break
+    return states
+
+
+async def closed_loop(
+    func,
+    concurrency: int,
+    n_requests: int,
+    timeout: int | None,
+    drain_timeout: int = DEFAULT_DRAIN_TIMEOUT_SECONDS,
+) -> WorkerState:
+    """Run the function with a fixed number of concurrent workers, each worker starting
+    a new request as soon as its previous request finishes.
+
+    Without a timeout `n_requests` requests are sent in total.  With a timeout the workers
+    stop starting new requests at the deadline and requests which are still in flight are
+    drained and counted, up to `drain_timeout` seconds after which they are cancelled and
+    counted as failures.  Memory use depends on `concurrency` but not on `n_requests`.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout if timeout else None
+    latency = LatencyHistogram()
+    n_remaining = n_requests
+    n_completed = 0
+    n_failures = 0
+
+    def _should_continue() -> bool:
+        nonlocal n_remaining
+        if deadline is not None:
+            return loop.time() < deadline
+        n_remaining -= 1
+        return n_remaining >= 0
+
+    async def _worker():
+        nonlocal n_completed, n_failures
+        while _should_continue():
+            request_start = loop.time()
+            try:
+                await func()
+            except Exception as exc:
+                n_failures += 1
+                failures.record(exc)
+            else:
+                timeseries.record(Series.completions)
+            latency.record(loop.time() - request_start)
+            n_completed += 1
+
+    start_time = datetime.utcnow()
+    workers = [asyncio.create_task(_worker()) for _ in range(concurrency)]
+    if deadline is None:
+        await asyncio.wait(workers)
+    else:
+        await asyncio.wait(workers, timeout=max(deadline - loop.time(), 0))
+
+        # Requests which are still running after the drain period count as failures.
+        n_cancelled = await _drain(set(workers), drain_timeout)
+        n_completed += n_cancelled
+        n_failures += n_cancelled
+    end_time = datetime.utcnow()
+
+    return WorkerState(start_time, end_time, n_completed, n_failures, latency=latency)
+
+
+async def _drain(tasks: set[asyncio.Task], drain_timeout: int) -> int:
+    """Wait for in-flight tasks to finish, cancelling any which are still running after
+    `drain_timeout` seconds.  Returns the number of cancelled tasks."""
+    if not tasks:
+        return 0
+    _, pending = await asyncio.wait(tasks, timeout=drain_timeout)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    if pending:
+        failures.record(None, len(pending))
+    return len(pending)
+
+
+async def open_loop(
+    func,
+    rate: float,
+    arrival: ArrivalProcess,
+    max_in_flight: int,
+    n_requests: int,
+    timeout: int | None,
+    drain_timeout: int = DEFAULT_DRAIN_TIMEOUT_SECONDS,
+) -> WorkerState:
+    """Start requests at a target rate (requests per second), independent of how long
+    previous requests take to finish.
+
+    Arrivals are evenly spaced (`constant`) or exponentially distributed (`poisson`).
+    Latency is measured from the time each request was scheduled to be sent, so time spent
+    waiting on a client which can't keep up is included.  Requests sent more than
+    `DELAYED_THRESHOLD_SECONDS` late are counted as delayed, and requests scheduled while
+    `max_in_flight` requests are already running are dropped.  Runs until the timeout if
+    provided, otherwise until `n_requests` requests have been scheduled.
+    """
+    loop = asyncio.get_running_loop()
+    latency = LatencyHistogram()
+    in_flight = set()
+    n_sent = 0
+    n_failures = 0
+    n_dropped = 0
+    n_delayed = 0
+
+    async def _request(scheduled_time: float):
+        nonlocal n_failures
+        try:
+            await func()
+        except Exception as exc:
+            n_failures += 1
+            failures.record(exc)
+        else:
+            timeseries.record(Series.completions)
+        latency.record(loop.time() - scheduled_time)
+
+    start_time = datetime.utcnow()
+    scheduled_time = loop.time()
+    deadline = scheduled_time + timeout if timeout else None
+    n_scheduled = 0
+    while deadline is not None or n_scheduled < n_requests:
+        if arrival == ArrivalProcess.poisson:
+            scheduled_time += random.expovariate(rate)
+        else:
+            scheduled_time += 1 / rate
+        if deadline is not None and scheduled_time >= deadline:
+            break
+        n_scheduled += 1
+
+        # Requests which are already late are sent immediately.
+        lag = loop.time() - scheduled_time
+        if lag < 0:
+            await asyncio.sleep(-lag)
+        elif lag > DELAYED_THRESHOLD_SECONDS:
+            n_delayed += 1
+
+        if len(in_flight) >= max_in_flight:
+            n_dropped += 1
+            continue
+        task = asyncio.create_task(_request(scheduled_time))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+        n_sent += 1
+
+    n_cancelled = await _drain(in_flight, drain_timeout)
+    end_time = datetime.utcnow()
+
+    return WorkerState(
+        start_time,
+        end_time,
+        n_sent,
+        n_failures + n_cancelled,
+        n_dropped=n_dropped,
+        n_delayed=n_delayed,
+        latency=latency,
+    )
 
 
 async def gather_with_timeout(func, n_requests, timeout) -> WorkerState:
@@ -15,14 +387,23 @@ async def gather_with_timeout(func, n_requests, timeout) -> WorkerState:
     This function is the most efficient when `n_requests` is large enough to cover
     the full timeout.
     """
-    results = []
-    errors = []
+    loop = asyncio.get_running_loop()
+    latency = LatencyHistogram()
+    n_completed = 0
+    n_failures = 0
 
     async def _wrapper():
+        nonlocal n_completed, n_failures
+        request_start = loop.time()
         try:
-            results.append(await func())
+            await func()
         except Exception as exc:
-            errors.append(exc)
+            n_failures += 1
+            failures.record(exc)
+        else:
+            timeseries.record(Series.completions)
+        latency.record(loop.time() - request_start)
+        n_completed += 1
 
     start_time = datetime.utcnow()
     while True:
@@ -41,32 +422,53 @@ async def gather_with_timeout(func, n_requests, timeout) -> WorkerState:
         except TimeoutError:
             end_time = datetime.utcnow()
             return WorkerState(
-                start_time, end_time, len(results) + len(errors), len(errors)
+                start_time, end_time, n_completed, n_failures, latency=latency
             )
 
 
+async def _timed(fut: Coroutine, latency: LatencyHistogram):
+    loop = asyncio.get_running_loop()
+    request_start = loop.time()
+    try:
+        return await fut
+    finally:
+        latency.record(loop.time() - request_start)
+
+
 async def gather(futs: Iterable[Coroutine]) -> WorkerState:
     """Run all coroutines, blocking until they all finish."""
-    # return await asyncio.gather(*futs, return_exceptions=True)
+    latency = LatencyHistogram()
     start_time = datetime.utcnow()
-    results = await asyncio.gather(*futs, return_exceptions=True)
+    results = await asyncio.gather(
+        *[_timed(fut, latency) for fut in futs], return_exceptions=True
+    )
     end_time = datetime.utcnow()
-    n_failures = len([result for result in results if isinstance(result, Exception)])
-    return WorkerState(start_time, end_time, len(results), n_failures)
+    n_failures = 0
+    for result in results:
+        if isinstance(result, Exception):
+            n_failures += 1
+            failures.record(result)
+        else:
+            timeseries.record(Series.completions)
+    return WorkerState(start_time, end_time, len(results), n_failures, latency=latency)
 
 
 async def queue(futs: Iterable[Coroutine], num_workers: int = 3) -> WorkerState:
     """Puts coroutines onto a queue and processes them with multiple workers"""
+    latency = LatencyHistogram()
     failure_count = 0
 
     async def _worker(queue):
-        global failure_count
+        nonlocal failure_count
         while True:
             fut = await queue.get()
             try:
-                await fut
-            except Exception:
+                await _timed(fut, latency)
+            except Exception as exc:
                 failure_count += 1
+                failures.record(exc)
+            else:
+                timeseries.record(Series.completions)
             queue.task_done()
 
     queue = asyncio.Queue()
@@ -95,4 +497,4 @@ async def queue(futs: Iterable[Coroutine], num_workers: int = 3) -> WorkerState:
     # Wait until all worker tasks are cancelled.
     await asyncio.gather(*workers, return_exceptions=True)
 
-    return WorkerState(start_time, end_time, n_tasks, failure_count)
+    return WorkerState(start_time, end_time, n_tasks, failure_count, latency=latency)
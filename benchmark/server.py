@@ -0,0 +1,611 @@
+"""A local S3-compatible server, so tests can run offline and reproducibly.
+
+Serves the files below a root directory, `{root}/{bucket}/{key}`, with path-style
+addressing (`http://host:port/{bucket}/{key}`).  Supports the subset of S3 used by the
+tests:
+- `GetObject`, including a single `Range` header.
+- `HeadObject` and `HeadBucket`.
+- `ListObjectsV2`, with `prefix`, `delimiter`, `max-keys`, `start-after`,
+  `continuation-token` and `encoding-type=url`.
+- `PutObject`, and multipart uploads: `CreateMultipartUpload`, `UploadPart`,
+  `CompleteMultipartUpload` and `AbortMultipartUpload`.
+
+Requests aren't authenticated, signed and unsigned requests are both accepted.  Objects
+are listed and memory-mapped when the server starts, and response bodies are written to
+the socket straight from the mapping.
+
+Uploads are read off the socket and acknowledged, but not stored, so benchmarks don't
+modify the fixtures and aren't limited by the disk.  Processes don't share any state,
+the parts of an upload may be sent to different processes, so upload IDs and ETags are
+generated rather than tracked.
+
+The server speaks HTTP/1.1 on a bare `asyncio.Protocol` rather than a web framework, so
+that it isn't the bottleneck of the clients being benchmarked.  Each process runs its
+own event loop, and processes share the listening ports with `SO_REUSEPORT`.
+
+Besides the unshaped port, each network profile of `benchmark.network` is served on its
+own port, see `network.profile_port`.
+"""
+
+import asyncio
+import base64
+import bisect
+import collections
+import datetime
+import mmap
+import multiprocessing
+import os
+import socket
+import struct
+import urllib.parse
+import uuid
+from dataclasses import dataclass
+from email.utils import formatdate
+from xml.sax.saxutils import escape
+
+from benchmark import network
+
+
+DEFAULT_HOST: str = "0.0.0.0"
+DEFAULT_PORT: int = 9000
+DEFAULT_MAX_KEYS: int = 1000
+
+# Requests with larger headers are rejected.
+MAX_HEADER_BYTES: int = 64 * 1024
+
+# Responses to pipelined requests are copied into a single write until they reach this
+# size, larger bodies are written from the mapping separately.
+COPY_BODY_BYTES: int = 64 * 1024
+
+
+@dataclass
+class S3Object:
+    key: str
+    size: int
+    etag: str
+    # HTTP date, as used by headers.
+    last_modified: str
+    # ISO 8601, as used by listings.
+    last_modified_iso: str
+    data: memoryview
+
+
+def _load_object(path: str, key: str) -> S3Object:
+    stat = os.stat(path)
+    if stat.st_size:
+        with open(path, "rb") as f:
+            data = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    else:
+        data = memoryview(b"")
+    modified = datetime.datetime.fromtimestamp(stat.st_mtime, datetime.timezone.utc)
+    return S3Object(
+        key=key,
+        size=stat.st_size,
+        etag=f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"',
+        last_modified=formatdate(stat.st_mtime, usegmt=True),
+        last_modified_iso=modified.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z",
+        data=data,
+    )
+
+
+class Bucket:
+    """Objects of one bucket, and their keys in sorted order for listing."""
+
+    def __init__(self, path: str):
+        self.objects: dict[str, S3Object] = {}
+        for dirpath, _, filenames in os.walk(path):
+            for filename in filenames:
+                file_path = os.path.join(dirpath, filename)
+                key = os.path.relpath(file_path, path).replace(os.sep, "/")
+                self.objects[key] = _load_object(file_path, key)
+        self.keys = sorted(self.objects)
+
+    def list(
+        self, prefix: str, delimiter: str, start_after: str, max_keys: int
+    ) -> tuple[list[S3Object], list[str], str | None]:
+        """Objects and common prefixes after `start_after`, and the key to continue
+        after if the listing was truncated."""
+        keys = self.keys
+        idx = bisect.bisect_left(keys, prefix)
+        if start_after:
+            idx = max(idx, bisect.bisect_right(keys, start_after))
+        contents = []
+        common_prefixes = []
+        last = None
+        while idx < len(keys) and keys[idx].startswith(prefix):
+            if len(contents) + len(common_prefixes) == max_keys:
+                return contents, common_prefixes, last
+            key = keys[idx]
+            pos = key.find(delimiter, len(prefix)) if delimiter else -1
+            if pos == -1:
+                contents.append(self.objects[key])
+                last = key
+                idx += 1
+            else:
+                common_prefix = key[: pos + len(delimiter)]
+                common_prefixes.append(common_prefix)
+                # Skip the other keys below this prefix, now and when continuing.
+                last = common_prefix + "\U0010ffff"
+                idx = bisect.bisect_left(keys, last, idx)
+        return contents, common_prefixes, None
+
+
+class ObjectStore:
+    """Buckets below `root`, one directory per bucket."""
+
+    def __init__(self, root: str):
+        self.buckets = {
+            entry.name: Bucket(entry.path)
+            for entry in os.scandir(root)
+            if entry.is_dir()
+        }
+
+
+def _error(status: int, code: str, message: str) -> tuple[int, dict, bytes]:
+    body = (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f"<Error><Code>{code}</Code><Message>{escape(message)}</Message></Error>"
+    ).encode()
+    return status, {"Content-Type": "application/xml"}, body
+
+
+_REASONS = {
+    200: "OK",
+    204: "No Content",
+    206: "Partial Content",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    416: "Range Not Satisfiable",
+    431: "Request Header Fields Too Large",
+    501: "Not Implemented",
+    503: "Service Unavailable",
+}
+
+
+def _parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """Inclusive byte range of the first range in a `Range` header, or None if it
+    can't be satisfied."""
+    spec = header.partition("=")[2].split(",")[0].strip()
+    start, _, end = spec.partition("-")
+    if not start:
+        # Suffix range, the last `end` bytes.
+        length = min(int(end), size)
+        return (size - length, size - 1) if length else None
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or end < start:
+        return None
+    return start, end
+
+
+def _quote(value: str, encode: bool) -> str:
+    return escape(urllib.parse.quote(value, safe="/") if encode else value)
+
+
+def _response_head(status: int, headers: dict, body) -> bytes:
+    if "Content-Length" not in headers:
+        headers["Content-Length"] = len(body)
+    lines = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+class S3Protocol(asyncio.Protocol):
+    """Handles the requests of one connection, keeping it open between requests.
+    Responses to all requests received at once are sent together."""
+
+    def __init__(self, store: ObjectStore):
+        self.store = store
+        self.transport = None
+        self._buffer = bytearray()
+        # Body bytes of the current request still to be discarded.
+        self._discard = 0
+        # Request waiting for its body before being handled.
+        self._waiting: tuple | None = None
+        self._output = bytearray()
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data: bytes):
+        self._buffer += data
+        self._process()
+        self._flush()
+
+    def _process(self) -> None:
+        buffer = self._buffer
+        while True:
+            if self._discard:
+                n = min(self._discard, len(buffer))
+                del buffer[:n]
+                self._discard -= n
+                if self._discard:
+                    return
+            if self._waiting is not None:
+                request, self._waiting = self._waiting, None
+                if not self._dispatch(*request):
+                    return
+            end = buffer.find(b"\r\n\r\n")
+            if end == -1:
+                if len(buffer) > MAX_HEADER_BYTES:
+                    self._respond(*_error(431, "BadRequest", "Headers too large"))
+                    self._close()
+                return
+            head = bytes(buffer[:end]).decode("latin-1")
+            del buffer[: end + 4]
+            if not self._handle(head):
+                return
+
+    def _flush(self) -> None:
+        if self._output:
+            self.transport.write(self._output)
+            self._output = bytearray()
+
+    def _close(self) -> None:
+        self._flush()
+        self.transport.close()
+
+    def _handle(self, head: str) -> bool:
+        """Handle one request, returns False if the connection was closed."""
+        request_line, *header_lines = head.split("\r\n")
+        try:
+            method, target, version = request_line.split(" ")
+        except ValueError:
+            self._respond(*_error(400, "BadRequest", "Malformed request line"))
+            self._close()
+            return False
+        headers = {}
+        for line in header_lines:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            self._respond(
+                *_error(501, "NotImplemented", "Chunked bodies aren't supported")
+            )
+            self._close()
+            return False
+        self._discard = int(headers.get("content-length", 0))
+        if self._discard and method in ("PUT", "POST"):
+            # Respond to uploads once their body has been received.
+            if headers.get("expect", "").lower() == "100-continue":
+                self._output += b"HTTP/1.1 100 Continue\r\n\r\n"
+            self._waiting = (method, target, headers, version)
+            return True
+        return self._dispatch(method, target, headers, version)
+
+    def _dispatch(self, method: str, target: str, headers: dict, version: str) -> bool:
+        """Route a request and respond, returns False if the connection was closed."""
+        status, response_headers, body = self.route(method, target, headers)
+        keep_alive = (
+            headers.get("connection", "").lower() != "close"
+            if version == "HTTP/1.1"
+            else headers.get("connection", "").lower() == "keep-alive"
+        )
+        if not keep_alive:
+            response_headers["Connection"] = "close"
+        self._respond(status, response_headers, body, head_only=method == "HEAD")
+        if not keep_alive:
+            self._close()
+            return False
+        return True
+
+    def _respond(
+        self, status: int, headers: dict, body, head_only: bool = False
+    ) -> None:
+        self._output += _response_head(status, headers, body)
+        if head_only or not body:
+            return
+        if len(body) <= COPY_BODY_BYTES:
+            self._output += body
+            if len(self._output) > COPY_BODY_BYTES:
+                self._flush()
+        else:
+            self._flush()
+            self.transport.write(body)
+
+    def route(self, method: str, target: str, headers: dict) -> tuple[int, dict, bytes]:
+        path, _, query = target.partition("?")
+        bucket_name, _, key = urllib.parse.unquote(path.lstrip("/")).partition("/")
+        bucket = self.store.buckets.get(bucket_name)
+        if bucket is None:
+            return _error(404, "NoSuchBucket", f"Bucket {bucket_name} does not exist")
+        if method in ("PUT", "POST", "DELETE") and key:
+            return self.upload(method, bucket_name, key, query)
+        if method not in ("GET", "HEAD"):
+            return _error(501, "NotImplemented", f"{method} is not supported")
+        if not key:
+            if method == "HEAD":
+                return 200, {}, b""
+            return self.list_objects(bucket_name, bucket, query)
+        obj = bucket.objects.get(key)
+        if obj is None:
+            return _error(404, "NoSuchKey", f"Key {key} does not exist")
+        return self.get_object(obj, headers.get("range"))
+
+    def get_object(self, obj: S3Object, range_header: str | None):
+        headers = {
+            "Content-Type": "application/octet-stream",
+            "Accept-Ranges": "bytes",
+            "ETag": obj.etag,
+            "Last-Modified": obj.last_modified,
+        }
+        if range_header is None:
+            return 200, headers, obj.data
+        byte_range = _parse_range(range_header, obj.size)
+        if byte_range is None:
+            status, error_headers, body = _error(
+                416, "InvalidRange", "The requested range is not satisfiable"
+            )
+            return (
+                status,
+                error_headers | {"Content-Range": f"bytes */{obj.size}"},
+                body,
+            )
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{obj.size}"
+        return 206, headers, obj.data[start : end + 1]
+
+    def upload(self, method: str, bucket_name: str, key: str, query: str):
+        params = dict(urllib.parse.parse_qsl(query, keep_blank_values=True))
+        upload_id = params.get("uploadId")
+        if method == "PUT":
+            # `PutObject`, or `UploadPart` of a multipart upload.
+            return 200, {"ETag": f'"{uuid.uuid4().hex}"'}, b""
+        if method == "DELETE":
+            if upload_id is None:
+                return _error(501, "NotImplemented", "DeleteObject is not supported")
+            return 204, {}, b""
+        if "uploads" in params:
+            result = (
+                "InitiateMultipartUploadResult",
+                f"<Bucket>{escape(bucket_name)}</Bucket><Key>{escape(key)}</Key>"
+                f"<UploadId>{uuid.uuid4().hex}</UploadId>",
+            )
+        elif upload_id is not None:
+            result = (
+                "CompleteMultipartUploadResult",
+                f"<Location>/{escape(bucket_name)}/{escape(key)}</Location>"
+                f"<Bucket>{escape(bucket_name)}</Bucket><Key>{escape(key)}</Key>"
+                f"<ETag>&quot;{uuid.uuid4().hex}-1&quot;</ETag>",
+            )
+        else:
+            return _error(501, "NotImplemented", "POST is only supported for uploads")
+        name, content = result
+        body = (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<{name} xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+            f"{content}</{name}>"
+        )
+        return 200, {"Content-Type": "application/xml"}, body.encode()
+
+    def list_objects(self, bucket_name: str, bucket: Bucket, query: str):
+        params = dict(urllib.parse.parse_qsl(query, keep_blank_values=True))
+        prefix = params.get("prefix", "")
+        delimiter = params.get("delimiter", "")
+        max_keys = int(params.get("max-keys", DEFAULT_MAX_KEYS))
+        encode = params.get("encoding-type") == "url"
+        token = params.get("continuation-token")
+        start_after = (
+            base64.urlsafe_b64decode(token).decode()
+            if token
+            else params.get("start-after", params.get("marker", ""))
+        )
+        contents, common_prefixes, next_key = bucket.list(
+            prefix, delimiter, start_after, max_keys
+        )
+
+        parts = [
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">',
+            f"<Name>{escape(bucket_name)}</Name>",
+            f"<Prefix>{_quote(prefix, encode)}</Prefix>",
+            f"<KeyCount>{len(contents) + len(common_prefixes)}</KeyCount>",
+            f"<MaxKeys>{max_keys}</MaxKeys>",
+            f"<IsTruncated>{'true' if next_key else 'false'}</IsTruncated>",
+        ]
+        if delimiter:
+            parts.append(f"<Delimiter>{_quote(delimiter, encode)}</Delimiter>")
+        if encode:
+            parts.append("<EncodingType>url</EncodingType>")
+        if token:
+            parts.append(f"<ContinuationToken>{token}</ContinuationToken>")
+        if next_key:
+            next_token = base64.urlsafe_b64encode(next_key.encode()).decode()
+            parts.append(f"<NextContinuationToken>{next_token}</NextContinuationToken>")
+        for obj in contents:
+            parts.append(
+                f"<Contents><Key>{_quote(obj.key, encode)}</Key>"
+                f"<LastModified>{obj.last_modified_iso}</LastModified>"
+                f"<ETag>{escape(obj.etag)}</ETag><Size>{obj.size}</Size>"
+                "<StorageClass>STANDARD</StorageClass></Contents>"
+            )
+        for common_prefix in common_prefixes:
+            parts.append(
+                f"<CommonPrefixes><Prefix>{_quote(common_prefix, encode)}</Prefix>"
+                "</CommonPrefixes>"
+            )
+        parts.append("</ListBucketResult>")
+        return 200, {"Content-Type": "application/xml"}, "".join(parts).encode()
+
+
+# Markers queued by `ShapedS3Protocol` in place of a response.
+_CLOSE = b"close"
+_RESET = b"reset"
+
+
+class ShapedS3Protocol(S3Protocol):
+    """Emulates the network profile of `link`.  Responses are delayed by the latency of
+    the profile and sent in order, with their bodies paced to the bandwidth of the
+    connection.  Responses to uploads also wait until the request body would have been
+    received at that bandwidth.  Some requests are answered with `503 SlowDown`, or
+    reset the connection."""
+
+    def __init__(self, store: ObjectStore, link: network.Link):
+        super().__init__(store)
+        self.link = link
+        # Responses waiting to be sent, as (time to send, head, body).
+        self._pending: collections.deque = collections.deque()
+        self._sending = False
+        self._ready_at = 0.0
+        # The TCP handshake takes a round trip before the first request is sent.
+        self._handshake = link.rtt
+        self._first_byte_at: float | None = None
+        self._first_upload_at: float | None = None
+        # When the headers of the current request were received, and when its body
+        # would have been.
+        self._received_at = 0.0
+        self._body_done_at = 0.0
+
+    def connection_made(self, transport):
+        super().connection_made(transport)
+        self._loop = asyncio.get_running_loop()
+
+    def _handle(self, head: str) -> bool:
+        self._received_at = self._loop.time()
+        return super()._handle(head)
+
+    def _dispatch(self, method: str, target: str, headers: dict, version: str) -> bool:
+        n_bytes = int(headers.get("content-length", 0))
+        if n_bytes and method in ("PUT", "POST"):
+            self._body_done_at = self._receive_body(n_bytes)
+        return super()._dispatch(method, target, headers, version)
+
+    def _receive_body(self, n_bytes: int) -> float:
+        """Time at which a request body of `n_bytes` would have been received, sent in
+        chunks at the current rate of the connection like response bodies."""
+        if self._first_upload_at is None:
+            self._first_upload_at = self._received_at
+        done = self._received_at
+        while n_bytes:
+            rate = self.link.rate(done - self._first_upload_at)
+            chunk_size = min(self.link.chunk_size(rate) or n_bytes, n_bytes)
+            done = self.link.transmit(chunk_size, done, rate)
+            n_bytes -= chunk_size
+        return done
+
+    def route(self, method: str, target: str, headers: dict) -> tuple[int, dict, bytes]:
+        if self.link.inject_error():
+            return _error(503, "SlowDown", "Please reduce your request rate.")
+        return super().route(method, target, headers)
+
+    def _respond(
+        self, status: int, headers: dict, body, head_only: bool = False
+    ) -> None:
+        if self.link.inject_reset():
+            self._enqueue(_RESET, b"")
+            return
+        head = _response_head(status, headers, body)
+        self._enqueue(head, b"" if head_only else body)
+
+    def _close(self) -> None:
+        self._enqueue(_CLOSE, b"")
+
+    def _enqueue(self, head: bytes, body) -> None:
+        latency = self.link.latency() + self._handshake
+        self._handshake = 0.0
+        start = max(self._loop.time(), self._body_done_at)
+        # A response can't overtake the one before it.
+        self._ready_at = max(start + latency, self._ready_at)
+        self._pending.append((self._ready_at, head, body))
+        if not self._sending:
+            self._send_next()
+
+    def _send_next(self) -> None:
+        if not self._pending or self.transport.is_closing():
+            self._sending = False
+            return
+        self._sending = True
+        self._loop.call_at(self._pending[0][0], self._send_response)
+
+    def _send_response(self) -> None:
+        _, head, body = self._pending.popleft()
+        if self.transport.is_closing():
+            return
+        if head is _RESET:
+            self._reset()
+        elif head is _CLOSE:
+            self.transport.close()
+        else:
+            self._send_body(head, body)
+
+    def _send_body(self, head: bytes, body) -> None:
+        """Write the next chunk of `body`, after `head`, and wait until it has been
+        transmitted at the current rate of the connection."""
+        if self.transport.is_closing():
+            return
+        now = self._loop.time()
+        if self._first_byte_at is None:
+            self._first_byte_at = now
+        rate = self.link.rate(now - self._first_byte_at)
+        chunk_size = self.link.chunk_size(rate) or len(body)
+        chunk = body[:chunk_size]
+        self.transport.writelines([head, chunk] if chunk else [head])
+        done = self.link.transmit(len(head) + len(chunk), now, rate)
+        if len(body) > chunk_size:
+            self._loop.call_at(done, self._send_body, b"", body[chunk_size:])
+        else:
+            self._loop.call_at(done, self._send_next)
+
+    def _reset(self) -> None:
+        """Close the connection with a TCP reset, rather than gracefully."""
+        sock = self.transport.get_extra_info("socket")
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        self.transport.abort()
+        self._pending.clear()
+
+
+async def _serve(store: ObjectStore, host: str, port: int, processes: int) -> None:
+    """Serve `store` unshaped on `port`, and with each network profile on its own
+    port."""
+    loop = asyncio.get_running_loop()
+    servers = [
+        await loop.create_server(
+            lambda: S3Protocol(store), host, port, reuse_port=True, backlog=4096
+        )
+    ]
+    for name, profile in network.PROFILES.items():
+        link = network.Link(profile, processes)
+        servers.append(
+            await loop.create_server(
+                lambda link=link: ShapedS3Protocol(store, link),
+                host,
+                network.profile_port(port, name),
+                reuse_port=True,
+                backlog=4096,
+            )
+        )
+    await asyncio.gather(*(server.serve_forever() for server in servers))
+
+
+def _run_process(root: str, host: str, port: int, processes: int) -> None:
+    asyncio.run(_serve(ObjectStore(root), host, port, processes))
+
+
+def serve(
+    root: str, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, processes: int = 1
+) -> None:
+    """Serve the buckets below `root` until interrupted, from `processes` processes."""
+    if processes == 1:
+        _run_process(root, host, port, processes)
+        return
+    workers = start(root, host, port, processes)
+    for worker in workers:
+        worker.join()
+
+
+def start(
+    root: str, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, processes: int = 1
+) -> list[multiprocessing.Process]:
+    """Serve the buckets below `root` from background processes, which are terminated
+    when the calling process exits."""
+    ctx = multiprocessing.get_context("spawn")
+    workers = [
+        ctx.Process(
+            target=_run_process, args=(root, host, port, processes), daemon=True
+        )
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    return workers
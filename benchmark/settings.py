@@ -7,6 +7,10 @@ class Settings(BaseSettings):
     HOSTNAME: str = ""  # set by docker
     DB_FILEPATH: str = "sqlite.db"
     PROMETHEUS_BASE_URL: str = "http://localhost:9090"
+    # Send requests to an S3-compatible server, like `benchmark serve`, instead of AWS.
+    S3_ENDPOINT_URL: str = ""
+    # Network profile emulated by the server at `S3_ENDPOINT_URL`, ex. `cross-region`.
+    NETWORK_PROFILE: str = ""
 
 
 @lru_cache
@@ -0,0 +1,161 @@
+"""Split large reads into concurrent part requests.
+
+A single connection rarely fills the bandwidth available to a client: each one is
+limited by its congestion window, and by per-connection limits of the server.  A
+`split_read` test splits every read of `request_size` bytes into parts, requests them
+concurrently and writes each part into its own slice of one preallocated buffer, so
+the parts are reassembled without copying the body again.  The split is either
+`n_parts` parts of about equal size, or parts of `part_size` bytes (the last part may
+be smaller).
+
+`benchmark run-split-sweep` runs `split_read` in-process for every library over a range
+of splits and reports the fastest split of each library and request size.  Parts are
+counted as range requests, so results also show the requests sent per read.
+"""
+
+import asyncio
+import math
+import typing
+from importlib import import_module
+
+import pandas as pd
+
+from benchmark import buffers, ranges
+from benchmark.aggregate import summarize_client_cpu
+from benchmark.clients import HttpClientConfig
+from benchmark.crud import WorkerState
+from benchmark.scheduling import SchedulerConfig
+
+
+TEST_NAME: str = "split_read"
+DEFAULT_REQUEST_SIZES: tuple[int, ...] = (2**20, 2**21)
+DEFAULT_PARTS: tuple[int, ...] = (1, 2, 4, 8, 16)
+DEFAULT_PART_SIZES: tuple[int, ...] = (2**18, 2**19)
+
+# Reads the part between `start` and `end` (exclusive) into `view`, returning the
+# number of bytes read.
+ReadPart = typing.Callable[[int, int, memoryview], typing.Awaitable[int]]
+
+
+def split_range(
+    size: int, n_parts: int | None = None, part_size: int | None = None
+) -> list[tuple[int, int]]:
+    """The `(start, end)` of each part of the first `size` bytes, `end` exclusive."""
+    if size <= 0:
+        raise ValueError(f"Size must be positive, not {size}")
+    if n_parts is not None and part_size is not None:
+        raise ValueError("'n_parts' and 'part_size' are mutually exclusive")
+    if part_size is None:
+        n_parts = 1 if n_parts is None else n_parts
+        if n_parts <= 0:
+            raise ValueError(f"Number of parts must be positive, not {n_parts}")
+        part_size = math.ceil(size / min(n_parts, size))
+    elif part_size <= 0:
+        raise ValueError(f"Part size must be positive, not {part_size}")
+    return [
+        (start, min(start + part_size, size)) for start in range(0, size, part_size)
+    ]
+
+
+async def fetch_split(
+    read_part: ReadPart, parts: list[tuple[int, int]], buffer: bytearray
+) -> memoryview:
+    """Request every part concurrently, each written into its own slice of `buffer`,
+    and return the part of `buffer` they filled."""
+    view = memoryview(buffer)
+    n_bytes = await asyncio.gather(
+        *(read_part(start, end, view[start:end]) for start, end in parts)
+    )
+    for (start, end), n in zip(parts, n_bytes):
+        if n != end - start:
+            raise ValueError(f"Part {start}-{end} returned {n} bytes")
+    size = parts[-1][1]
+    ranges.fetched(len(parts), size)
+    # Each part was copied into its slice once, which copies the body once.
+    buffers.copied()
+    return view[:size]
+
+
+def splits(
+    request_size: int, parts: tuple[int, ...], part_sizes: tuple[int, ...]
+) -> list[dict]:
+    """Test params of every split swept for `request_size`, skipping part sizes which
+    wouldn't split it."""
+    return [{"n_parts": n} for n in parts if n <= request_size] + [
+        {"part_size": size} for size in part_sizes if size < request_size
+    ]
+
+
+def _summarize(library_name: str, params: dict, state: WorkerState) -> dict:
+    duration_seconds = (state.end_time - state.start_time).total_seconds()
+    return {
+        "library_name": library_name,
+        "request_size": params["request_size"],
+        "n_parts": len(
+            split_range(
+                params["request_size"], params.get("n_parts"), params.get("part_size")
+            )
+        ),
+        "part_size": params.get("part_size"),
+        "number_requests": state.n_requests,
+        "number_failures": state.n_failures,
+        "duration_seconds": duration_seconds,
+        "requests_per_second": state.n_requests / duration_seconds,
+        "payload_bytes_per_second": state.counts["payload_bytes"] / duration_seconds,
+        "latency_p50_seconds": state.latency.percentile(50),
+        "latency_p99_seconds": state.latency.percentile(99),
+        **summarize_client_cpu(
+            state.cpu_seconds, state.n_requests, state.counts["payload_bytes"]
+        ),
+    }
+
+
+def run_sweep(
+    libraries: typing.Iterable[str],
+    n_requests: int,
+    client_config: HttpClientConfig,
+    scheduler_config: SchedulerConfig,
+    request_sizes: tuple[int, ...] = DEFAULT_REQUEST_SIZES,
+    parts: tuple[int, ...] = DEFAULT_PARTS,
+    part_sizes: tuple[int, ...] = DEFAULT_PART_SIZES,
+) -> pd.DataFrame:
+    """Run `split_read` for each library, request size and split, one at a time in this
+    process."""
+    results = []
+    for library_name in libraries:
+        mod = import_module(f"benchmark.tests.{library_name}.{TEST_NAME}")
+        for request_size in request_sizes:
+            for split in splits(request_size, parts, part_sizes):
+                params = {"request_size": request_size, **split}
+                print(f"Running {library_name}.{TEST_NAME} {params}")
+                state = mod.main(
+                    client_config, n_requests, None, params, scheduler_config
+                )
+                # Load profiles return one state per step.
+                for step_state in state if isinstance(state, list) else [state]:
+                    results.append(_summarize(library_name, params, step_state))
+    return pd.DataFrame.from_records(results)
+
+
+def fastest(results: pd.DataFrame) -> pd.DataFrame:
+    """The split with the highest payload throughput for each library and request
+    size, among runs without failures."""
+    ok = results[results["number_failures"] == 0]
+    best = ok.loc[
+        ok.groupby(["library_name", "request_size"])[
+            "payload_bytes_per_second"
+        ].idxmax()
+    ]
+    unsplit = (
+        ok[ok["n_parts"] == 1]
+        .groupby(["library_name", "request_size"])["payload_bytes_per_second"]
+        .max()
+    )
+    best = best.join(
+        unsplit.rename("unsplit_payload_bytes_per_second"),
+        on=["library_name", "request_size"],
+    )
+    best["speedup"] = (
+        best["payload_bytes_per_second"] / best["unsplit_payload_bytes_per_second"]
+    )
+    return best.reset_index(drop=True)
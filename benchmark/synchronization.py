@@ -1,6 +1,17 @@
 import asyncio
+import collections
+import enum
+import math
+import time
+from dataclasses import dataclass
 from functools import wraps
 
+from benchmark import metrics
+
+
+DEFAULT_MIN_LIMIT: int = 1
+DEFAULT_MAX_LIMIT: int = 2000
+
 
 def semaphore(n):
     """Decorates a coroutine with a semaphore."""
@@ -15,3 +26,226 @@ def semaphore(n):
         return wrapper
 
     return _semaphore
+
+
+class LimiterName(str, enum.Enum):
+    fixed = "fixed"
+    aimd = "aimd"
+    gradient = "gradient"
+
+
+@dataclass
+class LimiterConfig:
+    limiter: LimiterName = LimiterName.fixed
+    min_limit: int = DEFAULT_MIN_LIMIT
+    max_limit: int = DEFAULT_MAX_LIMIT
+    # Start limiters at least this high, rather than at the `n` of `concurrency_limit`.
+    initial_limit: int | None = None
+
+
+class Limiter:
+    """Limits the number of concurrent requests, like a semaphore whose size may change
+    while requests are running.  The fixed limiter never changes its limit, subclasses
+    adjust it from the latency and outcome of each request.
+
+    The limit is recorded once per second in `history`, and printed by adaptive limiters.
+    """
+
+    adaptive: bool = False
+
+    def __init__(self, initial_limit: int, min_limit: int, max_limit: int):
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.in_flight = 0
+        self.history = []
+        self._waiters = collections.deque()
+        self._start_time = time.monotonic()
+
+    async def acquire(self) -> None:
+        if self.in_flight >= int(self.limit) or self._waiters:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Hand the slot on if it was given to this waiter before cancellation.
+                if waiter.done() and not waiter.cancelled():
+                    self.in_flight -= 1
+                    self._wake()
+                raise
+        else:
+            self.in_flight += 1
+
+    def release(self, latency: float, failed: bool) -> None:
+        self.in_flight -= 1
+        self.update(latency, failed)
+        self.limit = min(max(self.limit, self.min_limit), self.max_limit)
+        self._record()
+        self._wake()
+
+    def update(self, latency: float, failed: bool) -> None:
+        pass
+
+    def _wake(self) -> None:
+        # Slots are handed over to waiters directly, `in_flight` includes them.
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self.in_flight += 1
+
+    def _record(self) -> None:
+        elapsed = time.monotonic() - self._start_time
+        while len(self.history) <= elapsed:
+            self.history.append(int(self.limit))
+            if self.adaptive:
+                print(f"concurrency limit: {int(self.limit)}")
+
+
+class AIMDLimiter(Limiter):
+    """Additive increase, multiplicative decrease.
+
+    The limit grows by one for every `limit` successful requests while the limit is in
+    use, and shrinks by `backoff` on failures or when latency rises past `tolerance`
+    times the lowest latency seen.  The limit shrinks at most once per request latency.
+    """
+
+    adaptive = True
+    backoff: float = 0.9
+    tolerance: float = 2.0
+
+    def __init__(self, initial_limit: int, min_limit: int, max_limit: int):
+        super().__init__(initial_limit, min_limit, max_limit)
+        self._min_latency = math.inf
+        self._last_decrease = 0.0
+
+    def update(self, latency: float, failed: bool) -> None:
+        self._min_latency = min(self._min_latency, latency)
+        if failed or latency > self._min_latency * self.tolerance:
+            now = time.monotonic()
+            if now - self._last_decrease > latency:
+                self.limit *= self.backoff
+                self._last_decrease = now
+        elif self.in_flight + 1 >= self.limit / 2:
+            self.limit += 1 / self.limit
+
+
+class GradientLimiter(Limiter):
+    """Scales the limit by the ratio of no-load to current latency, similar to Netflix's
+    Gradient limiter.
+
+    Latency is averaged over windows of `limit` requests, the lowest latency of any
+    request is used as the no-load latency.  After each window the limit is scaled by
+    `tolerance` times the ratio of no-load latency to the window's latency, clamped
+    between 0.5 and 1, and then grows by `sqrt(limit)` which allows a small queue to
+    form.  Windows containing failures halve the limit.
+    """
+
+    adaptive = True
+    tolerance: float = 1.5
+    smoothing: float = 0.2
+
+    def __init__(self, initial_limit: int, min_limit: int, max_limit: int):
+        super().__init__(initial_limit, min_limit, max_limit)
+        self._min_latency = math.inf
+        self._window_latency = 0.0
+        self._window_count = 0
+        self._window_failed = False
+
+    def update(self, latency: float, failed: bool) -> None:
+        self._min_latency = min(self._min_latency, latency)
+        self._window_latency += latency
+        self._window_count += 1
+        self._window_failed |= failed
+        if self._window_count < self.limit:
+            return
+
+        if self._window_failed:
+            gradient = 0.5
+        else:
+            window_latency = self._window_latency / self._window_count
+            gradient = self.tolerance * self._min_latency / window_latency
+            gradient = max(0.5, min(1.0, gradient))
+        new_limit = self.limit * gradient + math.sqrt(self.limit)
+        self.limit = self.limit * (1 - self.smoothing) + new_limit * self.smoothing
+
+        self._window_latency = 0.0
+        self._window_count = 0
+        self._window_failed = False
+
+
+_LIMITERS = {
+    LimiterName.fixed: Limiter,
+    LimiterName.aimd: AIMDLimiter,
+    LimiterName.gradient: GradientLimiter,
+}
+
+_config = LimiterConfig()
+_limiters: list[Limiter] = []
+
+
+def configure_limiter(config: LimiterConfig) -> None:
+    """Set the limiter used by functions decorated with `concurrency_limit`, limiters are
+    created again the next time each function is called."""
+    global _config
+    _config = config
+    _limiters.clear()
+
+
+def limit_history() -> list[int]:
+    """Concurrency limit of each second since the limiters were configured, summed across
+    all decorated functions which have been called."""
+    history = []
+    for limiter in _limiters:
+        for idx, limit in enumerate(limiter.history):
+            if idx < len(history):
+                history[idx] += limit
+            else:
+                history.append(limit)
+    return history
+
+
+def concurrency_limit(n):
+    """Decorates a coroutine with a concurrency limit, initially `n` or the configured
+    `initial_limit` if higher.  The limit is fixed unless an adaptive limiter is set with
+    `configure_limiter`."""
+
+    def _concurrency_limit(f):
+        limiter = None
+        config = None
+
+        @wraps(f)
+        async def wrapper(*args, **kwargs):
+            nonlocal limiter, config
+            if config is not _config:
+                config = _config
+                limiter = _LIMITERS[config.limiter](
+                    max(n, config.initial_limit or n),
+                    config.min_limit,
+                    config.max_limit,
+                )
+                _limiters.append(limiter)
+
+            await limiter.acquire()
+            metrics.request_started()
+            start_time = time.monotonic()
+            try:
+                result = await f(*args, **kwargs)
+            except asyncio.CancelledError:
+                limiter.release(time.monotonic() - start_time, failed=True)
+                metrics.request_cancelled()
+                raise
+            except BaseException as exc:
+                latency = time.monotonic() - start_time
+                limiter.release(latency, failed=True)
+                metrics.request_failed(exc)
+                raise
+            latency = time.monotonic() - start_time
+            limiter.release(latency, failed=False)
+            metrics.request_finished(latency)
+            return result
+
+        return wrapper
+
+    return _concurrency_limit
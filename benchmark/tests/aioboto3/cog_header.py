@@ -3,54 +3,96 @@ import functools
 import typing
 
 from botocore import UNSIGNED
-from cog_layers.reader.cog import open_cog
 
-from benchmark import scheduling
-from benchmark.synchronization import semaphore
+from benchmark import payload, scheduling
+from benchmark.fixtures import (
+    DEFAULT_PREFETCH_BYTES,
+    FIXTURES_BUCKET,
+    MANIFEST_KEY,
+    open_cog_header,
+    parse_manifest,
+)
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
 from benchmark.clients import HttpClientConfig, create_aioboto3_s3_client
 
 bucket_name = "sentinel-cogs"
 key = "sentinel-s2-l2a-cogs/50/C/MA/2021/1/S2A_50CMA_20210121_0_L2A/B08.tif"
+header_size_bytes = 16384
 
 
-@semaphore(500)
+@concurrency_limit(500)
 async def send_range_aioboto3(
     bucket: str, key: str, start: int, end: int, client: typing.Any | None
 ):
     resp = await client.get_object(Bucket=bucket, Key=key, Range=f"bytes={start}-{end}")
-    return await resp["Body"].read()
+    return payload.received(await resp["Body"].read())
 
 
-async def fut(s3_client):
-    """Request the first 16KB of a file, simulating COG header request.
+async def fut(
+    s3_client,
+    bucket: str,
+    key: str,
+    header_size: int,
+    prefetch_bytes: int,
+    ifd_ranges: tuple[tuple[int, int], ...],
+):
+    """Request the header of a file, simulating COG header request.
 
-    Semaphore allows this function to be called 500 times concurrently
+    Concurrency limit allows this function to be called 500 times concurrently
     """
-    await open_cog(
+    await open_cog_header(
         functools.partial(send_range_aioboto3, client=s3_client),
-        bucket=bucket_name,
-        key=key,
-        header_size_bytes=16384,
+        bucket,
+        key,
+        header_size,
+        prefetch_bytes,
+        ifd_ranges,
     )
 
 
-async def run(config: HttpClientConfig, n_requests: int, timeout: int | None):
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    fixture: str | None,
+    prefetch_bytes: int,
+):
     async with create_aioboto3_s3_client(
         config, "us-west-2", signature_version=UNSIGNED
     ) as s3_client:
-        if timeout:
-            results = await scheduling.gather_with_timeout(
-                functools.partial(fut, s3_client), n_requests, timeout
-            )
-        else:
-            futures = (fut(s3_client) for _ in range(n_requests))
-            results = await scheduling.gather(futures)
+        bucket, path, header_size = bucket_name, key, header_size_bytes
+        ifd_ranges = ()
+        if fixture:
+            resp = await s3_client.get_object(Bucket=FIXTURES_BUCKET, Key=MANIFEST_KEY)
+            cog = parse_manifest(await resp["Body"].read())[fixture]
+            bucket, path, header_size = FIXTURES_BUCKET, cog.key, cog.header_size_bytes
+            ifd_ranges = cog.ifd_ranges
+        results = await scheduling.schedule(
+            functools.partial(
+                fut, s3_client, bucket, path, header_size, prefetch_bytes, ifd_ranges
+            ),
+            n_requests,
+            timeout,
+            scheduler_config,
+        )
     return results
 
 
-def main(config: HttpClientConfig, n_requests: int, timeout: int | None, params: dict):
-    return asyncio.run(run(config, n_requests, timeout))
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    fixture = params.get("fixture")
+    prefetch_bytes = params.get("prefetch_bytes", DEFAULT_PREFETCH_BYTES)
+    return asyncio.run(
+        run(config, n_requests, timeout, scheduler_config, fixture, prefetch_bytes)
+    )
 
 
 if __name__ == "__main__":
-    main(HttpClientConfig(), 1000, None, {})
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
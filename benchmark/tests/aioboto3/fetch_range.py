@@ -3,49 +3,73 @@ import functools
 
 from botocore import UNSIGNED
 
-from benchmark import scheduling
-from benchmark.synchronization import semaphore
+from benchmark import buffers, payload, scheduling
+from benchmark.buffers import BodyMode, BufferPool
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
 from benchmark.clients import HttpClientConfig, create_aioboto3_s3_client
 
 bucket_name = "sentinel-cogs"
 key = "sentinel-s2-l2a-cogs/50/C/MA/2021/1/S2A_50CMA_20210121_0_L2A/B08.tif"
 
 
-@semaphore(500)
-async def fut(s3_client, request_size: int):
-    """Request the first 16KB of a file, simulating COG header request.
+@concurrency_limit(500)
+async def fut(s3_client, request_size: int, pool: BufferPool | None):
+    """Request the first 16KB of a file, simulating COG header request.  Reads the
+    body into a buffer from `pool` when given.
 
-    Semaphore allows this function to be called 500 times concurrently
+    Concurrency limit allows this function to be called 500 times concurrently
     """
     resp = await s3_client.get_object(
         Bucket=bucket_name, Key=key, Range=f"bytes=0-{request_size}"
     )
-    return await resp["Body"].read()
+    if pool is None:
+        return payload.received(buffers.new_body(await resp["Body"].read()))
+    with pool.buffer() as buffer:
+        payload.received(
+            await buffers.read_chunks(
+                resp["Body"].iter_chunks(buffers.CHUNK_SIZE), buffer
+            )
+        )
 
 
 async def run(
-    config: HttpClientConfig, n_requests: int, request_size: int, timeout: int | None
+    config: HttpClientConfig,
+    n_requests: int,
+    request_size: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    body_mode: BodyMode = BodyMode.copy,
 ):
     print("test run starting!")
+    # `Range` is inclusive, the body is one byte longer than `request_size`.
+    pool = BufferPool(request_size + 1) if body_mode == BodyMode.reuse else None
     async with create_aioboto3_s3_client(
         config, "us-west-2", signature_version=UNSIGNED
     ) as s3_client:
-        if timeout:
-            print("running test with timeout - ", timeout)
-            results = await scheduling.gather_with_timeout(
-                functools.partial(fut, s3_client, request_size), n_requests, timeout
-            )
-        else:
-            futures = (fut(s3_client, request_size) for _ in range(n_requests))
-            results = await scheduling.gather(futures)
+        results = await scheduling.schedule(
+            functools.partial(fut, s3_client, request_size, pool),
+            n_requests,
+            timeout,
+            scheduler_config,
+        )
     return results
 
 
-def main(config: HttpClientConfig, n_requests: int, timeout: int | None, params: dict):
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
     request_size = params.get("request_size", 16384)
-    return asyncio.run(run(config, n_requests, request_size, timeout))
+    body_mode = BodyMode(params.get("body_mode", BodyMode.copy))
+    return asyncio.run(
+        run(config, n_requests, request_size, timeout, scheduler_config, body_mode)
+    )
 
 
 if __name__ == "__main__":
     print("inside dunder main")
-    main(HttpClientConfig(), 1000, None, {})
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
@@ -0,0 +1,63 @@
+import asyncio
+import functools
+
+from botocore import UNSIGNED
+
+from benchmark import scheduling
+from benchmark.catalog import CATALOG_KEY, KeySampler, parse_catalog
+from benchmark.fixtures import FIXTURES_BUCKET
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_aioboto3_s3_client
+
+
+@concurrency_limit(500)
+async def fut(s3_client, bucket: str, sampler: KeySampler):
+    """Request the metadata of an object chosen by `sampler`, simulating a check of
+    many catalog items.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    return await s3_client.head_object(Bucket=bucket, Key=sampler.next())
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    params: dict,
+):
+    async with create_aioboto3_s3_client(
+        config, "us-west-2", signature_version=UNSIGNED
+    ) as s3_client:
+        resp = await s3_client.get_object(
+            Bucket=FIXTURES_BUCKET, Key=params.get("catalog", CATALOG_KEY)
+        )
+        catalog = parse_catalog(await resp["Body"].read())
+        results = await scheduling.schedule(
+            functools.partial(
+                fut,
+                s3_client,
+                catalog.bucket,
+                KeySampler.from_params(catalog.keys, params),
+            ),
+            n_requests,
+            timeout,
+            scheduler_config,
+        )
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    return asyncio.run(run(config, n_requests, timeout, scheduler_config, params))
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
@@ -0,0 +1,65 @@
+import asyncio
+import functools
+
+from botocore import UNSIGNED
+
+from benchmark import listing, scheduling
+from benchmark.fixtures import FIXTURES_BUCKET
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_aioboto3_s3_client
+
+
+@concurrency_limit(500)
+async def fut(s3_client, prefix: str, max_keys: int):
+    """List every key below a prefix, a page at a time, simulating a scan of a
+    partitioned dataset.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    paginator = s3_client.get_paginator("list_objects_v2")
+    async for page in paginator.paginate(
+        Bucket=FIXTURES_BUCKET,
+        Prefix=prefix,
+        PaginationConfig={"PageSize": max_keys},
+    ):
+        listing.paged()
+        listing.listed(len(page.get("Contents", [])))
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    params: dict,
+):
+    prefix = listing.listing_prefix(
+        params.get("prefix_size", listing.DEFAULT_PREFIX_SIZE)
+    )
+    async with create_aioboto3_s3_client(
+        config, "us-west-2", signature_version=UNSIGNED
+    ) as s3_client:
+        results = await scheduling.schedule(
+            functools.partial(
+                fut, s3_client, prefix, params.get("max_keys", listing.MAX_KEYS)
+            ),
+            n_requests,
+            timeout,
+            scheduler_config,
+        )
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    return asyncio.run(run(config, n_requests, timeout, scheduler_config, params))
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
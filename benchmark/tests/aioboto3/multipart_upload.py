@@ -0,0 +1,103 @@
+import asyncio
+import functools
+
+from botocore import UNSIGNED
+
+from benchmark import buffers, payload, scheduling, uploads
+from benchmark.fixtures import FIXTURES_BUCKET
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_aioboto3_s3_client
+
+bucket_name = FIXTURES_BUCKET
+
+
+async def upload_part(
+    s3_client,
+    key: str,
+    upload_id: str,
+    data: bytes,
+    part_number: int,
+    start: int,
+    end: int,
+) -> dict:
+    with buffers.part_buffer(data, start, end) as body:
+        resp = await s3_client.upload_part(
+            Bucket=bucket_name,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=body,
+        )
+    return {"PartNumber": part_number, "ETag": resp["ETag"]}
+
+
+@concurrency_limit(500)
+async def fut(
+    s3_client, data: bytes, parts: list[tuple[int, int]], part_concurrency: int
+):
+    """Upload an object to a new key as a multipart upload, sending `part_concurrency`
+    parts at a time, simulating a pipeline writing a large output.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    key = uploads.upload_key()
+    mpu = await s3_client.create_multipart_upload(Bucket=bucket_name, Key=key)
+    upload_id = mpu["UploadId"]
+    try:
+        completed = await uploads.upload_parts(
+            functools.partial(upload_part, s3_client, key, upload_id, data),
+            parts,
+            part_concurrency,
+        )
+    except Exception:
+        await s3_client.abort_multipart_upload(
+            Bucket=bucket_name, Key=key, UploadId=upload_id
+        )
+        raise
+    await s3_client.complete_multipart_upload(
+        Bucket=bucket_name,
+        Key=key,
+        UploadId=upload_id,
+        MultipartUpload={"Parts": completed},
+    )
+    payload.sent_bytes(len(data))
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    params: dict,
+):
+    data = uploads.object_data(params.get("object_size", uploads.DEFAULT_OBJECT_SIZE))
+    parts = uploads.part_ranges(
+        len(data), params.get("part_size", uploads.DEFAULT_PART_SIZE)
+    )
+    part_concurrency = params.get("part_concurrency", uploads.DEFAULT_PART_CONCURRENCY)
+    kwargs = {} if params.get("signed", True) else {"signature_version": UNSIGNED}
+    async with create_aioboto3_s3_client(
+        config, uploads.REGION_NAME, **kwargs
+    ) as s3_client:
+        results = await scheduling.schedule(
+            functools.partial(fut, s3_client, data, parts, part_concurrency),
+            n_requests,
+            timeout,
+            scheduler_config,
+        )
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    return asyncio.run(run(config, n_requests, timeout, scheduler_config, params))
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
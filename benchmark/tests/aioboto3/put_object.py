@@ -0,0 +1,58 @@
+import asyncio
+import functools
+
+from botocore import UNSIGNED
+
+from benchmark import payload, scheduling, uploads
+from benchmark.fixtures import FIXTURES_BUCKET
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_aioboto3_s3_client
+
+bucket_name = FIXTURES_BUCKET
+
+
+@concurrency_limit(500)
+async def fut(s3_client, data: bytes):
+    """Upload an object to a new key with a single request, simulating a pipeline
+    writing its output.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    await s3_client.put_object(Bucket=bucket_name, Key=uploads.upload_key(), Body=data)
+    payload.sent_bytes(len(data))
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    params: dict,
+):
+    data = uploads.object_data(params.get("object_size", uploads.DEFAULT_OBJECT_SIZE))
+    kwargs = {} if params.get("signed", True) else {"signature_version": UNSIGNED}
+    async with create_aioboto3_s3_client(
+        config, uploads.REGION_NAME, **kwargs
+    ) as s3_client:
+        results = await scheduling.schedule(
+            functools.partial(fut, s3_client, data),
+            n_requests,
+            timeout,
+            scheduler_config,
+        )
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    return asyncio.run(run(config, n_requests, timeout, scheduler_config, params))
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
@@ -0,0 +1,116 @@
+import asyncio
+import functools
+
+from botocore import UNSIGNED
+
+from benchmark import payload, ranges, scheduling
+from benchmark.fixtures import FIXTURES_BUCKET, MANIFEST_KEY, parse_manifest
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_aioboto3_s3_client
+from benchmark.tiles import (
+    DEFAULT_BATCH_SIZE,
+    AccessPattern,
+    TileSampler,
+    parse_tile_tables,
+    tile_ranges,
+)
+
+bucket_name = "sentinel-cogs"
+key = "sentinel-s2-l2a-cogs/50/C/MA/2021/1/S2A_50CMA_20210121_0_L2A/B08.tif"
+header_size_bytes = 16384
+
+
+async def send_range_aioboto3(s3_client, bucket: str, key: str, start: int, end: int):
+    resp = await s3_client.get_object(
+        Bucket=bucket, Key=key, Range=f"bytes={start}-{end}"
+    )
+    return await resp["Body"].read()
+
+
+@concurrency_limit(500)
+async def fut(
+    s3_client,
+    bucket: str,
+    key: str,
+    sampler: TileSampler,
+    batch_size: int,
+    max_gap_bytes: int,
+):
+    """Request a batch of nearby tiles of a file chosen by `sampler`, merging ranges
+    at most `max_gap_bytes` apart, simulating a tile server rendering a map view.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    tiles = sampler.next_batch(batch_size)
+    for data in await ranges.fetch_ranges(
+        functools.partial(send_range_aioboto3, s3_client),
+        bucket,
+        key,
+        [(tile.offset, tile.end) for tile in tiles],
+        max_gap_bytes,
+    ):
+        payload.received(data)
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    fixture: str | None,
+    batch_size: int,
+    max_gap_bytes: int,
+    params: dict,
+):
+    async with create_aioboto3_s3_client(
+        config, "us-west-2", signature_version=UNSIGNED
+    ) as s3_client:
+        bucket, path, header_size = bucket_name, key, header_size_bytes
+        if fixture:
+            resp = await s3_client.get_object(Bucket=FIXTURES_BUCKET, Key=MANIFEST_KEY)
+            cog = parse_manifest(await resp["Body"].read())[fixture]
+            bucket, path, header_size = FIXTURES_BUCKET, cog.key, cog.header_size_bytes
+        # Parse the tile tables once, up front.
+        header = await send_range_aioboto3(s3_client, bucket, path, 0, header_size - 1)
+        sampler = TileSampler.from_params(
+            tile_ranges(parse_tile_tables(header)),
+            {"pattern": AccessPattern.clustered, **params},
+        )
+        results = await scheduling.schedule(
+            functools.partial(
+                fut, s3_client, bucket, path, sampler, batch_size, max_gap_bytes
+            ),
+            n_requests,
+            timeout,
+            scheduler_config,
+        )
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    fixture = params.get("fixture")
+    batch_size = params.get("batch_size", DEFAULT_BATCH_SIZE)
+    max_gap_bytes = params.get("max_gap_bytes", ranges.DEFAULT_MAX_GAP_BYTES)
+    return asyncio.run(
+        run(
+            config,
+            n_requests,
+            timeout,
+            scheduler_config,
+            fixture,
+            batch_size,
+            max_gap_bytes,
+            params,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
@@ -0,0 +1,81 @@
+import asyncio
+import functools
+
+from botocore import UNSIGNED
+
+from benchmark import payload, scheduling
+from benchmark.fixtures import FIXTURES_BUCKET, MANIFEST_KEY, parse_manifest
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_aioboto3_s3_client
+from benchmark.tiles import TileSampler, parse_tile_tables, tile_ranges
+
+bucket_name = "sentinel-cogs"
+key = "sentinel-s2-l2a-cogs/50/C/MA/2021/1/S2A_50CMA_20210121_0_L2A/B08.tif"
+header_size_bytes = 16384
+
+
+async def send_range_aioboto3(s3_client, bucket: str, key: str, start: int, end: int):
+    resp = await s3_client.get_object(
+        Bucket=bucket, Key=key, Range=f"bytes={start}-{end}"
+    )
+    return await resp["Body"].read()
+
+
+@concurrency_limit(500)
+async def fut(s3_client, bucket: str, key: str, sampler: TileSampler):
+    """Request a tile of a file chosen by `sampler`, simulating a tile server.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    tile = sampler.next()
+    return payload.received(
+        await send_range_aioboto3(s3_client, bucket, key, tile.offset, tile.end)
+    )
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    fixture: str | None,
+    params: dict,
+):
+    async with create_aioboto3_s3_client(
+        config, "us-west-2", signature_version=UNSIGNED
+    ) as s3_client:
+        bucket, path, header_size = bucket_name, key, header_size_bytes
+        if fixture:
+            resp = await s3_client.get_object(Bucket=FIXTURES_BUCKET, Key=MANIFEST_KEY)
+            cog = parse_manifest(await resp["Body"].read())[fixture]
+            bucket, path, header_size = FIXTURES_BUCKET, cog.key, cog.header_size_bytes
+        # Parse the tile tables once, up front.
+        header = await send_range_aioboto3(s3_client, bucket, path, 0, header_size - 1)
+        sampler = TileSampler.from_params(
+            tile_ranges(parse_tile_tables(header)), params
+        )
+        results = await scheduling.schedule(
+            functools.partial(fut, s3_client, bucket, path, sampler),
+            n_requests,
+            timeout,
+            scheduler_config,
+        )
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    fixture = params.get("fixture")
+    return asyncio.run(
+        run(config, n_requests, timeout, scheduler_config, fixture, params)
+    )
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
@@ -0,0 +1,71 @@
+import asyncio
+
+import aiohttp
+import functools
+
+from benchmark import payload, scheduling
+from benchmark.catalog import CATALOG_KEY, KeySampler, parse_catalog
+from benchmark.fixtures import FIXTURES_BUCKET
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_aiohttp_client, object_url
+
+
+@concurrency_limit(500)
+async def fut(
+    session: aiohttp.ClientSession, bucket: str, sampler: KeySampler, request_size: int
+):
+    """Request the header of an object chosen by `sampler`, simulating a mosaic
+    reading many catalog items.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    r = await session.get(
+        object_url(bucket, sampler.next()),
+        headers={"Range": f"bytes=0-{request_size - 1}"},
+    )
+    r.raise_for_status()
+    return payload.received(await r.read())
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    params: dict,
+):
+    async with create_aiohttp_client(config) as session:
+        r = await session.get(
+            object_url(FIXTURES_BUCKET, params.get("catalog", CATALOG_KEY))
+        )
+        r.raise_for_status()
+        catalog = parse_catalog(await r.read())
+        results = await scheduling.schedule(
+            functools.partial(
+                fut,
+                session,
+                catalog.bucket,
+                KeySampler.from_params(catalog.keys, params),
+                params.get("request_size", catalog.header_size_bytes),
+            ),
+            n_requests,
+            timeout,
+            scheduler_config,
+        )
+
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    return asyncio.run(run(config, n_requests, timeout, scheduler_config, params))
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
@@ -4,58 +4,100 @@ import typing
 import aiohttp
 import functools
 
-from cog_layers.reader.cog import open_cog
-
-from benchmark import scheduling
-from benchmark.synchronization import semaphore
-from benchmark.clients import HttpClientConfig, create_aiohttp_client
+from benchmark import payload, scheduling
+from benchmark.fixtures import (
+    DEFAULT_PREFETCH_BYTES,
+    FIXTURES_BUCKET,
+    MANIFEST_KEY,
+    open_cog_header,
+    parse_manifest,
+)
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_aiohttp_client, object_url
 
 
 bucket_name = "sentinel-cogs"
 key = "sentinel-s2-l2a-cogs/50/C/MA/2021/1/S2A_50CMA_20210121_0_L2A/B08.tif"
+header_size_bytes = 16384
 
 
-@semaphore(500)
+@concurrency_limit(500)
 async def send_range_aiohttp(
     bucket: str, key: str, start: int, end: int, client: typing.Any | None = None
 ):
     r = await client.get(
-        f"https://{bucket}.s3.amazonaws.com/{key}",
+        object_url(bucket, key),
         headers={"Range": f"bytes={start}-{end}"},
     )
     r.raise_for_status()
-    return await r.read()
+    return payload.received(await r.read())
 
 
-async def fut(session: aiohttp.ClientSession):
-    """Request the first 16KB of a file, simulating COG header request.
+async def fut(
+    session: aiohttp.ClientSession,
+    bucket: str,
+    key: str,
+    header_size: int,
+    prefetch_bytes: int,
+    ifd_ranges: tuple[tuple[int, int], ...],
+):
+    """Request the header of a file, simulating COG header request.
 
-    Semaphore allows this function to be called 500 times concurrently
+    Concurrency limit allows this function to be called 500 times concurrently
     """
-    await open_cog(
+    await open_cog_header(
         functools.partial(send_range_aiohttp, client=session),
-        bucket=bucket_name,
-        key=key,
-        header_size_bytes=16384,
+        bucket,
+        key,
+        header_size,
+        prefetch_bytes,
+        ifd_ranges,
     )
 
 
-async def run(config: HttpClientConfig, n_requests: int, timeout: int | None):
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    fixture: str | None,
+    prefetch_bytes: int,
+):
     async with create_aiohttp_client(config) as session:
-        if timeout:
-            results = await scheduling.gather_with_timeout(
-                functools.partial(fut, session), n_requests, timeout
-            )
-        else:
-            futures = (fut(session) for _ in range(n_requests))
-            results = await scheduling.gather(futures)
+        bucket, path, header_size = bucket_name, key, header_size_bytes
+        ifd_ranges = ()
+        if fixture:
+            r = await session.get(object_url(FIXTURES_BUCKET, MANIFEST_KEY))
+            r.raise_for_status()
+            cog = parse_manifest(await r.read())[fixture]
+            bucket, path, header_size = FIXTURES_BUCKET, cog.key, cog.header_size_bytes
+            ifd_ranges = cog.ifd_ranges
+        results = await scheduling.schedule(
+            functools.partial(
+                fut, session, bucket, path, header_size, prefetch_bytes, ifd_ranges
+            ),
+            n_requests,
+            timeout,
+            scheduler_config,
+        )
 
     return results
 
 
-def main(config: HttpClientConfig, n_requests: int, timeout: int | None, params: dict):
-    return asyncio.run(run(config, n_requests, timeout))
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    fixture = params.get("fixture")
+    prefetch_bytes = params.get("prefetch_bytes", DEFAULT_PREFETCH_BYTES)
+    return asyncio.run(
+        run(config, n_requests, timeout, scheduler_config, fixture, prefetch_bytes)
+    )
 
 
 if __name__ == "__main__":
-    main(HttpClientConfig(), 1000, None, {})
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
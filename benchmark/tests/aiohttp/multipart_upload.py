@@ -0,0 +1,115 @@
+import asyncio
+import functools
+
+import aiohttp
+
+from benchmark import buffers, payload, scheduling, uploads
+from benchmark.fixtures import FIXTURES_BUCKET
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_aiohttp_client, object_url
+
+bucket_name = FIXTURES_BUCKET
+
+
+async def send(
+    session: aiohttp.ClientSession, method: str, url: str, body: bytes, signed: bool
+) -> tuple[dict, bytes]:
+    """Send a signed request, and return the headers and body of the response."""
+    async with session.request(
+        method,
+        url,
+        data=body,
+        headers=uploads.auth_headers(method, url, body, signed),
+    ) as r:
+        r.raise_for_status()
+        return r.headers, await r.read()
+
+
+async def upload_part(
+    session: aiohttp.ClientSession,
+    url: str,
+    upload_id: str,
+    data: bytes,
+    signed: bool,
+    part_number: int,
+    start: int,
+    end: int,
+) -> str:
+    part_url = f"{url}?partNumber={part_number}&uploadId={upload_id}"
+    with buffers.part_buffer(data, start, end) as body:
+        headers, _ = await send(session, "PUT", part_url, body, signed)
+    return headers["ETag"]
+
+
+@concurrency_limit(500)
+async def fut(
+    session: aiohttp.ClientSession,
+    data: bytes,
+    parts: list[tuple[int, int]],
+    part_concurrency: int,
+    signed: bool,
+):
+    """Upload an object to a new key as a multipart upload, sending `part_concurrency`
+    parts at a time, simulating a pipeline writing a large output.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    url = object_url(bucket_name, uploads.upload_key())
+    _, body = await send(session, "POST", f"{url}?uploads", b"", signed)
+    upload_id = uploads.upload_id(body)
+    try:
+        etags = await uploads.upload_parts(
+            functools.partial(upload_part, session, url, upload_id, data, signed),
+            parts,
+            part_concurrency,
+        )
+    except Exception:
+        await send(session, "DELETE", f"{url}?uploadId={upload_id}", b"", signed)
+        raise
+    await send(
+        session,
+        "POST",
+        f"{url}?uploadId={upload_id}",
+        uploads.complete_multipart_body(etags),
+        signed,
+    )
+    payload.sent_bytes(len(data))
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    params: dict,
+):
+    data = uploads.object_data(params.get("object_size", uploads.DEFAULT_OBJECT_SIZE))
+    parts = uploads.part_ranges(
+        len(data), params.get("part_size", uploads.DEFAULT_PART_SIZE)
+    )
+    part_concurrency = params.get("part_concurrency", uploads.DEFAULT_PART_CONCURRENCY)
+    async with create_aiohttp_client(config) as session:
+        results = await scheduling.schedule(
+            functools.partial(
+                fut, session, data, parts, part_concurrency, params.get("signed", True)
+            ),
+            n_requests,
+            timeout,
+            scheduler_config,
+        )
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    return asyncio.run(run(config, n_requests, timeout, scheduler_config, params))
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
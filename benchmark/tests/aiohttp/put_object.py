@@ -0,0 +1,59 @@
+import asyncio
+import functools
+
+import aiohttp
+
+from benchmark import payload, scheduling, uploads
+from benchmark.fixtures import FIXTURES_BUCKET
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_aiohttp_client, object_url
+
+bucket_name = FIXTURES_BUCKET
+
+
+@concurrency_limit(500)
+async def fut(session: aiohttp.ClientSession, data: bytes, signed: bool):
+    """Upload an object to a new key with a single request, simulating a pipeline
+    writing its output.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    url = object_url(bucket_name, uploads.upload_key())
+    async with session.put(
+        url, data=data, headers=uploads.auth_headers("PUT", url, data, signed)
+    ) as r:
+        r.raise_for_status()
+    payload.sent_bytes(len(data))
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    params: dict,
+):
+    data = uploads.object_data(params.get("object_size", uploads.DEFAULT_OBJECT_SIZE))
+    async with create_aiohttp_client(config) as session:
+        results = await scheduling.schedule(
+            functools.partial(fut, session, data, params.get("signed", True)),
+            n_requests,
+            timeout,
+            scheduler_config,
+        )
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    return asyncio.run(run(config, n_requests, timeout, scheduler_config, params))
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
@@ -0,0 +1,78 @@
+import asyncio
+
+import aiohttp
+import functools
+
+from benchmark import buffers, payload, scheduling, splits, tracing
+from benchmark.buffers import BufferPool
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_aiohttp_client, object_url
+
+
+bucket_name = "sentinel-cogs"
+key = "sentinel-s2-l2a-cogs/50/C/MA/2021/1/S2A_50CMA_20210121_0_L2A/B08.tif"
+
+
+async def read_part(
+    session: aiohttp.ClientSession, start: int, end: int, view: memoryview
+) -> int:
+    r = await session.get(
+        object_url(bucket_name, key),
+        headers={"Range": f"bytes={start}-{end - 1}"},
+    )
+    r.raise_for_status()
+    return await buffers.read_into(tracing.aiohttp_chunks(r), view)
+
+
+@concurrency_limit(500)
+async def fut(
+    session: aiohttp.ClientSession, parts: list[tuple[int, int]], pool: BufferPool
+):
+    """Read the start of a file as concurrent part requests, simulating a download of a
+    large range.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    with pool.buffer() as buffer:
+        payload.received(
+            await splits.fetch_split(
+                functools.partial(read_part, session), parts, buffer
+            )
+        )
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    params: dict,
+):
+    request_size = params.get("request_size", splits.DEFAULT_REQUEST_SIZES[0])
+    parts = splits.split_range(
+        request_size, params.get("n_parts"), params.get("part_size")
+    )
+    async with create_aiohttp_client(config) as session:
+        results = await scheduling.schedule(
+            functools.partial(fut, session, parts, BufferPool(request_size)),
+            n_requests,
+            timeout,
+            scheduler_config,
+        )
+
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    return asyncio.run(run(config, n_requests, timeout, scheduler_config, params))
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
@@ -0,0 +1,65 @@
+import asyncio
+import functools
+
+from async_tiff import TIFF
+import async_tiff.store
+
+from benchmark import payload, scheduling, tracing
+from benchmark.catalog import CATALOG_KEY, KeySampler, fetch_catalog
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_async_tiff_s3_store
+
+
+@concurrency_limit(500)
+@tracing.timed(tracing.Phase.request)
+async def fut(
+    store: async_tiff.store.S3Store, sampler: KeySampler, prefetch_bytes: int
+):
+    """Open an object chosen by `sampler`, simulating a mosaic reading many catalog
+    items.  async-tiff reads the rest of the header itself when it is larger than
+    `prefetch_bytes`.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    await TIFF.open(sampler.next(), store=store, prefetch=prefetch_bytes)
+    # The prefetched header isn't exposed, count the prefetch.
+    payload.received_bytes(prefetch_bytes)
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    params: dict,
+):
+    # async-tiff only reads TIFFs, the catalog is read with urllib.
+    catalog = fetch_catalog(params.get("catalog", CATALOG_KEY))
+    store = create_async_tiff_s3_store(config, catalog.bucket, region_name="us-west-2")
+    results = await scheduling.schedule(
+        functools.partial(
+            fut,
+            store,
+            KeySampler.from_params(catalog.keys, params),
+            params.get("request_size", catalog.header_size_bytes),
+        ),
+        n_requests,
+        timeout,
+        scheduler_config,
+    )
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    return asyncio.run(run(config, n_requests, timeout, scheduler_config, params))
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
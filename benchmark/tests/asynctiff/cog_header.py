@@ -4,39 +4,64 @@ import functools
 from async_tiff import TIFF
 import async_tiff.store
 
-from benchmark import scheduling
-from benchmark.synchronization import semaphore
+from benchmark import payload, scheduling, tracing
+from benchmark.fixtures import DEFAULT_PREFETCH_BYTES, FIXTURES_BUCKET, fixture_key
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
 from benchmark.clients import HttpClientConfig, create_async_tiff_s3_store
 
 
+bucket_name = "sentinel-cogs"
 key = "sentinel-s2-l2a-cogs/50/C/MA/2021/1/S2A_50CMA_20210121_0_L2A/B08.tif"
 
 
-@semaphore(500)
-async def fut(store: async_tiff.store.S3Store):
-    """Request the first 16KB of a file, simulating COG header request.
+@concurrency_limit(500)
+@tracing.timed(tracing.Phase.request)
+async def fut(store: async_tiff.store.S3Store, key: str, prefetch_bytes: int):
+    """Request the header of a file, simulating COG header request.  async-tiff reads
+    the rest of the header itself when it is larger than `prefetch_bytes`.
 
-    Semaphore allows this function to be called 500 times concurrently
+    Concurrency limit allows this function to be called 500 times concurrently
     """
-    await TIFF.open(key, store=store, prefetch=16384)
-
-
-async def run(config: HttpClientConfig, n_requests: int, timeout: int | None):
-    n_requests = n_requests * 3
-    store = create_async_tiff_s3_store(config, "sentinel-cogs", region_name="us-west-2")
-    if timeout:
-        results = await scheduling.gather_with_timeout(
-            functools.partial(fut, store), n_requests, timeout
-        )
-    else:
-        futures = (fut(store) for _ in range(n_requests))
-        results = await scheduling.gather(futures)
+    await TIFF.open(key, store=store, prefetch=prefetch_bytes)
+    # The prefetched header isn't exposed, the file is larger than the prefetch.
+    payload.received_bytes(prefetch_bytes)
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    fixture: str | None,
+    prefetch_bytes: int,
+):
+    bucket, path = (
+        (FIXTURES_BUCKET, fixture_key(fixture)) if fixture else (bucket_name, key)
+    )
+    store = create_async_tiff_s3_store(config, bucket, region_name="us-west-2")
+    results = await scheduling.schedule(
+        functools.partial(fut, store, path, prefetch_bytes),
+        n_requests,
+        timeout,
+        scheduler_config,
+    )
     return results
 
 
-def main(config: HttpClientConfig, n_requests: int, timeout: int | None, params: dict):
-    return asyncio.run(run(config, n_requests, timeout))
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    fixture = params.get("fixture")
+    prefetch_bytes = params.get("prefetch_bytes", DEFAULT_PREFETCH_BYTES)
+    return asyncio.run(
+        run(config, n_requests, timeout, scheduler_config, fixture, prefetch_bytes)
+    )
 
 
 if __name__ == "__main__":
-    main(HttpClientConfig(), 1000, None, None, {})
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
@@ -0,0 +1,74 @@
+import asyncio
+import functools
+
+from async_tiff import TIFF
+
+from benchmark import payload, scheduling, tracing
+from benchmark.fixtures import FIXTURES_BUCKET, fixture_key
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_async_tiff_s3_store
+from benchmark.tiles import TileSampler, TileTable, tile_ranges
+
+
+bucket_name = "sentinel-cogs"
+key = "sentinel-s2-l2a-cogs/50/C/MA/2021/1/S2A_50CMA_20210121_0_L2A/B08.tif"
+
+
+@concurrency_limit(500)
+@tracing.timed(tracing.Phase.request)
+async def fut(tiff: TIFF, sampler: TileSampler):
+    """Request a tile of a file chosen by `sampler`, simulating a tile server.  The
+    tile isn't decoded.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    tile = sampler.next()
+    data = await tiff.fetch_tile(tile.x, tile.y, tile.z)
+    payload.received_bytes(memoryview(data.compressed_bytes).nbytes)
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    fixture: str | None,
+    params: dict,
+):
+    bucket, path = (
+        (FIXTURES_BUCKET, fixture_key(fixture)) if fixture else (bucket_name, key)
+    )
+    store = create_async_tiff_s3_store(config, bucket, region_name="us-west-2")
+    # async-tiff parses the tile tables once, when opening the file.
+    tiff = await TIFF.open(path, store=store)
+    tiles = tile_ranges(
+        TileTable(
+            ifd.image_width, ifd.tile_width, ifd.tile_offsets, ifd.tile_byte_counts
+        )
+        for ifd in tiff.ifds
+    )
+    results = await scheduling.schedule(
+        functools.partial(fut, tiff, TileSampler.from_params(tiles, params)),
+        n_requests,
+        timeout,
+        scheduler_config,
+    )
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    fixture = params.get("fixture")
+    return asyncio.run(
+        run(config, n_requests, timeout, scheduler_config, fixture, params)
+    )
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
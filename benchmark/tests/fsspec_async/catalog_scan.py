@@ -0,0 +1,72 @@
+import asyncio
+import functools
+
+import s3fs
+
+from benchmark import payload, scheduling
+from benchmark.catalog import CATALOG_KEY, KeySampler, parse_catalog
+from benchmark.fixtures import FIXTURES_BUCKET
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_fsspec_s3
+
+
+@concurrency_limit(500)
+async def fut(
+    filesystem: s3fs.S3FileSystem, bucket: str, sampler: KeySampler, request_size: int
+):
+    """Request the header of an object chosen by `sampler`, simulating a mosaic
+    reading many catalog items.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    return payload.received(
+        await filesystem._cat_file(
+            f"{bucket}/{sampler.next()}", start=0, end=request_size
+        )
+    )
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    params: dict,
+):
+    filesystem = create_fsspec_s3(config, "us-west-2")
+    catalog = parse_catalog(
+        await filesystem._cat_file(
+            f"{FIXTURES_BUCKET}/{params.get('catalog', CATALOG_KEY)}"
+        )
+    )
+    results = await scheduling.schedule(
+        functools.partial(
+            fut,
+            filesystem,
+            catalog.bucket,
+            KeySampler.from_params(catalog.keys, params),
+            params.get("request_size", catalog.header_size_bytes),
+        ),
+        n_requests,
+        timeout,
+        scheduler_config,
+    )
+
+    # `set_session` returns the client it already opened.
+    await (await filesystem.set_session()).close()
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    return asyncio.run(run(config, n_requests, timeout, scheduler_config, params))
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
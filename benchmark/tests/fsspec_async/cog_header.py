@@ -2,55 +2,99 @@ import asyncio
 import functools
 import typing
 
-from cog_layers.reader.cog import open_cog
 import s3fs
 
-from benchmark import scheduling
-from benchmark.synchronization import semaphore
+from benchmark import payload, scheduling
+from benchmark.fixtures import (
+    DEFAULT_PREFETCH_BYTES,
+    FIXTURES_BUCKET,
+    MANIFEST_KEY,
+    open_cog_header,
+    parse_manifest,
+)
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
 from benchmark.clients import HttpClientConfig, create_fsspec_s3
 
 bucket_name = "sentinel-cogs"
 key = "sentinel-s2-l2a-cogs/50/C/MA/2021/1/S2A_50CMA_20210121_0_L2A/B08.tif"
+header_size_bytes = 16384
 
 
-@semaphore(500)
+@concurrency_limit(500)
 async def send_range_fsspec(
     bucket: str, key: str, start: int, end: int, client: typing.Any | None
 ):
-    b = await client._cat_file(f"{bucket}/{key}", start=start, end=end)
-    return b
+    # `end` is exclusive for fsspec.
+    b = await client._cat_file(f"{bucket}/{key}", start=start, end=end + 1)
+    return payload.received(b)
 
 
-async def fut(filesystem: s3fs.S3FileSystem):
-    """Request the first 16KB of a file, simulating COG header request.
+async def fut(
+    filesystem: s3fs.S3FileSystem,
+    bucket: str,
+    key: str,
+    header_size: int,
+    prefetch_bytes: int,
+    ifd_ranges: tuple[tuple[int, int], ...],
+):
+    """Request the header of a file, simulating COG header request.
 
-    Semaphore allows this function to be called 500 times concurrently
+    Concurrency limit allows this function to be called 500 times concurrently
     """
-    await open_cog(
+    await open_cog_header(
         functools.partial(send_range_fsspec, client=filesystem),
-        bucket=bucket_name,
-        key=key,
-        header_size_bytes=16384,
+        bucket,
+        key,
+        header_size,
+        prefetch_bytes,
+        ifd_ranges,
     )
 
 
-async def run(config: HttpClientConfig, n_requests: int, timeout: int | None):
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    fixture: str | None,
+    prefetch_bytes: int,
+):
     filesystem = create_fsspec_s3(config, "us-west-2")
-    if timeout:
-        results = await scheduling.gather_with_timeout(
-            functools.partial(fut, filesystem), n_requests, timeout
-        )
-    else:
-        futures = (fut(filesystem) for _ in range(n_requests))
-        results = await scheduling.gather(futures)
-
-    filesystem.close_session()
+    bucket, path, header_size = bucket_name, key, header_size_bytes
+    ifd_ranges = ()
+    if fixture:
+        manifest = await filesystem._cat_file(f"{FIXTURES_BUCKET}/{MANIFEST_KEY}")
+        cog = parse_manifest(manifest)[fixture]
+        bucket, path, header_size = FIXTURES_BUCKET, cog.key, cog.header_size_bytes
+        ifd_ranges = cog.ifd_ranges
+    results = await scheduling.schedule(
+        functools.partial(
+            fut, filesystem, bucket, path, header_size, prefetch_bytes, ifd_ranges
+        ),
+        n_requests,
+        timeout,
+        scheduler_config,
+    )
+
+    # `set_session` returns the client it already opened.
+    await (await filesystem.set_session()).close()
     return results
 
 
-def main(config: HttpClientConfig, n_requests: int, timeout: int | None, params: dict):
-    return asyncio.run(run(config, n_requests, timeout))
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    fixture = params.get("fixture")
+    prefetch_bytes = params.get("prefetch_bytes", DEFAULT_PREFETCH_BYTES)
+    return asyncio.run(
+        run(config, n_requests, timeout, scheduler_config, fixture, prefetch_bytes)
+    )
 
 
 if __name__ == "__main__":
-    main(HttpClientConfig(), 1000, None, {})
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
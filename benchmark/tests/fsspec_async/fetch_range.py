@@ -3,42 +3,80 @@ import functools
 
 import s3fs
 
-from benchmark import scheduling
-from benchmark.synchronization import semaphore
+from benchmark import buffers, payload, scheduling
+from benchmark.buffers import BodyMode, BufferPool
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
 from benchmark.clients import HttpClientConfig, create_fsspec_s3
 
 bucket_name = "sentinel-cogs"
 key = "sentinel-s2-l2a-cogs/50/C/MA/2021/1/S2A_50CMA_20210121_0_L2A/B08.tif"
 
 
-@semaphore(500)
-async def fut(filesystem: s3fs.S3FileSystem, request_size: int):
-    """Request the first 16KB of a file, simulating COG header request.
+@concurrency_limit(500)
+async def fut(
+    filesystem: s3fs.S3FileSystem, request_size: int, pool: BufferPool | None
+):
+    """Request the first 16KB of a file, simulating COG header request.  Reads the
+    body into a buffer from `pool` when given.
 
-    Semaphore allows this function to be called 500 times concurrently
+    Concurrency limit allows this function to be called 500 times concurrently
     """
-    return await filesystem._cat_file(f"{bucket_name}/{key}", start=0, end=request_size)
+    if pool is None:
+        return payload.received(
+            buffers.new_body(
+                await filesystem._cat_file(
+                    f"{bucket_name}/{key}", start=0, end=request_size
+                )
+            )
+        )
+    # s3fs only returns whole bodies, stream this one through its S3 client.
+    resp = await filesystem._call_s3(
+        "get_object", Bucket=bucket_name, Key=key, Range=f"bytes=0-{request_size - 1}"
+    )
+    with pool.buffer() as buffer:
+        payload.received(
+            await buffers.read_chunks(
+                resp["Body"].iter_chunks(buffers.CHUNK_SIZE), buffer
+            )
+        )
 
 
 async def run(
-    config: HttpClientConfig, n_requests: int, request_size: int, timeout: int | None
+    config: HttpClientConfig,
+    n_requests: int,
+    request_size: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    body_mode: BodyMode = BodyMode.copy,
 ):
     filesystem = create_fsspec_s3(config, "us-west-2")
-    if timeout:
-        results = await scheduling.gather_with_timeout(
-            functools.partial(fut, filesystem, request_size), n_requests, timeout
-        )
-    else:
-        futures = (fut(filesystem, request_size) for _ in range(n_requests))
-        results = await scheduling.gather(futures)
+    pool = BufferPool(request_size) if body_mode == BodyMode.reuse else None
+    results = await scheduling.schedule(
+        functools.partial(fut, filesystem, request_size, pool),
+        n_requests,
+        timeout,
+        scheduler_config,
+    )
 
+    # `set_session` returns the client it already opened.
+    await (await filesystem.set_session()).close()
     return results
 
 
-def main(config: HttpClientConfig, n_requests: int, timeout: int | None, params: dict):
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
     request_size = params.get("request_size", 16384)
-    return asyncio.run(run(config, n_requests, request_size, timeout))
+    body_mode = BodyMode(params.get("body_mode", BodyMode.copy))
+    return asyncio.run(
+        run(config, n_requests, request_size, timeout, scheduler_config, body_mode)
+    )
 
 
 if __name__ == "__main__":
-    main(HttpClientConfig(), 1000, None, {})
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
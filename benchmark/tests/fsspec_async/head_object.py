@@ -0,0 +1,66 @@
+import asyncio
+import functools
+
+import s3fs
+
+from benchmark import scheduling
+from benchmark.catalog import CATALOG_KEY, KeySampler, parse_catalog
+from benchmark.fixtures import FIXTURES_BUCKET
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_fsspec_s3
+
+
+@concurrency_limit(500)
+async def fut(filesystem: s3fs.S3FileSystem, bucket: str, sampler: KeySampler):
+    """Request the metadata of an object chosen by `sampler`, simulating a check of
+    many catalog items.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    # Bypass the listings cache, which would answer from an earlier listing.
+    return await filesystem._info(f"{bucket}/{sampler.next()}", refresh=True)
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    params: dict,
+):
+    filesystem = create_fsspec_s3(config, "us-west-2")
+    catalog = parse_catalog(
+        await filesystem._cat_file(
+            f"{FIXTURES_BUCKET}/{params.get('catalog', CATALOG_KEY)}"
+        )
+    )
+    results = await scheduling.schedule(
+        functools.partial(
+            fut,
+            filesystem,
+            catalog.bucket,
+            KeySampler.from_params(catalog.keys, params),
+        ),
+        n_requests,
+        timeout,
+        scheduler_config,
+    )
+
+    # `set_session` returns the client it already opened.
+    await (await filesystem.set_session()).close()
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    return asyncio.run(run(config, n_requests, timeout, scheduler_config, params))
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
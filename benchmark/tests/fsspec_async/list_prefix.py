@@ -0,0 +1,60 @@
+import asyncio
+import functools
+
+import s3fs
+
+from benchmark import listing, scheduling
+from benchmark.fixtures import FIXTURES_BUCKET
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_fsspec_s3
+
+
+@concurrency_limit(500)
+async def fut(filesystem: s3fs.S3FileSystem, prefix: str):
+    """List every key below a prefix, simulating a scan of a partitioned dataset.
+
+    s3fs reads every page before returning the listing, so the pages are inferred.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    paths = await filesystem._find(f"{FIXTURES_BUCKET}/{prefix}")
+    listing.paged(listing.pages_for(len(paths)))
+    listing.listed(len(paths))
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    params: dict,
+):
+    prefix = listing.listing_prefix(
+        params.get("prefix_size", listing.DEFAULT_PREFIX_SIZE)
+    )
+    filesystem = create_fsspec_s3(config, "us-west-2")
+    results = await scheduling.schedule(
+        functools.partial(fut, filesystem, prefix),
+        n_requests,
+        timeout,
+        scheduler_config,
+    )
+
+    # `set_session` returns the client it already opened.
+    await (await filesystem.set_session()).close()
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    return asyncio.run(run(config, n_requests, timeout, scheduler_config, params))
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
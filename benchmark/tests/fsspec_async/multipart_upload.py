@@ -0,0 +1,71 @@
+import asyncio
+import functools
+
+import s3fs
+from botocore import UNSIGNED
+
+from benchmark import payload, scheduling, uploads
+from benchmark.fixtures import FIXTURES_BUCKET
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_fsspec_s3
+
+bucket_name = FIXTURES_BUCKET
+
+
+@concurrency_limit(500)
+async def fut(
+    filesystem: s3fs.S3FileSystem, data: bytes, part_size: int, part_concurrency: int
+):
+    """Upload an object to a new key as a multipart upload, sending `part_concurrency`
+    parts at a time, simulating a pipeline writing a large output.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    # s3fs slices the parts itself, uploading them in batches of `max_concurrency`.
+    # Objects smaller than two parts are uploaded with a single request.
+    await filesystem._pipe_file(
+        f"{bucket_name}/{uploads.upload_key()}",
+        data,
+        chunksize=part_size,
+        max_concurrency=part_concurrency,
+    )
+    payload.sent_bytes(len(data))
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    params: dict,
+):
+    data = uploads.object_data(params.get("object_size", uploads.DEFAULT_OBJECT_SIZE))
+    part_size = params.get("part_size", uploads.DEFAULT_PART_SIZE)
+    part_concurrency = params.get("part_concurrency", uploads.DEFAULT_PART_CONCURRENCY)
+    kwargs = {} if params.get("signed", True) else {"signature_version": UNSIGNED}
+    filesystem = create_fsspec_s3(config, uploads.REGION_NAME, **kwargs)
+    results = await scheduling.schedule(
+        functools.partial(fut, filesystem, data, part_size, part_concurrency),
+        n_requests,
+        timeout,
+        scheduler_config,
+    )
+
+    # `set_session` returns the client it already opened.
+    await (await filesystem.set_session()).close()
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    return asyncio.run(run(config, n_requests, timeout, scheduler_config, params))
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
@@ -0,0 +1,63 @@
+import asyncio
+import functools
+
+import s3fs
+from botocore import UNSIGNED
+
+from benchmark import payload, scheduling, uploads
+from benchmark.fixtures import FIXTURES_BUCKET
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_fsspec_s3
+
+bucket_name = FIXTURES_BUCKET
+
+
+@concurrency_limit(500)
+async def fut(filesystem: s3fs.S3FileSystem, data: bytes):
+    """Upload an object to a new key with a single request, simulating a pipeline
+    writing its output.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    # s3fs only switches to a multipart upload for objects of at least two chunks.
+    await filesystem._pipe_file(
+        f"{bucket_name}/{uploads.upload_key()}", data, chunksize=len(data)
+    )
+    payload.sent_bytes(len(data))
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    params: dict,
+):
+    data = uploads.object_data(params.get("object_size", uploads.DEFAULT_OBJECT_SIZE))
+    kwargs = {} if params.get("signed", True) else {"signature_version": UNSIGNED}
+    filesystem = create_fsspec_s3(config, uploads.REGION_NAME, **kwargs)
+    results = await scheduling.schedule(
+        functools.partial(fut, filesystem, data),
+        n_requests,
+        timeout,
+        scheduler_config,
+    )
+
+    # `set_session` returns the client it already opened.
+    await (await filesystem.set_session()).close()
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    return asyncio.run(run(config, n_requests, timeout, scheduler_config, params))
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
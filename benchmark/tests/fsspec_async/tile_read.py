@@ -0,0 +1,82 @@
+import asyncio
+import functools
+
+import s3fs
+
+from benchmark import payload, scheduling
+from benchmark.fixtures import FIXTURES_BUCKET, MANIFEST_KEY, parse_manifest
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_fsspec_s3
+from benchmark.tiles import TileSampler, parse_tile_tables, tile_ranges
+
+bucket_name = "sentinel-cogs"
+key = "sentinel-s2-l2a-cogs/50/C/MA/2021/1/S2A_50CMA_20210121_0_L2A/B08.tif"
+header_size_bytes = 16384
+
+
+async def send_range_fsspec(
+    filesystem: s3fs.S3FileSystem, bucket: str, key: str, start: int, end: int
+):
+    # `end` is exclusive for fsspec.
+    return await filesystem._cat_file(f"{bucket}/{key}", start=start, end=end + 1)
+
+
+@concurrency_limit(500)
+async def fut(
+    filesystem: s3fs.S3FileSystem, bucket: str, key: str, sampler: TileSampler
+):
+    """Request a tile of a file chosen by `sampler`, simulating a tile server.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    tile = sampler.next()
+    return payload.received(
+        await send_range_fsspec(filesystem, bucket, key, tile.offset, tile.end)
+    )
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    fixture: str | None,
+    params: dict,
+):
+    filesystem = create_fsspec_s3(config, "us-west-2")
+    bucket, path, header_size = bucket_name, key, header_size_bytes
+    if fixture:
+        manifest = await filesystem._cat_file(f"{FIXTURES_BUCKET}/{MANIFEST_KEY}")
+        cog = parse_manifest(manifest)[fixture]
+        bucket, path, header_size = FIXTURES_BUCKET, cog.key, cog.header_size_bytes
+    # Parse the tile tables once, up front.
+    header = await send_range_fsspec(filesystem, bucket, path, 0, header_size - 1)
+    sampler = TileSampler.from_params(tile_ranges(parse_tile_tables(header)), params)
+    results = await scheduling.schedule(
+        functools.partial(fut, filesystem, bucket, path, sampler),
+        n_requests,
+        timeout,
+        scheduler_config,
+    )
+
+    # `set_session` returns the client it already opened.
+    await (await filesystem.set_session()).close()
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    fixture = params.get("fixture")
+    return asyncio.run(
+        run(config, n_requests, timeout, scheduler_config, fixture, params)
+    )
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
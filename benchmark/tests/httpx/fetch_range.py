@@ -3,46 +3,68 @@ import functools
 
 import httpx
 
-from benchmark import scheduling
-from benchmark.synchronization import semaphore
-from benchmark.clients import HttpClientConfig, create_httpx_client
+from benchmark import buffers, payload, scheduling
+from benchmark.buffers import BodyMode, BufferPool
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_httpx_client, object_url
 
 bucket_name = "sentinel-cogs"
 key = "sentinel-s2-l2a-cogs/50/C/MA/2021/1/S2A_50CMA_20210121_0_L2A/B08.tif"
 
 
-@semaphore(500)
-async def fut(client: httpx.AsyncClient, request_size: int):
-    """Request the first 16KB of a file, simulating COG header request.
+@concurrency_limit(500)
+async def fut(client: httpx.AsyncClient, request_size: int, pool: BufferPool | None):
+    """Request the first 16KB of a file, simulating COG header request.  Streams the
+    body into a buffer from `pool` when given.
 
-    Semaphore allows this function to be called 500 times concurrently
+    Concurrency limit allows this function to be called 500 times concurrently
     """
-    r = await client.get(
-        f"https://{bucket_name}.s3.amazonaws.com/{key}",
-        headers={"Range": f"bytes=0-{request_size}"},
-    )
-    r.raise_for_status()
-    return r.read()
+    url = object_url(bucket_name, key)
+    headers = {"Range": f"bytes=0-{request_size}"}
+    if pool is None:
+        r = await client.get(url, headers=headers)
+        r.raise_for_status()
+        return payload.received(buffers.new_body(r.read()))
+    async with client.stream("GET", url, headers=headers) as r:
+        r.raise_for_status()
+        with pool.buffer() as buffer:
+            payload.received(await buffers.read_chunks(r.aiter_bytes(), buffer))
 
 
 async def run(
-    config: HttpClientConfig, n_requests: int, request_size: int, timeout: int | None
+    config: HttpClientConfig,
+    n_requests: int,
+    request_size: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    body_mode: BodyMode = BodyMode.copy,
 ):
+    # `Range` is inclusive, the body is one byte longer than `request_size`.
+    pool = BufferPool(request_size + 1) if body_mode == BodyMode.reuse else None
     async with create_httpx_client(config) as client:
-        if timeout:
-            results = await scheduling.gather_with_timeout(
-                functools.partial(fut, client, request_size), n_requests, timeout
-            )
-        else:
-            futures = (fut(client, request_size) for _ in range(n_requests))
-            results = await scheduling.gather(futures)
+        results = await scheduling.schedule(
+            functools.partial(fut, client, request_size, pool),
+            n_requests,
+            timeout,
+            scheduler_config,
+        )
     return results
 
 
-def main(config: HttpClientConfig, n_requests: int, timeout: int | None, params: dict):
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
     request_size = params.get("request_size", 16384)
-    return asyncio.run(run(config, n_requests, request_size, timeout))
+    body_mode = BodyMode(params.get("body_mode", BodyMode.copy))
+    return asyncio.run(
+        run(config, n_requests, request_size, timeout, scheduler_config, body_mode)
+    )
 
 
 if __name__ == "__main__":
-    main(HttpClientConfig(), 1000, None, {})
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
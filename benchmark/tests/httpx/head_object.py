@@ -0,0 +1,64 @@
+import asyncio
+import functools
+
+import httpx
+
+from benchmark import scheduling
+from benchmark.catalog import CATALOG_KEY, KeySampler, parse_catalog
+from benchmark.fixtures import FIXTURES_BUCKET
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_httpx_client, object_url
+
+
+@concurrency_limit(500)
+async def fut(client: httpx.AsyncClient, bucket: str, sampler: KeySampler):
+    """Request the metadata of an object chosen by `sampler`, simulating a check of
+    many catalog items.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    r = await client.head(object_url(bucket, sampler.next()))
+    r.raise_for_status()
+    return r.headers
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    params: dict,
+):
+    async with create_httpx_client(config) as client:
+        r = await client.get(
+            object_url(FIXTURES_BUCKET, params.get("catalog", CATALOG_KEY))
+        )
+        r.raise_for_status()
+        catalog = parse_catalog(r.read())
+        results = await scheduling.schedule(
+            functools.partial(
+                fut,
+                client,
+                catalog.bucket,
+                KeySampler.from_params(catalog.keys, params),
+            ),
+            n_requests,
+            timeout,
+            scheduler_config,
+        )
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    return asyncio.run(run(config, n_requests, timeout, scheduler_config, params))
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
@@ -0,0 +1,64 @@
+import asyncio
+import functools
+
+import httpx
+
+from benchmark import listing, scheduling
+from benchmark.fixtures import FIXTURES_BUCKET
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_httpx_client
+
+
+@concurrency_limit(500)
+async def fut(client: httpx.AsyncClient, prefix: str, max_keys: int):
+    """List every key below a prefix, a page at a time, simulating a scan of a
+    partitioned dataset.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    token = None
+    while True:
+        r = await client.get(listing.list_url(FIXTURES_BUCKET, prefix, max_keys, token))
+        r.raise_for_status()
+        keys, token = listing.parse_page(r.read())
+        listing.paged()
+        listing.listed(len(keys))
+        if token is None:
+            return
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    params: dict,
+):
+    prefix = listing.listing_prefix(
+        params.get("prefix_size", listing.DEFAULT_PREFIX_SIZE)
+    )
+    async with create_httpx_client(config) as client:
+        results = await scheduling.schedule(
+            functools.partial(
+                fut, client, prefix, params.get("max_keys", listing.MAX_KEYS)
+            ),
+            n_requests,
+            timeout,
+            scheduler_config,
+        )
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    return asyncio.run(run(config, n_requests, timeout, scheduler_config, params))
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
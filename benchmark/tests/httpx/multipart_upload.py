@@ -0,0 +1,114 @@
+import asyncio
+import functools
+
+import httpx
+
+from benchmark import buffers, payload, scheduling, uploads
+from benchmark.fixtures import FIXTURES_BUCKET
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_httpx_client, object_url
+
+bucket_name = FIXTURES_BUCKET
+
+
+async def send(
+    client: httpx.AsyncClient, method: str, url: str, body: bytes, signed: bool
+) -> httpx.Response:
+    r = await client.request(
+        method,
+        url,
+        content=body,
+        headers=uploads.auth_headers(method, url, body, signed),
+    )
+    r.raise_for_status()
+    return r
+
+
+async def upload_part(
+    client: httpx.AsyncClient,
+    url: str,
+    upload_id: str,
+    data: bytes,
+    signed: bool,
+    part_number: int,
+    start: int,
+    end: int,
+) -> str:
+    part_url = f"{url}?partNumber={part_number}&uploadId={upload_id}"
+    with buffers.part_buffer(data, start, end) as body:
+        r = await send(client, "PUT", part_url, body, signed)
+    return r.headers["ETag"]
+
+
+@concurrency_limit(500)
+async def fut(
+    client: httpx.AsyncClient,
+    data: bytes,
+    parts: list[tuple[int, int]],
+    part_concurrency: int,
+    signed: bool,
+):
+    """Upload an object to a new key as a multipart upload, sending `part_concurrency`
+    parts at a time, simulating a pipeline writing a large output.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    url = object_url(bucket_name, uploads.upload_key())
+    r = await send(client, "POST", f"{url}?uploads", b"", signed)
+    upload_id = uploads.upload_id(r.content)
+    try:
+        etags = await uploads.upload_parts(
+            functools.partial(upload_part, client, url, upload_id, data, signed),
+            parts,
+            part_concurrency,
+        )
+    except Exception:
+        await send(client, "DELETE", f"{url}?uploadId={upload_id}", b"", signed)
+        raise
+    await send(
+        client,
+        "POST",
+        f"{url}?uploadId={upload_id}",
+        uploads.complete_multipart_body(etags),
+        signed,
+    )
+    payload.sent_bytes(len(data))
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    params: dict,
+):
+    data = uploads.object_data(params.get("object_size", uploads.DEFAULT_OBJECT_SIZE))
+    parts = uploads.part_ranges(
+        len(data), params.get("part_size", uploads.DEFAULT_PART_SIZE)
+    )
+    part_concurrency = params.get("part_concurrency", uploads.DEFAULT_PART_CONCURRENCY)
+    async with create_httpx_client(config) as client:
+        results = await scheduling.schedule(
+            functools.partial(
+                fut, client, data, parts, part_concurrency, params.get("signed", True)
+            ),
+            n_requests,
+            timeout,
+            scheduler_config,
+        )
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    return asyncio.run(run(config, n_requests, timeout, scheduler_config, params))
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
@@ -0,0 +1,77 @@
+import asyncio
+import functools
+
+import httpx
+
+from benchmark import buffers, payload, scheduling, splits
+from benchmark.buffers import BufferPool
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_httpx_client, object_url
+
+bucket_name = "sentinel-cogs"
+key = "sentinel-s2-l2a-cogs/50/C/MA/2021/1/S2A_50CMA_20210121_0_L2A/B08.tif"
+
+
+async def read_part(
+    client: httpx.AsyncClient, start: int, end: int, view: memoryview
+) -> int:
+    async with client.stream(
+        "GET",
+        object_url(bucket_name, key),
+        headers={"Range": f"bytes={start}-{end - 1}"},
+    ) as r:
+        r.raise_for_status()
+        return await buffers.read_into(r.aiter_bytes(), view)
+
+
+@concurrency_limit(500)
+async def fut(
+    client: httpx.AsyncClient, parts: list[tuple[int, int]], pool: BufferPool
+):
+    """Read the start of a file as concurrent part requests, simulating a download of a
+    large range.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    with pool.buffer() as buffer:
+        payload.received(
+            await splits.fetch_split(
+                functools.partial(read_part, client), parts, buffer
+            )
+        )
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    params: dict,
+):
+    request_size = params.get("request_size", splits.DEFAULT_REQUEST_SIZES[0])
+    parts = splits.split_range(
+        request_size, params.get("n_parts"), params.get("part_size")
+    )
+    async with create_httpx_client(config) as client:
+        results = await scheduling.schedule(
+            functools.partial(fut, client, parts, BufferPool(request_size)),
+            n_requests,
+            timeout,
+            scheduler_config,
+        )
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    return asyncio.run(run(config, n_requests, timeout, scheduler_config, params))
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
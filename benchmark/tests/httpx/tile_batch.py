@@ -0,0 +1,121 @@
+import asyncio
+
+import httpx
+import functools
+
+from benchmark import payload, ranges, scheduling
+from benchmark.fixtures import FIXTURES_BUCKET, MANIFEST_KEY, parse_manifest
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_httpx_client, object_url
+from benchmark.tiles import (
+    DEFAULT_BATCH_SIZE,
+    AccessPattern,
+    TileSampler,
+    parse_tile_tables,
+    tile_ranges,
+)
+
+
+bucket_name = "sentinel-cogs"
+key = "sentinel-s2-l2a-cogs/50/C/MA/2021/1/S2A_50CMA_20210121_0_L2A/B08.tif"
+header_size_bytes = 16384
+
+
+async def send_range_httpx(
+    client: httpx.AsyncClient, bucket: str, key: str, start: int, end: int
+):
+    r = await client.get(
+        object_url(bucket, key),
+        headers={"Range": f"bytes={start}-{end}"},
+    )
+    r.raise_for_status()
+    return r.read()
+
+
+@concurrency_limit(500)
+async def fut(
+    client: httpx.AsyncClient,
+    bucket: str,
+    key: str,
+    sampler: TileSampler,
+    batch_size: int,
+    max_gap_bytes: int,
+):
+    """Request a batch of nearby tiles of a file chosen by `sampler`, merging ranges
+    at most `max_gap_bytes` apart, simulating a tile server rendering a map view.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    tiles = sampler.next_batch(batch_size)
+    for data in await ranges.fetch_ranges(
+        functools.partial(send_range_httpx, client),
+        bucket,
+        key,
+        [(tile.offset, tile.end) for tile in tiles],
+        max_gap_bytes,
+    ):
+        payload.received(data)
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    fixture: str | None,
+    batch_size: int,
+    max_gap_bytes: int,
+    params: dict,
+):
+    async with create_httpx_client(config) as client:
+        bucket, path, header_size = bucket_name, key, header_size_bytes
+        if fixture:
+            r = await client.get(object_url(FIXTURES_BUCKET, MANIFEST_KEY))
+            r.raise_for_status()
+            cog = parse_manifest(r.read())[fixture]
+            bucket, path, header_size = FIXTURES_BUCKET, cog.key, cog.header_size_bytes
+        # Parse the tile tables once, up front.
+        header = await send_range_httpx(client, bucket, path, 0, header_size - 1)
+        sampler = TileSampler.from_params(
+            tile_ranges(parse_tile_tables(header)),
+            {"pattern": AccessPattern.clustered, **params},
+        )
+        results = await scheduling.schedule(
+            functools.partial(
+                fut, client, bucket, path, sampler, batch_size, max_gap_bytes
+            ),
+            n_requests,
+            timeout,
+            scheduler_config,
+        )
+
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    fixture = params.get("fixture")
+    batch_size = params.get("batch_size", DEFAULT_BATCH_SIZE)
+    max_gap_bytes = params.get("max_gap_bytes", ranges.DEFAULT_MAX_GAP_BYTES)
+    return asyncio.run(
+        run(
+            config,
+            n_requests,
+            timeout,
+            scheduler_config,
+            fixture,
+            batch_size,
+            max_gap_bytes,
+            params,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
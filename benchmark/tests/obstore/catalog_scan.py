@@ -0,0 +1,63 @@
+import asyncio
+import functools
+
+import obstore as obs
+
+from benchmark import payload, scheduling, tracing
+from benchmark.catalog import CATALOG_KEY, KeySampler, parse_catalog
+from benchmark.fixtures import FIXTURES_BUCKET
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_obstore_store
+
+
+@concurrency_limit(500)
+@tracing.timed(tracing.Phase.request)
+async def fut(store: obs.store.S3Store, sampler: KeySampler, request_size: int):
+    """Request the header of an object chosen by `sampler`, simulating a mosaic
+    reading many catalog items.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    r = await obs.get_range_async(store, sampler.next(), start=0, end=request_size)
+    payload.received(r.to_bytes())
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    params: dict,
+):
+    store = create_obstore_store(config, FIXTURES_BUCKET, region_name="us-west-2")
+    r = await obs.get_async(store, params.get("catalog", CATALOG_KEY))
+    catalog = parse_catalog((await r.bytes_async()).to_bytes())
+    if catalog.bucket != FIXTURES_BUCKET:
+        store = create_obstore_store(config, catalog.bucket, region_name="us-west-2")
+    results = await scheduling.schedule(
+        functools.partial(
+            fut,
+            store,
+            KeySampler.from_params(catalog.keys, params),
+            params.get("request_size", catalog.header_size_bytes),
+        ),
+        n_requests,
+        timeout,
+        scheduler_config,
+    )
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    return asyncio.run(run(config, n_requests, timeout, scheduler_config, params))
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
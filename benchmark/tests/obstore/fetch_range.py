@@ -3,43 +3,62 @@ import functools
 
 import obstore as obs
 
-from benchmark import scheduling
-from benchmark.synchronization import semaphore
+from benchmark import buffers, payload, scheduling, tracing
+from benchmark.buffers import BodyMode
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
 from benchmark.clients import HttpClientConfig, create_obstore_store
 
 
 key = "sentinel-s2-l2a-cogs/50/C/MA/2021/1/S2A_50CMA_20210121_0_L2A/B08.tif"
 
 
-@semaphore(500)
-async def fut(store: obs.store.S3Store, request_size: int):
+@concurrency_limit(500)
+@tracing.timed(tracing.Phase.request)
+async def fut(store: obs.store.S3Store, request_size: int, body_mode: BodyMode):
     """Request the first 16KB of a file, simulating COG header request.
 
-    Semaphore allows this function to be called 500 times concurrently
+    Concurrency limit allows this function to be called 500 times concurrently
     """
     r = await obs.get_range_async(store, key, start=0, end=request_size)
-    r.to_bytes()
+    if body_mode == BodyMode.copy:
+        payload.received(buffers.new_body(r.to_bytes()))
+    else:
+        # The buffer obstore read the body into, through the buffer protocol.
+        payload.received(buffers.shared_body(memoryview(r)))
 
 
 async def run(
-    config: HttpClientConfig, n_requests: int, request_size: int, timeout: int | None
+    config: HttpClientConfig,
+    n_requests: int,
+    request_size: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    body_mode: BodyMode = BodyMode.copy,
 ):
-    n_requests = n_requests * 3
     store = create_obstore_store(config, "sentinel-cogs", region_name="us-west-2")
-    if timeout:
-        results = await scheduling.gather_with_timeout(
-            functools.partial(fut, store, request_size), n_requests, timeout
-        )
-    else:
-        futures = (fut(store, request_size) for _ in range(n_requests))
-        results = await scheduling.gather(futures)
+    results = await scheduling.schedule(
+        functools.partial(fut, store, request_size, body_mode),
+        n_requests,
+        timeout,
+        scheduler_config,
+    )
     return results
 
 
-def main(config: HttpClientConfig, n_requests: int, timeout: int | None, params: dict):
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
     request_size = params.get("request_size", 16384)
-    return asyncio.run(run(config, n_requests, request_size, timeout))
+    body_mode = BodyMode(params.get("body_mode", BodyMode.copy))
+    return asyncio.run(
+        run(config, n_requests, request_size, timeout, scheduler_config, body_mode)
+    )
 
 
 if __name__ == "__main__":
-    main(HttpClientConfig(), 1000, None, {})
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
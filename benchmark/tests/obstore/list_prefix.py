@@ -0,0 +1,62 @@
+import asyncio
+import functools
+
+import obstore as obs
+
+from benchmark import listing, scheduling, tracing
+from benchmark.fixtures import FIXTURES_BUCKET
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_obstore_store
+
+
+@concurrency_limit(500)
+@tracing.timed(tracing.Phase.request)
+async def fut(store: obs.store.S3Store, prefix: str, max_keys: int):
+    """List every key below a prefix, a batch at a time, simulating a scan of a
+    partitioned dataset.
+
+    obstore re-chunks the pages it reads into batches of `max_keys`, so the pages are
+    inferred.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    n_objects = 0
+    async for batch in obs.list(store, prefix, chunk_size=max_keys):
+        listing.listed(len(batch))
+        n_objects += len(batch)
+    listing.paged(listing.pages_for(n_objects))
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    params: dict,
+):
+    prefix = listing.listing_prefix(
+        params.get("prefix_size", listing.DEFAULT_PREFIX_SIZE)
+    )
+    store = create_obstore_store(config, FIXTURES_BUCKET, region_name="us-west-2")
+    results = await scheduling.schedule(
+        functools.partial(fut, store, prefix, params.get("max_keys", listing.MAX_KEYS)),
+        n_requests,
+        timeout,
+        scheduler_config,
+    )
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    return asyncio.run(run(config, n_requests, timeout, scheduler_config, params))
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
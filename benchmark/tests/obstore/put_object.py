@@ -0,0 +1,59 @@
+import asyncio
+import functools
+
+import obstore as obs
+
+from benchmark import payload, scheduling, tracing, uploads
+from benchmark.fixtures import FIXTURES_BUCKET
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_obstore_store
+
+
+@concurrency_limit(500)
+@tracing.timed(tracing.Phase.request)
+async def fut(store: obs.store.S3Store, data: bytes):
+    """Upload an object to a new key with a single request, simulating a pipeline
+    writing its output.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    await obs.put_async(store, uploads.upload_key(), data, use_multipart=False)
+    payload.sent_bytes(len(data))
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    params: dict,
+):
+    data = uploads.object_data(params.get("object_size", uploads.DEFAULT_OBJECT_SIZE))
+    store = create_obstore_store(
+        config,
+        FIXTURES_BUCKET,
+        region_name=uploads.REGION_NAME,
+        skip_signature=not params.get("signed", True),
+    )
+    results = await scheduling.schedule(
+        functools.partial(fut, store, data),
+        n_requests,
+        timeout,
+        scheduler_config,
+    )
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    return asyncio.run(run(config, n_requests, timeout, scheduler_config, params))
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
@@ -0,0 +1,71 @@
+import asyncio
+import functools
+
+import obstore as obs
+
+from benchmark import buffers, payload, scheduling, splits, tracing
+from benchmark.buffers import BufferPool
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_obstore_store
+
+
+key = "sentinel-s2-l2a-cogs/50/C/MA/2021/1/S2A_50CMA_20210121_0_L2A/B08.tif"
+
+
+async def read_part(
+    store: obs.store.S3Store, start: int, end: int, view: memoryview
+) -> int:
+    # obstore reads the part into its own buffer, which is copied into the slice.
+    # `get_ranges_async` would coalesce the parts back into one request.
+    r = await obs.get_range_async(store, key, start=start, end=end)
+    return buffers.copy_into([memoryview(r)], view)
+
+
+@concurrency_limit(500)
+@tracing.timed(tracing.Phase.request)
+async def fut(store: obs.store.S3Store, parts: list[tuple[int, int]], pool: BufferPool):
+    """Read the start of a file as concurrent part requests, simulating a download of a
+    large range.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    with pool.buffer() as buffer:
+        payload.received(
+            await splits.fetch_split(functools.partial(read_part, store), parts, buffer)
+        )
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    params: dict,
+):
+    request_size = params.get("request_size", splits.DEFAULT_REQUEST_SIZES[0])
+    parts = splits.split_range(
+        request_size, params.get("n_parts"), params.get("part_size")
+    )
+    store = create_obstore_store(config, "sentinel-cogs", region_name="us-west-2")
+    results = await scheduling.schedule(
+        functools.partial(fut, store, parts, BufferPool(request_size)),
+        n_requests,
+        timeout,
+        scheduler_config,
+    )
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    return asyncio.run(run(config, n_requests, timeout, scheduler_config, params))
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
@@ -0,0 +1,75 @@
+import asyncio
+import functools
+
+import obstore as obs
+
+from benchmark import payload, scheduling, tracing
+from benchmark.fixtures import FIXTURES_BUCKET, MANIFEST_KEY, parse_manifest
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_obstore_store
+from benchmark.tiles import TileSampler, parse_tile_tables, tile_ranges
+
+
+bucket_name = "sentinel-cogs"
+key = "sentinel-s2-l2a-cogs/50/C/MA/2021/1/S2A_50CMA_20210121_0_L2A/B08.tif"
+header_size_bytes = 16384
+
+
+@concurrency_limit(500)
+@tracing.timed(tracing.Phase.request)
+async def fut(store: obs.store.S3Store, key: str, sampler: TileSampler):
+    """Request a tile of a file chosen by `sampler`, simulating a tile server.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    tile = sampler.next()
+    # `end` is exclusive for obstore.
+    r = await obs.get_range_async(store, key, start=tile.offset, end=tile.end + 1)
+    payload.received(r.to_bytes())
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    fixture: str | None,
+    params: dict,
+):
+    bucket = FIXTURES_BUCKET if fixture else bucket_name
+    store = create_obstore_store(config, bucket, region_name="us-west-2")
+    path, header_size = key, header_size_bytes
+    if fixture:
+        manifest = await obs.get_async(store, MANIFEST_KEY)
+        cog = parse_manifest((await manifest.bytes_async()).to_bytes())[fixture]
+        path, header_size = cog.key, cog.header_size_bytes
+    # Parse the tile tables once, up front.
+    header = await obs.get_range_async(store, path, start=0, end=header_size)
+    sampler = TileSampler.from_params(
+        tile_ranges(parse_tile_tables(header.to_bytes())), params
+    )
+    results = await scheduling.schedule(
+        functools.partial(fut, store, path, sampler),
+        n_requests,
+        timeout,
+        scheduler_config,
+    )
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    fixture = params.get("fixture")
+    return asyncio.run(
+        run(config, n_requests, timeout, scheduler_config, fixture, params)
+    )
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
@@ -0,0 +1,79 @@
+import anyio
+import asyncio
+import functools
+
+import rasterio
+
+from benchmark import payload, scheduling
+from benchmark.catalog import CATALOG_KEY, KeySampler, fetch_catalog
+from benchmark.scheduling import SchedulerConfig
+from benchmark.clients import HttpClientConfig, gdal_options
+from benchmark.synchronization import concurrency_limit
+
+
+def task(bucket: str, sampler: KeySampler, prefetch_bytes: int):
+    """Open an object chosen by `sampler`, simulating a mosaic reading many catalog
+    items.  GDAL reads the rest of the header itself when it is larger than
+    `prefetch_bytes`.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    with rasterio.open(f"s3://{bucket}/{sampler.next()}"):
+        # GDAL doesn't expose the bytes it read, count the header it was asked to
+        # ingest.
+        payload.received_bytes(prefetch_bytes)
+
+
+@concurrency_limit(500)
+async def fut(bucket: str, sampler: KeySampler, prefetch_bytes: int):
+    func = functools.partial(task, bucket, sampler, prefetch_bytes)
+    return await anyio.to_thread.run_sync(func)
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    params: dict,
+):
+    # GDAL only reads rasters, the catalog is read with urllib.
+    catalog = fetch_catalog(params.get("catalog", CATALOG_KEY))
+    prefetch_bytes = params.get("request_size", catalog.header_size_bytes)
+    with rasterio.Env(
+        **gdal_options(
+            GDAL_INGESTED_BYTES_AT_OPEN=prefetch_bytes,
+            GDAL_DISABLE_READDIR_ON_OPEN="EMPTY_DIR",
+            AWS_NO_SIGN_REQUEST="YES",
+            AWS_REGION="us-west-2",
+            # Don't let GDAL answer reused keys from its cache of object sizes and
+            # blocks.
+            CPL_VSIL_CURL_NON_CACHED=f"/vsis3/{catalog.bucket}/",
+        )
+    ):
+        results = await scheduling.schedule(
+            functools.partial(
+                fut,
+                catalog.bucket,
+                KeySampler.from_params(catalog.keys, params),
+                prefetch_bytes,
+            ),
+            n_requests,
+            timeout,
+            scheduler_config,
+        )
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    return asyncio.run(run(config, n_requests, timeout, scheduler_config, params))
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 100, None, {}, SchedulerConfig())
@@ -4,48 +4,79 @@ import functools
 
 import rasterio
 
-from benchmark import scheduling
-from benchmark.clients import HttpClientConfig
-from benchmark.synchronization import semaphore
+from benchmark import payload, scheduling
+from benchmark.fixtures import DEFAULT_PREFETCH_BYTES, FIXTURES_BUCKET, fixture_key
+from benchmark.scheduling import SchedulerConfig
+from benchmark.clients import HttpClientConfig, gdal_options
+from benchmark.synchronization import concurrency_limit
 
 
+bucket_name = "sentinel-cogs"
 key = "sentinel-s2-l2a-cogs/50/C/MA/2021/1/S2A_50CMA_20210121_0_L2A/B08.tif"
 
 
-def task():
-    """Request the first 16KB of a file, simulating COG header request.
+def task(path: str, prefetch_bytes: int):
+    """Request the header of a file, simulating COG header request.  GDAL reads the
+    rest of the header itself when it is larger than `prefetch_bytes`.
 
-    Semaphore allows this function to be called 500 times concurrently
+    Concurrency limit allows this function to be called 500 times concurrently
     """
-    with rasterio.open(f"s3://sentinel-cogs/{key}"):
-        pass
+    with rasterio.open(f"s3://{path}"):
+        # GDAL doesn't expose the bytes it read, count the header it was asked to
+        # ingest.  Any further reads show up as wasted transfer.
+        payload.received_bytes(prefetch_bytes)
 
 
-@semaphore(500)
-async def fut():
-    func = functools.partial(task)
+@concurrency_limit(500)
+async def fut(path: str, prefetch_bytes: int):
+    func = functools.partial(task, path, prefetch_bytes)
     return await anyio.to_thread.run_sync(func)
 
 
-async def run(config: HttpClientConfig, n_requests: int, timeout: int | None):
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    fixture: str | None,
+    prefetch_bytes: int,
+):
+    path = (
+        f"{FIXTURES_BUCKET}/{fixture_key(fixture)}"
+        if fixture
+        else f"{bucket_name}/{key}"
+    )
     with rasterio.Env(
-        GDAL_INGESTED_BYTES_AT_OPEN=16384,
-        GDAL_DISABLE_READDIR_ON_OPEN="EMPTY_DIR",
-        AWS_NO_SIGN_REQUEST="YES",
-        AWS_REGION="us-west-2",
-        CPL_VSIL_CURL_NON_CACHED=f"/vsis3/sentinel-cogs/{key}",
+        **gdal_options(
+            GDAL_INGESTED_BYTES_AT_OPEN=prefetch_bytes,
+            GDAL_DISABLE_READDIR_ON_OPEN="EMPTY_DIR",
+            AWS_NO_SIGN_REQUEST="YES",
+            AWS_REGION="us-west-2",
+            CPL_VSIL_CURL_NON_CACHED=f"/vsis3/{path}",
+        )
     ):
-        if timeout:
-            results = await scheduling.gather_with_timeout(fut, n_requests, timeout)
-        else:
-            futures = (fut() for _ in range(n_requests))
-            results = await scheduling.gather(futures)
+        results = await scheduling.schedule(
+            functools.partial(fut, path, prefetch_bytes),
+            n_requests,
+            timeout,
+            scheduler_config,
+        )
     return results
 
 
-def main(config: HttpClientConfig, n_requests: int, timeout: int | None, params: dict):
-    return asyncio.run(run(config, n_requests, timeout))
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    fixture = params.get("fixture")
+    prefetch_bytes = params.get("prefetch_bytes", DEFAULT_PREFETCH_BYTES)
+    return asyncio.run(
+        run(config, n_requests, timeout, scheduler_config, fixture, prefetch_bytes)
+    )
 
 
 if __name__ == "__main__":
-    main(HttpClientConfig(), 100, None, {})
+    main(HttpClientConfig(), 100, None, {}, SchedulerConfig())
@@ -0,0 +1,138 @@
+import anyio
+import asyncio
+import functools
+import math
+import threading
+
+import rasterio
+from rasterio.windows import Window
+
+from benchmark import payload, scheduling
+from benchmark.fixtures import FIXTURES_BUCKET, fixture_key
+from benchmark.scheduling import SchedulerConfig
+from benchmark.clients import HttpClientConfig, gdal_options
+from benchmark.synchronization import concurrency_limit
+from benchmark.tiles import TileRange, TileSampler, TileTable, tile_ranges
+
+
+bucket_name = "sentinel-cogs"
+key = "sentinel-s2-l2a-cogs/50/C/MA/2021/1/S2A_50CMA_20210121_0_L2A/B08.tif"
+
+
+def open_level(path: str, z: int):
+    """Open IFD `z` of a file, the full resolution image or one of its overviews."""
+    options = {"overview_level": z - 1} if z else {}
+    return rasterio.open(f"s3://{path}", **options)
+
+
+def index_tiles(path: str) -> list[TileRange]:
+    """Read the tile tables of every IFD from GDAL's TIFF metadata."""
+    with open_level(path, 0) as src:
+        n_overviews = len(src.overviews(1))
+    tables = []
+    for z in range(n_overviews + 1):
+        with open_level(path, z) as src:
+            tile_height, tile_width = src.block_shapes[0]
+            blocks = [
+                (x, y)
+                for y in range(math.ceil(src.height / tile_height))
+                for x in range(math.ceil(src.width / tile_width))
+            ]
+            offsets, byte_counts = (
+                [
+                    int(src.get_tag_item(f"{item}_{x}_{y}", "TIFF", bidx=1) or 0)
+                    for x, y in blocks
+                ]
+                for item in ("BLOCK_OFFSET", "BLOCK_SIZE")
+            )
+            tables.append(TileTable(src.width, tile_width, offsets, byte_counts))
+    return tile_ranges(tables)
+
+
+class Datasets(threading.local):
+    """Datasets opened by each worker thread, GDAL datasets can't be shared between
+    threads.  Opened once per IFD, so the header is only parsed once per thread."""
+
+    def __init__(self):
+        self.by_level = {}
+
+
+def task(path: str, datasets: Datasets, opened: list, sampler: TileSampler):
+    """Request a tile of a file chosen by `sampler`, simulating a tile server.  GDAL
+    decodes the tile.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    tile = sampler.next()
+    if tile.z not in datasets.by_level:
+        datasets.by_level[tile.z] = open_level(path, tile.z)
+        opened.append(datasets.by_level[tile.z])
+    src = datasets.by_level[tile.z]
+    tile_height, tile_width = src.block_shapes[0]
+    window = Window(
+        tile.x * tile_width, tile.y * tile_height, tile_width, tile_height
+    ).intersection(Window(0, 0, src.width, src.height))
+    src.read(window=window)
+    # GDAL doesn't expose the bytes it read, count the tile it was asked for.
+    payload.received_bytes(tile.byte_count)
+
+
+@concurrency_limit(500)
+async def fut(path: str, datasets: Datasets, opened: list, sampler: TileSampler):
+    func = functools.partial(task, path, datasets, opened, sampler)
+    return await anyio.to_thread.run_sync(func)
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    fixture: str | None,
+    params: dict,
+):
+    path = (
+        f"{FIXTURES_BUCKET}/{fixture_key(fixture)}"
+        if fixture
+        else f"{bucket_name}/{key}"
+    )
+    opened = []
+    with rasterio.Env(
+        **gdal_options(
+            GDAL_DISABLE_READDIR_ON_OPEN="EMPTY_DIR",
+            AWS_NO_SIGN_REQUEST="YES",
+            AWS_REGION="us-west-2",
+            CPL_VSIL_CURL_NON_CACHED=f"/vsis3/{path}",
+            # Read every tile from S3, rather than GDAL's block cache.
+            GDAL_CACHEMAX=0,
+        )
+    ):
+        sampler = TileSampler.from_params(index_tiles(path), params)
+        try:
+            results = await scheduling.schedule(
+                functools.partial(fut, path, Datasets(), opened, sampler),
+                n_requests,
+                timeout,
+                scheduler_config,
+            )
+        finally:
+            for src in opened:
+                src.close()
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    fixture = params.get("fixture")
+    return asyncio.run(
+        run(config, n_requests, timeout, scheduler_config, fixture, params)
+    )
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 100, None, {}, SchedulerConfig())
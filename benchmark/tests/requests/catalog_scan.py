@@ -0,0 +1,83 @@
+import anyio
+import asyncio
+import functools
+
+import requests
+import requests.adapters
+
+from benchmark import payload, scheduling
+from benchmark.catalog import CATALOG_KEY, KeySampler, parse_catalog
+from benchmark.fixtures import FIXTURES_BUCKET
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_requests_session, object_url
+
+
+async def run_in_threadpool(
+    session: requests.Session, bucket: str, sampler: KeySampler, request_size: int
+):
+    func = functools.partial(task, session, bucket, sampler, request_size)
+    return await anyio.to_thread.run_sync(func)
+
+
+def task(
+    session: requests.Session, bucket: str, sampler: KeySampler, request_size: int
+):
+    """Request the header of an object chosen by `sampler`, simulating a mosaic
+    reading many catalog items.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    r = session.get(
+        object_url(bucket, sampler.next()),
+        headers={"Range": f"bytes=0-{request_size - 1}"},
+    )
+    r.raise_for_status()
+    return payload.received(r.content)
+
+
+@concurrency_limit(500)
+async def fut(
+    session: requests.Session, bucket: str, sampler: KeySampler, request_size: int
+):
+    await run_in_threadpool(session, bucket, sampler, request_size)
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    params: dict,
+):
+    session = create_requests_session(config)
+    r = session.get(object_url(FIXTURES_BUCKET, params.get("catalog", CATALOG_KEY)))
+    r.raise_for_status()
+    catalog = parse_catalog(r.content)
+    results = await scheduling.schedule(
+        functools.partial(
+            fut,
+            session,
+            catalog.bucket,
+            KeySampler.from_params(catalog.keys, params),
+            params.get("request_size", catalog.header_size_bytes),
+        ),
+        n_requests,
+        timeout,
+        scheduler_config,
+    )
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    return asyncio.run(run(config, n_requests, timeout, scheduler_config, params))
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
@@ -5,52 +5,116 @@ import functools
 import requests
 import requests.adapters
 
-from benchmark import scheduling
-from benchmark.synchronization import semaphore
-from benchmark.clients import HttpClientConfig, create_requests_session
-
-
+from benchmark import payload, scheduling
+from benchmark.fixtures import (
+    DEFAULT_PREFETCH_BYTES,
+    FIXTURES_BUCKET,
+    MANIFEST_KEY,
+    ifd_reads,
+    parse_manifest,
+)
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_requests_session, object_url
+
+
+bucket_name = "sentinel-cogs"
 key = "sentinel-s2-l2a-cogs/50/C/MA/2021/1/S2A_50CMA_20210121_0_L2A/B08.tif"
-
-
-async def run_in_threadpool(session: requests.Session):
-    func = functools.partial(task, session)
+header_size_bytes = 16384
+
+
+async def run_in_threadpool(
+    session: requests.Session,
+    url: str,
+    header_size: int,
+    prefetch_bytes: int,
+    ifd_ranges: tuple[tuple[int, int], ...],
+):
+    func = functools.partial(
+        task, session, url, header_size, prefetch_bytes, ifd_ranges
+    )
     return await anyio.to_thread.run_sync(func)
 
 
-def task(session: requests.Session):
-    """Request the first 16KB of a file, simulating COG header request.
-
-    Semaphore allows this function to be called 500 times concurrently
-    """
-    r = session.get(
-        f"https://sentinel-cogs.s3.amazonaws.com/{key}",
-        headers={"Range": "bytes=0-16384"},
-    )
+def send_range(session: requests.Session, url: str, start: int, end: int) -> bytes:
+    r = session.get(url, headers={"Range": f"bytes={start}-{end}"})
     r.raise_for_status()
-    r.content
-
+    return payload.received(r.content)
 
-@semaphore(500)
-async def fut(session: requests.Session):
-    await run_in_threadpool(session)
 
+def task(
+    session: requests.Session,
+    url: str,
+    header_size: int,
+    prefetch_bytes: int,
+    ifd_ranges: tuple[tuple[int, int], ...],
+):
+    """Request the header of a file, simulating COG header request.  The first
+    `prefetch_bytes` are read first, then the rest of the header if it is larger, or
+    each IFD after the prefetch if the header is spread across the file.
 
-async def run(config: HttpClientConfig, n_requests: int, timeout: int | None):
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    if ifd_ranges:
+        send_range(session, url, 0, prefetch_bytes - 1)
+        for start, end in ifd_reads(ifd_ranges, prefetch_bytes):
+            send_range(session, url, start, end)
+        return
+    send_range(session, url, 0, min(prefetch_bytes, header_size) - 1)
+    if header_size > prefetch_bytes:
+        send_range(session, url, prefetch_bytes, header_size - 1)
+
+
+@concurrency_limit(500)
+async def fut(
+    session: requests.Session,
+    url: str,
+    header_size: int,
+    prefetch_bytes: int,
+    ifd_ranges: tuple[tuple[int, int], ...],
+):
+    await run_in_threadpool(session, url, header_size, prefetch_bytes, ifd_ranges)
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    fixture: str | None,
+    prefetch_bytes: int,
+):
     session = create_requests_session(config)
-    if timeout:
-        results = await scheduling.gather_with_timeout(
-            functools.partial(fut, session), n_requests, timeout
-        )
-    else:
-        futures = (fut(session) for _ in range(n_requests))
-        results = await scheduling.gather(futures)
+    url, header_size = object_url(bucket_name, key), header_size_bytes
+    ifd_ranges = ()
+    if fixture:
+        r = session.get(object_url(FIXTURES_BUCKET, MANIFEST_KEY))
+        r.raise_for_status()
+        cog = parse_manifest(r.content)[fixture]
+        url, header_size = object_url(FIXTURES_BUCKET, cog.key), cog.header_size_bytes
+        ifd_ranges = cog.ifd_ranges
+    results = await scheduling.schedule(
+        functools.partial(fut, session, url, header_size, prefetch_bytes, ifd_ranges),
+        n_requests,
+        timeout,
+        scheduler_config,
+    )
     return results
 
 
-def main(config: HttpClientConfig, n_requests: int, timeout: int | None, params: dict):
-    return asyncio.run(run(config, n_requests, timeout))
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    fixture = params.get("fixture")
+    prefetch_bytes = params.get("prefetch_bytes", DEFAULT_PREFETCH_BYTES)
+    return asyncio.run(
+        run(config, n_requests, timeout, scheduler_config, fixture, prefetch_bytes)
+    )
 
 
 if __name__ == "__main__":
-    main(HttpClientConfig(), 1000, None, {})
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
@@ -5,9 +5,11 @@ import functools
 import requests
 import requests.adapters
 
-from benchmark import scheduling
-from benchmark.synchronization import semaphore
-from benchmark.clients import HttpClientConfig, create_requests_session
+from benchmark import buffers, payload, scheduling
+from benchmark.buffers import BodyMode, BufferPool
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_requests_session, object_url
 
 
 key = "sentinel-s2-l2a-cogs/50/C/MA/2021/1/S2A_50CMA_20210121_0_L2A/B08.tif"
@@ -18,34 +20,56 @@ async def run_in_threadpool(session: requests.Session):
     return await anyio.to_thread.run_sync(func)
 
 
-@semaphore(500)
-async def fut(session: requests.Session, request_size: int):
+@concurrency_limit(500)
+async def fut(session: requests.Session, request_size: int, pool: BufferPool | None):
     r = session.get(
-        f"https://sentinel-cogs.s3.amazonaws.com/{key}",
+        object_url("sentinel-cogs", key),
         headers={"Range": f"bytes=0-{request_size}"},
+        stream=pool is not None,
     )
     r.raise_for_status()
-    r.content
+    if pool is None:
+        payload.received(buffers.new_body(r.content))
+        return
+    with pool.buffer() as buffer:
+        payload.received(
+            buffers.copy_chunks(r.iter_content(buffers.CHUNK_SIZE), buffer)
+        )
 
 
 async def run(
-    config: HttpClientConfig, n_requests: int, request_size: int, timeout: int | None
+    config: HttpClientConfig,
+    n_requests: int,
+    request_size: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    body_mode: BodyMode = BodyMode.copy,
 ):
     session = create_requests_session(config)
-    if timeout:
-        results = await scheduling.gather_with_timeout(
-            functools.partial(fut, session, request_size), n_requests, timeout
-        )
-    else:
-        futures = (fut(session, request_size) for _ in range(n_requests))
-        results = await scheduling.gather(futures)
+    # `Range` is inclusive, the body is one byte longer than `request_size`.
+    pool = BufferPool(request_size + 1) if body_mode == BodyMode.reuse else None
+    results = await scheduling.schedule(
+        functools.partial(fut, session, request_size, pool),
+        n_requests,
+        timeout,
+        scheduler_config,
+    )
     return results
 
 
-def main(config: HttpClientConfig, n_requests: int, timeout: int | None, params: dict):
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
     request_size = params.get("request_size", 16384)
-    return asyncio.run(run(config, n_requests, request_size, timeout))
+    body_mode = BodyMode(params.get("body_mode", BodyMode.copy))
+    return asyncio.run(
+        run(config, n_requests, request_size, timeout, scheduler_config, body_mode)
+    )
 
 
 if __name__ == "__main__":
-    main(HttpClientConfig(), 1000, None, {})
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
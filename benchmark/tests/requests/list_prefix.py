@@ -0,0 +1,75 @@
+import anyio
+import asyncio
+import functools
+
+import requests
+import requests.adapters
+
+from benchmark import listing, scheduling
+from benchmark.fixtures import FIXTURES_BUCKET
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_requests_session
+
+
+async def run_in_threadpool(session: requests.Session, prefix: str, max_keys: int):
+    func = functools.partial(task, session, prefix, max_keys)
+    return await anyio.to_thread.run_sync(func)
+
+
+def task(session: requests.Session, prefix: str, max_keys: int):
+    """List every key below a prefix, a page at a time, simulating a scan of a
+    partitioned dataset.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    token = None
+    while True:
+        r = session.get(listing.list_url(FIXTURES_BUCKET, prefix, max_keys, token))
+        r.raise_for_status()
+        keys, token = listing.parse_page(r.content)
+        listing.paged()
+        listing.listed(len(keys))
+        if token is None:
+            return
+
+
+@concurrency_limit(500)
+async def fut(session: requests.Session, prefix: str, max_keys: int):
+    await run_in_threadpool(session, prefix, max_keys)
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    params: dict,
+):
+    prefix = listing.listing_prefix(
+        params.get("prefix_size", listing.DEFAULT_PREFIX_SIZE)
+    )
+    session = create_requests_session(config)
+    results = await scheduling.schedule(
+        functools.partial(
+            fut, session, prefix, params.get("max_keys", listing.MAX_KEYS)
+        ),
+        n_requests,
+        timeout,
+        scheduler_config,
+    )
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    return asyncio.run(run(config, n_requests, timeout, scheduler_config, params))
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
@@ -0,0 +1,84 @@
+import anyio
+import asyncio
+import functools
+
+import requests
+import requests.adapters
+
+from benchmark import buffers, payload, scheduling, splits
+from benchmark.buffers import BufferPool
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_requests_session, object_url
+
+
+key = "sentinel-s2-l2a-cogs/50/C/MA/2021/1/S2A_50CMA_20210121_0_L2A/B08.tif"
+
+
+def task(session: requests.Session, start: int, end: int, view: memoryview) -> int:
+    r = session.get(
+        object_url("sentinel-cogs", key),
+        headers={"Range": f"bytes={start}-{end - 1}"},
+        stream=True,
+    )
+    r.raise_for_status()
+    return buffers.copy_into(r.iter_content(buffers.CHUNK_SIZE), view)
+
+
+async def read_part(
+    session: requests.Session, start: int, end: int, view: memoryview
+) -> int:
+    func = functools.partial(task, session, start, end, view)
+    return await anyio.to_thread.run_sync(func)
+
+
+@concurrency_limit(500)
+async def fut(
+    session: requests.Session, parts: list[tuple[int, int]], pool: BufferPool
+):
+    """Read the start of a file as concurrent part requests, each from a worker thread,
+    simulating a download of a large range.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    with pool.buffer() as buffer:
+        payload.received(
+            await splits.fetch_split(
+                functools.partial(read_part, session), parts, buffer
+            )
+        )
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    params: dict,
+):
+    request_size = params.get("request_size", splits.DEFAULT_REQUEST_SIZES[0])
+    parts = splits.split_range(
+        request_size, params.get("n_parts"), params.get("part_size")
+    )
+    session = create_requests_session(config)
+    results = await scheduling.schedule(
+        functools.partial(fut, session, parts, BufferPool(request_size)),
+        n_requests,
+        timeout,
+        scheduler_config,
+    )
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    return asyncio.run(run(config, n_requests, timeout, scheduler_config, params))
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
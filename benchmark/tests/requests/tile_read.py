@@ -0,0 +1,87 @@
+import anyio
+import asyncio
+import functools
+
+import requests
+import requests.adapters
+
+from benchmark import payload, scheduling
+from benchmark.fixtures import FIXTURES_BUCKET, MANIFEST_KEY, parse_manifest
+from benchmark.scheduling import SchedulerConfig
+from benchmark.synchronization import concurrency_limit
+from benchmark.clients import HttpClientConfig, create_requests_session, object_url
+from benchmark.tiles import TileSampler, parse_tile_tables, tile_ranges
+
+
+bucket_name = "sentinel-cogs"
+key = "sentinel-s2-l2a-cogs/50/C/MA/2021/1/S2A_50CMA_20210121_0_L2A/B08.tif"
+header_size_bytes = 16384
+
+
+async def run_in_threadpool(session: requests.Session, url: str, sampler: TileSampler):
+    func = functools.partial(task, session, url, sampler)
+    return await anyio.to_thread.run_sync(func)
+
+
+def send_range(session: requests.Session, url: str, start: int, end: int) -> bytes:
+    r = session.get(url, headers={"Range": f"bytes={start}-{end}"})
+    r.raise_for_status()
+    return r.content
+
+
+def task(session: requests.Session, url: str, sampler: TileSampler):
+    """Request a tile of a file chosen by `sampler`, simulating a tile server.
+
+    Concurrency limit allows this function to be called 500 times concurrently
+    """
+    tile = sampler.next()
+    return payload.received(send_range(session, url, tile.offset, tile.end))
+
+
+@concurrency_limit(500)
+async def fut(session: requests.Session, url: str, sampler: TileSampler):
+    await run_in_threadpool(session, url, sampler)
+
+
+async def run(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    scheduler_config: SchedulerConfig,
+    fixture: str | None,
+    params: dict,
+):
+    session = create_requests_session(config)
+    url, header_size = object_url(bucket_name, key), header_size_bytes
+    if fixture:
+        r = session.get(object_url(FIXTURES_BUCKET, MANIFEST_KEY))
+        r.raise_for_status()
+        cog = parse_manifest(r.content)[fixture]
+        url, header_size = object_url(FIXTURES_BUCKET, cog.key), cog.header_size_bytes
+    # Parse the tile tables once, up front.
+    header = send_range(session, url, 0, header_size - 1)
+    sampler = TileSampler.from_params(tile_ranges(parse_tile_tables(header)), params)
+    results = await scheduling.schedule(
+        functools.partial(fut, session, url, sampler),
+        n_requests,
+        timeout,
+        scheduler_config,
+    )
+    return results
+
+
+def main(
+    config: HttpClientConfig,
+    n_requests: int,
+    timeout: int | None,
+    params: dict,
+    scheduler_config: SchedulerConfig,
+):
+    fixture = params.get("fixture")
+    return asyncio.run(
+        run(config, n_requests, timeout, scheduler_config, fixture, params)
+    )
+
+
+if __name__ == "__main__":
+    main(HttpClientConfig(), 1000, None, {}, SchedulerConfig())
@@ -0,0 +1,220 @@
+"""Choose which tiles of a COG the `tile_read` tests read.
+
+Tile servers read internal tiles at scattered offsets after the header, rather than the
+same range over and over.  Tests parse the tile offsets and byte counts of a file once,
+then read tile-sized ranges chosen by a `TileSampler` following an access pattern:
+
+- `uniform` - every tile is equally likely.
+- `zipf` - a few tiles are read most of the time, like the popular areas of a map.  The
+  popularity rank of each tile is shuffled, so popular tiles are spread over the file.
+- `clustered` - reads come in bursts of `cluster_size` tiles within `cluster_radius`
+  tiles of a random centre, in the same IFD, like a client panning around a map.
+
+Tile tables are parsed by `parse_tile_tables`, rather than `cog_layers`, which doesn't
+read BigTIFFs.  Empty tiles of sparse files have no data to read, and are never chosen.
+"""
+
+import enum
+import itertools
+import math
+import random
+import struct
+import threading
+import typing
+from dataclasses import dataclass
+
+
+class AccessPattern(str, enum.Enum):
+    uniform = "uniform"
+    zipf = "zipf"
+    clustered = "clustered"
+
+
+DEFAULT_ZIPF_EXPONENT: float = 1.1
+DEFAULT_CLUSTER_SIZE: int = 16
+DEFAULT_CLUSTER_RADIUS: int = 2
+# Tiles read together by each request of the `tile_batch` tests.
+DEFAULT_BATCH_SIZE: int = 8
+
+SEED: int = 0
+
+
+@dataclass(frozen=True)
+class TileRange:
+    # Column, row and IFD of the tile.
+    x: int
+    y: int
+    z: int
+    offset: int
+    byte_count: int
+
+    @property
+    def end(self) -> int:
+        """Last byte of the tile, inclusive like HTTP ranges."""
+        return self.offset + self.byte_count - 1
+
+
+class TileTable(typing.NamedTuple):
+    """The tile layout of one IFD."""
+
+    image_width: int
+    tile_width: int
+    offsets: typing.Sequence[int]
+    byte_counts: typing.Sequence[int]
+
+
+def tile_ranges(tables: typing.Iterable[TileTable]) -> list[TileRange]:
+    """Every tile with data in a file, from the tile table of each IFD."""
+    tiles = []
+    for z, table in enumerate(tables):
+        columns = math.ceil(table.image_width / table.tile_width)
+        for idx, (offset, byte_count) in enumerate(
+            zip(table.offsets, table.byte_counts)
+        ):
+            if byte_count:
+                tiles.append(
+                    TileRange(idx % columns, idx // columns, z, offset, byte_count)
+                )
+    return tiles
+
+
+# Tags of the tile layout, and the struct format of the integer field types.
+_IMAGE_WIDTH = 256
+_TILE_WIDTH = 322
+_TILE_OFFSETS = 324
+_TILE_BYTE_COUNTS = 325
+_INT_FORMATS = {3: "H", 4: "I", 16: "Q"}
+
+
+def parse_tile_tables(header: bytes) -> list[TileTable]:
+    """The tile table of each IFD of a (Big)TIFF, from the first bytes of the file.
+    `header` must cover every IFD and the values of their tags."""
+    endian = "<" if header[:2] == b"II" else ">"
+    bigtiff = struct.unpack(f"{endian}H", header[2:4])[0] == 43
+    # Formats of the IFD entry count, an entry and an offset.
+    count_format, entry_format, offset_format = (
+        ("Q", "HHQ8s", "Q") if bigtiff else ("H", "HHI4s", "I")
+    )
+    entry_size = struct.calcsize(f"{endian}{entry_format}")
+
+    tables = []
+    (ifd_offset,) = struct.unpack_from(
+        f"{endian}{offset_format}", header, 8 if bigtiff else 4
+    )
+    while ifd_offset:
+        (n_entries,) = struct.unpack_from(f"{endian}{count_format}", header, ifd_offset)
+        entries = ifd_offset + struct.calcsize(f"{endian}{count_format}")
+        tags = {}
+        for idx in range(n_entries):
+            tag, field_type, count, value = struct.unpack_from(
+                f"{endian}{entry_format}", header, entries + idx * entry_size
+            )
+            if field_type not in _INT_FORMATS or tag not in (
+                _IMAGE_WIDTH,
+                _TILE_WIDTH,
+                _TILE_OFFSETS,
+                _TILE_BYTE_COUNTS,
+            ):
+                continue
+            values_format = f"{endian}{count}{_INT_FORMATS[field_type]}"
+            size = struct.calcsize(values_format)
+            if size > len(value):
+                (value_offset,) = struct.unpack(f"{endian}{offset_format}", value)
+                if value_offset + size > len(header):
+                    raise ValueError("The header doesn't cover the tile tables")
+                value = header[value_offset : value_offset + size]
+            tags[tag] = struct.unpack(values_format, value[:size])
+        if _TILE_OFFSETS in tags:
+            tables.append(
+                TileTable(
+                    tags[_IMAGE_WIDTH][0],
+                    tags[_TILE_WIDTH][0],
+                    tags[_TILE_OFFSETS],
+                    tags[_TILE_BYTE_COUNTS],
+                )
+            )
+        (ifd_offset,) = struct.unpack_from(
+            f"{endian}{offset_format}", header, entries + n_entries * entry_size
+        )
+    return tables
+
+
+class TileSampler:
+    """Chooses the next tile to read.  Shared by every request of a test, so clustered
+    reads are spread over concurrent requests like the tiles of a map view.
+    Synchronous clients call `next` from worker threads."""
+
+    def __init__(
+        self,
+        tiles: list[TileRange],
+        pattern: AccessPattern = AccessPattern.uniform,
+        zipf_exponent: float = DEFAULT_ZIPF_EXPONENT,
+        cluster_size: int = DEFAULT_CLUSTER_SIZE,
+        cluster_radius: int = DEFAULT_CLUSTER_RADIUS,
+        seed: int | None = SEED,
+    ):
+        if not tiles:
+            raise ValueError("The file has no tiles with data")
+        self.pattern = pattern
+        self.cluster_size = cluster_size
+        self.cluster_radius = cluster_radius
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tiles = list(tiles)
+
+        if pattern == AccessPattern.zipf:
+            self._random.shuffle(self._tiles)
+            self._cum_weights = list(
+                itertools.accumulate(
+                    1 / rank**zipf_exponent for rank in range(1, len(self._tiles) + 1)
+                )
+            )
+        elif pattern == AccessPattern.clustered:
+            self._by_position = {(t.x, t.y, t.z): t for t in self._tiles}
+            self._cluster: list[TileRange] = []
+            self._cluster_remaining = 0
+
+    @classmethod
+    def from_params(cls, tiles: list[TileRange], params: dict) -> "TileSampler":
+        """Sampler configured by the `params` of a `tile_read` test."""
+        return cls(
+            tiles,
+            AccessPattern(params.get("pattern", AccessPattern.uniform)),
+            params.get("zipf_exponent", DEFAULT_ZIPF_EXPONENT),
+            params.get("cluster_size", DEFAULT_CLUSTER_SIZE),
+            params.get("cluster_radius", DEFAULT_CLUSTER_RADIUS),
+            params.get("seed", SEED),
+        )
+
+    def _next_clustered(self) -> TileRange:
+        if not self._cluster_remaining:
+            centre = self._random.choice(self._tiles)
+            radius = range(-self.cluster_radius, self.cluster_radius + 1)
+            positions = (
+                (centre.x + dx, centre.y + dy, centre.z)
+                for dx, dy in itertools.product(radius, radius)
+            )
+            self._cluster = [
+                self._by_position[p] for p in positions if p in self._by_position
+            ]
+            self._cluster_remaining = self.cluster_size
+        self._cluster_remaining -= 1
+        return self._random.choice(self._cluster)
+
+    def _next(self) -> TileRange:
+        if self.pattern == AccessPattern.zipf:
+            (tile,) = self._random.choices(self._tiles, cum_weights=self._cum_weights)
+            return tile
+        if self.pattern == AccessPattern.clustered:
+            return self._next_clustered()
+        return self._random.choice(self._tiles)
+
+    def next(self) -> TileRange:
+        with self._lock:
+            return self._next()
+
+    def next_batch(self, n_tiles: int) -> list[TileRange]:
+        """The distinct tiles of `n_tiles` draws, read together like the tiles of one
+        map view."""
+        with self._lock:
+            return list(dict.fromkeys(self._next() for _ in range(n_tiles)))
@@ -0,0 +1,99 @@
+"""Count completed requests, payload bytes and errors in one bucket per second.
+
+Totals over a whole run average away warm-up, throttling and performance which degrades
+over time.  Buckets are stored per worker in the `timeseries` table, and summarized as
+steady-state throughput, its stability and the time taken to reach peak throughput.
+"""
+
+import enum
+import itertools
+import json
+import time
+from datetime import datetime
+
+
+class Series(str, enum.Enum):
+    completions = "completions"
+    bytes = "bytes"
+    errors = "errors"
+
+
+# Fraction of the run at each end excluded from steady state, covering warm-up and
+# draining.  At least one second is excluded at each end, as those buckets are partial.
+STEADY_STATE_TRIM: float = 0.1
+
+# Peak throughput is reached at the first second with at least this fraction of the
+# busiest second's completions.
+PEAK_FRACTION: float = 0.9
+
+
+_start_time = time.monotonic()
+_buckets: dict[Series, list[int]] = {series: [] for series in Series}
+
+
+def reset() -> None:
+    global _start_time
+    _start_time = time.monotonic()
+    for buckets in _buckets.values():
+        buckets.clear()
+
+
+def record(series: Series, count: int = 1) -> None:
+    buckets = _buckets[series]
+    second = int(time.monotonic() - _start_time)
+    if len(buckets) <= second:
+        buckets.extend([0] * (second + 1 - len(buckets)))
+    buckets[second] += count
+
+
+def buckets() -> dict[Series, list[int]]:
+    """Buckets of each series since the last `reset`, padded to the same length."""
+    length = max(len(buckets) for buckets in _buckets.values())
+    return {
+        series: buckets + [0] * (length - len(buckets))
+        for series, buckets in _buckets.items()
+    }
+
+
+def merge_buckets(
+    all_buckets: list[dict[Series, list[int]]], offsets: list[int] | None = None
+) -> dict[Series, list[int]]:
+    """Sum buckets of workers which ran at the same time.  `offsets` are the seconds
+    each worker started after the first."""
+    offsets = offsets or [0] * len(all_buckets)
+    merged = {}
+    for series in Series:
+        shifted = [
+            [0] * offset + buckets.get(series, [])
+            for buckets, offset in zip(all_buckets, offsets)
+        ]
+        merged[series] = [
+            sum(values) for values in itertools.zip_longest(*shifted, fillvalue=0)
+        ]
+    return merged
+
+
+def buckets_to_json(buckets: dict[Series, list[int]]) -> dict[str, str]:
+    return {series.value: json.dumps(counts) for series, counts in buckets.items()}
+
+
+def buckets_from_row(row) -> dict[Series, list[int]]:
+    return {series: json.loads(row[series.value] or "[]") for series in Series}
+
+
+def steady_state(counts: list[int]) -> list[int]:
+    trim = max(int(len(counts) * STEADY_STATE_TRIM), 1)
+    return counts[trim:-trim]
+
+
+def time_to_peak(counts: list[int]) -> int | None:
+    """Seconds until throughput first reached `PEAK_FRACTION` of its peak."""
+    if not counts or max(counts) == 0:
+        return None
+    threshold = max(counts) * PEAK_FRACTION
+    return next(second for second, count in enumerate(counts) if count >= threshold)
+
+
+def start_offsets(start_times: list[datetime]) -> list[int]:
+    first = min(start_times)
+    return [int((start_time - first).total_seconds()) for start_time in start_times]
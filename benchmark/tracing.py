@@ -0,0 +1,265 @@
+"""Time the phases of each request (DNS, connect, TLS, time to first byte and body).
+
+Each client exposes a different subset of these phases:
+- `aiohttp` - DNS, connect (including TLS), time to first byte and body.
+- `httpx` - connect (including DNS), TLS, time to first byte and body.
+- `aioboto3` and `fsspec` - time to first byte (including DNS, connect and TLS) and body.
+- `requests` - time to first byte (including DNS, connect and TLS).
+- `obstore` and `async_tiff` - the time of each call, as `request`.
+
+Hooks are attached by the client factories in `benchmark.clients` when
+`HttpClientConfig.trace_phases` is set.  Timings are recorded in one histogram per phase
+for the whole process.
+"""
+
+import contextvars
+import enum
+import json
+import time
+import typing
+import weakref
+from functools import wraps
+
+import aiohttp
+import httpx
+import requests
+import wrapt
+
+from benchmark.histogram import LatencyHistogram
+
+
+class Phase(str, enum.Enum):
+    dns = "dns"
+    connect = "connect"
+    tls = "tls"
+    ttfb = "ttfb"
+    body = "body"
+    request = "request"
+
+
+_enabled = False
+_phases: dict[Phase, LatencyHistogram] = {}
+
+
+def enable() -> None:
+    """Enable timing of calls decorated with `timed`, hooks are always enabled once
+    attached to a client."""
+    global _enabled
+    _enabled = True
+
+
+def record(phase: Phase, seconds: float) -> None:
+    if phase not in _phases:
+        _phases[phase] = LatencyHistogram()
+    _phases[phase].record(seconds)
+
+
+def reset() -> None:
+    _phases.clear()
+
+
+def phase_histograms() -> dict[Phase, LatencyHistogram]:
+    """Histograms of each phase recorded since the last `reset`."""
+    return dict(_phases)
+
+
+def phases_to_json(phases: dict[Phase, LatencyHistogram]) -> str:
+    return json.dumps(
+        {
+            phase.value: json.loads(histogram.to_json())
+            for phase, histogram in phases.items()
+        }
+    )
+
+
+def phases_from_json(data: str | None) -> dict[Phase, LatencyHistogram]:
+    return {
+        Phase(phase): LatencyHistogram.from_json(json.dumps(counts))
+        for phase, counts in json.loads(data or "{}").items()
+    }
+
+
+def merge_phases(
+    phases: list[dict[Phase, LatencyHistogram]],
+) -> dict[Phase, LatencyHistogram]:
+    merged = {}
+    for histograms in phases:
+        for phase, histogram in histograms.items():
+            merged.setdefault(phase, LatencyHistogram()).merge(histogram)
+    return merged
+
+
+def timed(phase: Phase):
+    """Decorates a coroutine, recording its duration as `phase`.  Used for clients which
+    don't expose any hooks."""
+
+    def _timed(f):
+        @wraps(f)
+        async def wrapper(*args, **kwargs):
+            if not _enabled:
+                return await f(*args, **kwargs)
+            start_time = time.monotonic()
+            result = await f(*args, **kwargs)
+            record(phase, time.monotonic() - start_time)
+            return result
+
+        return wrapper
+
+    return _timed
+
+
+# aiohttp
+# `trace_config_ctx` is created for every request.  aiohttp resolves DNS within
+# connection creation, and doesn't separate the TLS handshake from the TCP connect.
+
+# When the headers of each traced response were received, for bodies read in chunks.
+_aiohttp_headers_received: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+async def _on_dns_resolvehost_start(session, ctx, params):
+    ctx.dns_start = time.monotonic()
+
+
+async def _on_dns_resolvehost_end(session, ctx, params):
+    ctx.dns = time.monotonic() - ctx.dns_start
+    record(Phase.dns, ctx.dns)
+
+
+async def _on_connection_create_start(session, ctx, params):
+    ctx.connect_start = time.monotonic()
+    ctx.dns = 0.0
+
+
+async def _on_connection_create_end(session, ctx, params):
+    record(Phase.connect, time.monotonic() - ctx.connect_start - ctx.dns)
+
+
+async def _on_request_headers_sent(session, ctx, params):
+    ctx.headers_sent = time.monotonic()
+
+
+async def _on_request_end(session, ctx, params):
+    ctx.headers_received = time.monotonic()
+    _aiohttp_headers_received[params.response] = ctx.headers_received
+    record(Phase.ttfb, ctx.headers_received - ctx.headers_sent)
+
+
+async def _on_response_chunk_received(session, ctx, params):
+    # Sent once with the whole body by `ClientResponse.read`.
+    record(Phase.body, time.monotonic() - ctx.headers_received)
+
+
+async def aiohttp_chunks(
+    response: aiohttp.ClientResponse,
+) -> typing.AsyncIterator[bytes]:
+    """Chunks of the body of `response`, recording the body phase once all are read.
+    aiohttp only sends `on_response_chunk_received` from `ClientResponse.read`."""
+    async for chunk in response.content.iter_any():
+        yield chunk
+    if (headers_received := _aiohttp_headers_received.get(response)) is not None:
+        record(Phase.body, time.monotonic() - headers_received)
+
+
+def aiohttp_trace_config() -> aiohttp.TraceConfig:
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_dns_resolvehost_start.append(_on_dns_resolvehost_start)
+    trace_config.on_dns_resolvehost_end.append(_on_dns_resolvehost_end)
+    trace_config.on_connection_create_start.append(_on_connection_create_start)
+    trace_config.on_connection_create_end.append(_on_connection_create_end)
+    trace_config.on_request_headers_sent.append(_on_request_headers_sent)
+    trace_config.on_request_end.append(_on_request_end)
+    trace_config.on_response_chunk_received.append(_on_response_chunk_received)
+    return trace_config
+
+
+# httpx
+# httpcore calls the `trace` request extension as each step starts and completes, with
+# names like `connection.connect_tcp.started` or `http11.receive_response_body.complete`.
+class _HttpcoreTrace:
+    def __init__(self):
+        self.started = {}
+        self.headers_received = 0.0
+
+    async def __call__(self, event_name: str, info: dict) -> None:
+        now = time.monotonic()
+        _, name, event = event_name.split(".")
+        if event == "started":
+            self.started[name] = now
+        elif event != "complete":
+            return
+        elif name == "connect_tcp":
+            record(Phase.connect, now - self.started[name])
+        elif name == "start_tls":
+            record(Phase.tls, now - self.started[name])
+        elif name == "receive_response_headers":
+            self.headers_received = now
+            record(Phase.ttfb, now - self.started["send_request_headers"])
+        elif name == "receive_response_body":
+            record(Phase.body, now - self.headers_received)
+
+
+async def _httpx_request_hook(request: httpx.Request) -> None:
+    request.extensions["trace"] = _HttpcoreTrace()
+
+
+def httpx_event_hooks() -> dict:
+    return {"request": [_httpx_request_hook]}
+
+
+# botocore
+# Events for one API call are emitted within the caller's task, context variables keep
+# concurrent calls apart.  botocore doesn't expose connection setup.
+_botocore_sent: contextvars.ContextVar[float] = contextvars.ContextVar("sent")
+_botocore_received: contextvars.ContextVar[float] = contextvars.ContextVar("received")
+
+
+class _TracedStreamingBody(wrapt.ObjectProxy):
+    def __init__(self, wrapped, headers_received: float):
+        super().__init__(wrapped)
+        self._self_headers_received = headers_received
+
+    async def read(self, *args, **kwargs):
+        data = await self.__wrapped__.read(*args, **kwargs)
+        record(Phase.body, time.monotonic() - self._self_headers_received)
+        return data
+
+    async def iter_chunks(self, *args, **kwargs):
+        # The wrapped body reads its chunks without going through the proxy's `read`.
+        async for chunk in self.__wrapped__.iter_chunks(*args, **kwargs):
+            yield chunk
+        record(Phase.body, time.monotonic() - self._self_headers_received)
+
+
+def _botocore_before_send(**kwargs) -> None:
+    _botocore_sent.set(time.monotonic())
+
+
+def _botocore_before_parse(**kwargs) -> None:
+    now = time.monotonic()
+    _botocore_received.set(now)
+    record(Phase.ttfb, now - _botocore_sent.get(now))
+
+
+def _botocore_after_call(parsed: dict, **kwargs) -> None:
+    if "Body" in parsed:
+        parsed["Body"] = _TracedStreamingBody(
+            parsed["Body"], _botocore_received.get(time.monotonic())
+        )
+
+
+def register_botocore_events(events) -> None:
+    """Register handlers with a botocore session's event emitter, before any clients are
+    created from the session."""
+    events.register("before-send.s3", _botocore_before_send)
+    events.register("before-parse.s3", _botocore_before_parse)
+    events.register("after-call.s3.GetObject", _botocore_after_call)
+
+
+# requests
+# `Response.elapsed` is measured from sending the request until the headers are parsed.
+def _requests_response_hook(response: requests.Response, *args, **kwargs) -> None:
+    record(Phase.ttfb, response.elapsed.total_seconds())
+
+
+def requests_hooks() -> dict:
+    return {"response": [_requests_response_hook]}
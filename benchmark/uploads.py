@@ -0,0 +1,239 @@
+"""Upload objects, in one request or as multipart uploads, and count the part buffers
+held by tests.
+
+`put_object` tests upload the whole object with one `PutObject`, and
+`multipart_upload` tests upload it as parts of `part_size` bytes, at most
+`part_concurrency` at a time.  Every request writes a new key below `UPLOAD_PREFIX` of
+the fixtures bucket, all of them sending the same object, generated once per run.
+
+aioboto3, httpx and aiohttp split the object themselves, copying each part into its own
+buffer while it's uploaded, like a writer producing the object a part at a time.  The
+peak of the bytes held by these buffers is reported with the results, see
+`buffers.part_buffer`.  s3fs and obstore
+split the object into parts internally, so they report none, and their memory only shows
+in the memory usage of the container.
+
+Uploads are signed by default.  The difference in CPU per MB between signed and
+unsigned uploads is the cost of hashing and signing them, see `signing_overhead`.
+"""
+
+import asyncio
+import functools
+import random
+import typing
+import uuid
+from importlib import import_module
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+import botocore.session
+import pandas as pd
+from botocore.auth import S3SigV4Auth
+from botocore.awsrequest import AWSRequest
+
+from benchmark import payload
+from benchmark.aggregate import summarize_client_cpu, summarize_resources
+from benchmark.clients import S3_NAMESPACE, HttpClientConfig
+from benchmark.crud import WorkerState
+from benchmark.resources import ResourceSampler
+from benchmark.scheduling import SchedulerConfig
+from benchmark.splits import split_range
+
+
+TEST_NAMES: tuple[str, ...] = payload.UPLOAD_TESTS
+UPLOAD_PREFIX: str = "uploads/"
+REGION_NAME: str = "us-west-2"
+
+DEFAULT_OBJECT_SIZE: int = 2**24
+# The smallest part S3 accepts, besides the last one.
+DEFAULT_PART_SIZE: int = 5 * 2**20
+DEFAULT_PART_CONCURRENCY: int = 4
+
+DEFAULT_OBJECT_SIZES: tuple[int, ...] = (2**22, 2**24)
+DEFAULT_PART_SIZES: tuple[int, ...] = (5 * 2**20, 8 * 2**20)
+DEFAULT_PART_CONCURRENCIES: tuple[int, ...] = (1, 4, 8)
+
+
+@functools.lru_cache(maxsize=1)
+def object_data(size: int) -> bytes:
+    """Random, so compression or deduplication can't shortcut the upload."""
+    return random.Random(size).randbytes(size)
+
+
+def upload_key() -> str:
+    return f"{UPLOAD_PREFIX}{uuid.uuid4().hex}"
+
+
+def part_ranges(object_size: int, part_size: int) -> list[tuple[int, int]]:
+    """`(start, end)` of each part, with an exclusive end."""
+    return split_range(object_size, part_size=part_size)
+
+
+async def upload_parts(
+    upload_part: typing.Callable[[int, int, int], typing.Awaitable],
+    parts: list[tuple[int, int]],
+    concurrency: int,
+) -> list:
+    """Call `upload_part(part_number, start, end)` for each part, with at most
+    `concurrency` running at once, and return their results in part order."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(part_number: int, start: int, end: int):
+        async with semaphore:
+            return await upload_part(part_number, start, end)
+
+    return await asyncio.gather(
+        *(limited(i + 1, start, end) for i, (start, end) in enumerate(parts))
+    )
+
+
+def upload_id(body: bytes) -> str:
+    """Upload ID from the response to `CreateMultipartUpload`."""
+    return ElementTree.fromstring(body).find(f"{S3_NAMESPACE}UploadId").text
+
+
+def complete_multipart_body(etags: list[str]) -> bytes:
+    """Request body of `CompleteMultipartUpload`, listing the ETag of each part."""
+    parts = "".join(
+        f"<Part><PartNumber>{i + 1}</PartNumber><ETag>{escape(etag)}</ETag></Part>"
+        for i, etag in enumerate(etags)
+    )
+    return f"<CompleteMultipartUpload>{parts}</CompleteMultipartUpload>".encode()
+
+
+@functools.lru_cache(maxsize=1)
+def _credentials():
+    credentials = botocore.session.get_session().get_credentials()
+    if credentials is None:
+        raise ValueError(
+            "Signed uploads need AWS credentials, set `signed` to false to upload "
+            "without them"
+        )
+    return credentials.get_frozen_credentials()
+
+
+def auth_headers(method: str, url: str, body: bytes, signed: bool) -> dict:
+    """SigV4 headers of a request sent by a plain HTTP client, signed like botocore
+    signs it, hashing the body.  No headers if unsigned."""
+    if not signed:
+        return {}
+    request = AWSRequest(method=method, url=url, data=body)
+    S3SigV4Auth(_credentials(), "s3", REGION_NAME).add_auth(request)
+    return dict(request.headers)
+
+
+def uploads(
+    test_name: str,
+    object_size: int,
+    part_sizes: tuple[int, ...],
+    part_concurrencies: tuple[int, ...],
+) -> list[dict]:
+    """Test params of every upload swept for `object_size`, skipping part sizes which
+    wouldn't split it."""
+    if test_name == "put_object":
+        return [{}]
+    return [
+        {"part_size": part_size, "part_concurrency": concurrency}
+        for part_size in part_sizes
+        if part_size < object_size
+        for concurrency in part_concurrencies
+    ]
+
+
+def _summarize(
+    library_name: str,
+    test_name: str,
+    params: dict,
+    state: WorkerState,
+    sampler: ResourceSampler,
+) -> dict:
+    duration_seconds = (state.end_time - state.start_time).total_seconds()
+    resources = summarize_resources(sampler.series(state.start_time, state.end_time))
+    return {
+        "library_name": library_name,
+        "test_name": test_name,
+        "object_size": params["object_size"],
+        "part_size": params.get("part_size"),
+        "part_concurrency": params.get("part_concurrency"),
+        "signed": params["signed"],
+        "number_requests": state.n_requests,
+        "number_failures": state.n_failures,
+        "duration_seconds": duration_seconds,
+        "requests_per_second": state.n_requests / duration_seconds,
+        "payload_bytes_per_second": state.counts["payload_bytes"] / duration_seconds,
+        "latency_p50_seconds": state.latency.percentile(50),
+        "latency_p99_seconds": state.latency.percentile(99),
+        **summarize_client_cpu(
+            state.cpu_seconds, state.n_requests, state.counts["payload_bytes"]
+        ),
+        "buffered_part_bytes": state.counts["buffered_part_bytes"],
+        "memory_peak_bytes": resources["memory_peak_bytes"],
+    }
+
+
+def run_sweep(
+    libraries: typing.Iterable[str],
+    test_names: typing.Iterable[str],
+    n_requests: int,
+    client_config: HttpClientConfig,
+    scheduler_config: SchedulerConfig,
+    object_sizes: tuple[int, ...] = DEFAULT_OBJECT_SIZES,
+    part_sizes: tuple[int, ...] = DEFAULT_PART_SIZES,
+    part_concurrencies: tuple[int, ...] = DEFAULT_PART_CONCURRENCIES,
+    signed: tuple[bool, ...] = (True, False),
+) -> pd.DataFrame:
+    """Run each upload test of each library, for each object size, part size, part
+    concurrency and signing, one at a time in this process."""
+    sampler = ResourceSampler()
+    sampler.start()
+    results = []
+    try:
+        for library_name in libraries:
+            for test_name in test_names:
+                mod = import_module(f"benchmark.tests.{library_name}.{test_name}")
+                for object_size in object_sizes:
+                    for upload in uploads(
+                        test_name, object_size, part_sizes, part_concurrencies
+                    ):
+                        for sign in signed:
+                            params = {
+                                "object_size": object_size,
+                                **upload,
+                                "signed": sign,
+                            }
+                            print(f"Running {library_name}.{test_name} {params}")
+                            state = mod.main(
+                                client_config,
+                                n_requests,
+                                None,
+                                params,
+                                scheduler_config,
+                            )
+                            # Load profiles return one state per step.
+                            for step in state if isinstance(state, list) else [state]:
+                                results.append(
+                                    _summarize(
+                                        library_name, test_name, params, step, sampler
+                                    )
+                                )
+    finally:
+        sampler.stop()
+    return pd.DataFrame.from_records(results)
+
+
+def signing_overhead(results: pd.DataFrame) -> pd.DataFrame:
+    """Signed uploads, with the CPU per MB they spent on hashing and signing: the
+    difference to the same upload sent unsigned."""
+    keys = ["library_name", "test_name", "object_size", "part_size", "part_concurrency"]
+    signed = results[results["signed"]]
+    unsigned = (
+        results[~results["signed"]]
+        .groupby(keys, dropna=False)["cpu_usec_per_mb"]
+        .mean()
+        .rename("unsigned_cpu_usec_per_mb")
+    )
+    signed = signed.join(unsigned, on=keys)
+    signed["signing_cpu_usec_per_mb"] = (
+        signed["cpu_usec_per_mb"] - signed["unsigned_cpu_usec_per_mb"]
+    )
+    return signed.reset_index(drop=True)